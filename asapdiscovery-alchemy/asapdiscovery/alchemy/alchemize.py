@@ -1,3 +1,5 @@
+from typing import Optional
+
 from asapdiscovery.alchemy.cli.utils import report_alchemize_clusters
 from asapdiscovery.data.schema.ligand import Ligand, write_ligands_to_multi_sdf
 from rdkit import Chem
@@ -111,6 +113,111 @@ def calc_mcs_residuals(mol1: Mol, mol2: Mol) -> tuple[int, int]:
     ), Chem.rdMolDescriptors.CalcNumHeavyAtoms(AllChem.DeleteSubstructs(mol2, mcs))
 
 
+def _scaffold_from_smiles(scaffold_smiles: str) -> Mol:
+    """Parse a scaffold SMILES into a partially sanitized RDKit molecule."""
+    return partial_sanitize(Chem.MolFromSmiles(scaffold_smiles, sanitize=False))
+
+
+def _heavy_element_counts(mol: Mol) -> dict[int, int]:
+    """Count the heavy atoms of each element in a molecule."""
+    counts = {}
+    for atom in mol.GetAtoms():
+        atomic_number = atom.GetAtomicNum()
+        if atomic_number > 1:
+            counts[atomic_number] = counts.get(atomic_number, 0) + 1
+    return counts
+
+
+def _residual_lower_bound(counts_a: dict[int, int], counts_b: dict[int, int]) -> int:
+    """A lower bound on the first residual of `calc_mcs_residuals(mol_a, mol_b)` from
+    the heavy atom counts of each element. Atoms of an element missing from mol_b can
+    never be part of the MCS so must always be left over in mol_a."""
+    return sum(count for element, count in counts_a.items() if element not in counts_b)
+
+
+class ScaffoldMatcher:
+    """
+    Find the best cluster for an outsider scaffold. The cluster scaffolds are parsed
+    once and candidate clusters are pruned using heavy atom count bounds before the MCS
+    is calculated, the result is the same as checking every cluster with
+    `calc_mcs_residuals`.
+    """
+
+    def __init__(self, cluster_scaffolds: list[str]):
+        """
+        Args:
+            cluster_scaffolds: The BBM scaffold SMILES of the alchemical clusters.
+        """
+        self.cluster_scaffolds = list(cluster_scaffolds)
+        self.cluster_mols = [
+            _scaffold_from_smiles(scaffold) for scaffold in self.cluster_scaffolds
+        ]
+        self.cluster_counts = [_heavy_element_counts(mol) for mol in self.cluster_mols]
+
+    def best_match(self, scaffold: str, max_transform: int) -> Optional[str]:
+        """
+        Find the cluster scaffold with the smallest total MCS residual to this scaffold.
+
+        Args:
+            scaffold: The BBM scaffold SMILES of the outsider.
+            max_transform: The maximum number of heavy atoms allowed to be left over in
+                either scaffold after removing the MCS.
+
+        Returns:
+            The best matching cluster scaffold or `None` if no cluster is within
+            `max_transform`, ties are resolved in favour of the first cluster.
+        """
+        singleton_mol = _scaffold_from_smiles(scaffold)
+        singleton_counts = _heavy_element_counts(singleton_mol)
+
+        best_match_total_ha = max_transform * 2
+        best_match_cluster_bbm_scaff = None
+        for cluster_bbm_scaff, cluster_mol, cluster_counts in zip(
+            self.cluster_scaffolds, self.cluster_mols, self.cluster_counts
+        ):
+            # skip the MCS if the bounds show this cluster can not be accepted or can
+            # not beat the current best match
+            cluster_bound = _residual_lower_bound(cluster_counts, singleton_counts)
+            singleton_bound = _residual_lower_bound(singleton_counts, cluster_counts)
+            if (
+                cluster_bound > max_transform
+                or singleton_bound > max_transform
+                or cluster_bound + singleton_bound >= best_match_total_ha
+            ):
+                continue
+
+            cluster_mol_n_residual, singleton_mol_n_residual = calc_mcs_residuals(
+                cluster_mol, singleton_mol
+            )
+
+            # discard this match if any of the residuals are higher than the cutoff
+            if (
+                cluster_mol_n_residual > max_transform
+                or singleton_mol_n_residual > max_transform
+            ):
+                continue
+            elif (
+                cluster_mol_n_residual + singleton_mol_n_residual < best_match_total_ha
+            ):
+                best_match_total_ha = cluster_mol_n_residual + singleton_mol_n_residual
+                best_match_cluster_bbm_scaff = cluster_bbm_scaff
+
+        return best_match_cluster_bbm_scaff
+
+
+# the matcher built once in each worker process by `_init_matcher_worker`
+_WORKER_MATCHER = None
+
+
+def _init_matcher_worker(cluster_scaffolds: list[str]):
+    global _WORKER_MATCHER
+    _WORKER_MATCHER = ScaffoldMatcher(cluster_scaffolds)
+
+
+def _worker_best_match(scaffold: str, max_transform: int) -> Optional[str]:
+    return _WORKER_MATCHER.best_match(scaffold, max_transform)
+
+
 def rescue_outsiders(
     outsiders, alchemical_clusters, max_transform, processors: int, console=None
 ) -> tuple[dict[str, list[Ligand]], dict[str, list[Ligand]]]:
@@ -122,7 +229,7 @@ def rescue_outsiders(
         outsiders: dict of str: list of Ligands
         alchemical_clusters: dict of str: list of RDKit mols
         max_transform: int
-        processors: int
+        processors: int, the number of processes used to match the outsiders
         console: Rich console object for logging
 
     Returns:
@@ -135,43 +242,45 @@ def rescue_outsiders(
     )
     if console:
         console.print(message)
-    singletons_to_move = {}
-    for singleton_bbm_scaff, _ in tqdm(outsiders.items(), desc="Rescuing outsiders"):
-        singleton_bbm_scaff_ps = partial_sanitize(
-            Chem.MolFromSmiles(singleton_bbm_scaff, sanitize=False)
-        )
-
-        best_match_total_ha = max_transform * 2
-        best_match_cluster_bbm_scaff = None
 
-        # check every BBM scaffold in the clusters we've already found
-        for cluster_bbm_scaff, cluster_mols in alchemical_clusters.items():
-            cluster_bbm_scaff_ps = partial_sanitize(
-                Chem.MolFromSmiles(cluster_bbm_scaff, sanitize=False)
+    singleton_scaffolds = list(outsiders.keys())
+    cluster_scaffolds = list(alchemical_clusters.keys())
+    if processors > 1 and len(singleton_scaffolds) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # each worker parses the cluster scaffolds once when it starts
+        with ProcessPoolExecutor(
+            max_workers=processors,
+            initializer=_init_matcher_worker,
+            initargs=(cluster_scaffolds,),
+        ) as pool:
+            chunksize = max(1, len(singleton_scaffolds) // (processors * 4))
+            best_matches = list(
+                tqdm(
+                    pool.map(
+                        _worker_best_match,
+                        singleton_scaffolds,
+                        [max_transform] * len(singleton_scaffolds),
+                        chunksize=chunksize,
+                    ),
+                    total=len(singleton_scaffolds),
+                    desc="Rescuing outsiders",
+                )
             )
-
-            cluster_mol_n_residual, singleton_mol_n_residual = calc_mcs_residuals(
-                cluster_bbm_scaff_ps, singleton_bbm_scaff_ps
+    else:
+        matcher = ScaffoldMatcher(cluster_scaffolds)
+        best_matches = [
+            matcher.best_match(singleton_bbm_scaff, max_transform)
+            for singleton_bbm_scaff in tqdm(
+                singleton_scaffolds, desc="Rescuing outsiders"
             )
+        ]
 
-            # first discard this match if any of the residuals are higher than the defined cutoff
-            if (
-                cluster_mol_n_residual > max_transform
-                or singleton_mol_n_residual > max_transform
-            ):
-                continue
-            elif (
-                cluster_mol_n_residual + singleton_mol_n_residual < best_match_total_ha
-            ):
-                best_match_total_ha = cluster_mol_n_residual + singleton_mol_n_residual
-                best_match_cluster_bbm_scaff = cluster_bbm_scaff
-
-        if best_match_cluster_bbm_scaff:
-            # we can add it to the right cluster and remove it from the singletons.
-            # need to do this outside loop to not break the dict iterator though
-            singletons_to_move[singleton_bbm_scaff] = best_match_cluster_bbm_scaff
-
-    for singleton_bbm_scaff, cluster_to_move_to in singletons_to_move.items():
+    for singleton_bbm_scaff, cluster_to_move_to in zip(
+        singleton_scaffolds, best_matches
+    ):
+        if not cluster_to_move_to:
+            continue
         # first copy the mols from the singleton over to the intended cluster
         for singleton_mol in outsiders[singleton_bbm_scaff]:
             alchemical_clusters[cluster_to_move_to].append(singleton_mol)
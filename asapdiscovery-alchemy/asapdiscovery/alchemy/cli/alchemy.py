@@ -106,6 +106,22 @@ def create(filename: str):
     help="The name of the biological target associated with this workflow.",
     type=click.Choice(TargetTags.get_values(), case_sensitive=True),
 )
+@click.option(
+    "-p",
+    "--processors",
+    default=1,
+    show_default=True,
+    help="The number of processors which can be used to map and score the ligand pairs in parallel. `auto` will use "
+    "(all_cpus -1), `all` will use all or the exact number of cpus to use can be provided.",
+)
+@click.option(
+    "-mc",
+    "--mapping-cache",
+    type=click.Path(resolve_path=True, file_okay=True, dir_okay=False),
+    default=None,
+    help="An optional SQLite file to store the scored atom mappings between ligand pairs in, so re-planning with a "
+    "different network type or extra ligands only maps the new pairs.",
+)
 def plan(
     name: Optional[str] = None,
     receptor: Optional[str] = None,
@@ -117,6 +133,8 @@ def plan(
     alchemy_dataset: Optional[str] = None,
     experimental_protocol: Optional[str] = None,
     target: Optional[TagEnumBase] = None,
+    processors: int = 1,
+    mapping_cache: Optional[str] = None,
 ):
     """
     Plan a FreeEnergyCalculationNetwork using the given factory and inputs. The planned network will be written to file
@@ -125,6 +143,7 @@ def plan(
     import pathlib
 
     import openfe
+    from asapdiscovery.alchemy.cli.utils import get_cpus
     from asapdiscovery.alchemy.schema.fec import FreeEnergyCalculationFactory
     from asapdiscovery.alchemy.schema.prep_workflow import AlchemyDataSet
     from asapdiscovery.data.readers.molfile import MolFileFactory
@@ -226,6 +245,8 @@ def plan(
         experimental_protocol=experimental_protocol,
         target=target,
         graphml=graphml,
+        processors=get_cpus(processors),
+        mapping_cache=mapping_cache,
     )
     click.echo(f"Writing results to {name}")
     # output the data to a folder named after the dataset
@@ -381,10 +402,19 @@ def submit(
     default=False,
     help="If we should allow missing results when gathering from alchemiscale.",
 )
+@click.option(
+    "-rs",
+    "--result-store",
+    type=click.Path(resolve_path=True, file_okay=True, dir_okay=False),
+    help="An optional JSON file used to store the results already gathered for the network, so repeated gathers only "
+    "fetch transformations with new results.",
+    default=None,
+)
 def gather(
     network: Optional[str] = False,
     network_key: Optional[str] = False,
     allow_missing: Optional[bool] = None,
+    result_store: Optional[str] = None,
 ):
     """
     Gather the results from alchemiscale for the given network.
@@ -395,6 +425,7 @@ def gather(
         network: The path of the JSON file containing the FreeEnergyCalculationNetwork whose results we should gather.
         network_key: The `alchemsicale` network key of the network whose results we should gather.
         allow_missing: If we should allow missing results when trying to gather the network.
+        result_store: The JSON file used to store the results already gathered for the network.
 
     Raises:
         Runtime error if all calculations are not complete and allow missing is False.
@@ -445,9 +476,13 @@ def gather(
     )
 
     if using_network_key:
-        network_with_results = client.collect_results(network_key=network_key)
+        network_with_results = client.collect_results(
+            network_key=network_key, result_store=result_store
+        )
     else:
-        network_with_results = client.collect_results(planned_network=planned_network)
+        network_with_results = client.collect_results(
+            planned_network=planned_network, result_store=result_store
+        )
 
     click.echo("Results gathered saving to file ...")
     network_with_results.to_file("result_network.json")
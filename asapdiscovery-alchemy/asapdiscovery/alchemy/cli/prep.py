@@ -1,6 +1,5 @@
 import shutil
 from typing import Optional
-from warnings import warn
 
 import click
 from asapdiscovery.alchemy.cli.utils import SpecialHelpOrder
@@ -178,11 +177,6 @@ def alchemize(
         # can be a string from click
         processors = int(processors)
 
-    # can't currently handle more than 1 processor
-    if processors > 1:
-        warn("Currently only 1 processor is supported for this command, setting to 1")
-        processors = 1
-
     # step 1: attempt to create alchemical clusters. Some outliers/singletons ("outsiders") are likely
     outsiders, alchemical_clusters = compute_clusters(
         asap_ligands, outsider_number, console
@@ -269,6 +263,14 @@ def alchemize(
     default=None,
     show_default=True,
 )
+@click.option(
+    "-cr",
+    "--charge-results",
+    type=click.Path(resolve_path=True, file_okay=True, dir_okay=False),
+    default=None,
+    help="The name of a file the partial charges are saved to as they are generated, if the file exists charges "
+    "from a previous interrupted run will be reused.",
+)
 def run(
     dataset_name: str,
     ligands: Optional[str] = None,
@@ -279,6 +281,7 @@ def run(
     processors: str | int = 1,
     postera_molset_name: Optional[str] = None,
     experimental_protocol: Optional[str] = None,
+    charge_results: Optional[str] = None,
 ):
     """
     Create an AlchemyDataset by running the given AlchemyPrepWorkflow which will expand the ligand states and generate
@@ -296,6 +299,8 @@ def run(
     processors: The number of processors which can be used to run the workflow in parallel. `auto` will use all
         cpus -1, `all` will use all or the exact number of cpus to use can be provided.
     postera_molset_name: The name of the postera molecule set we should pull the data from instead of a local file.
+    charge_results: The name of a file the partial charges are saved to as they are generated, used to resume an
+        interrupted run.
     """
     import pathlib
 
@@ -423,6 +428,7 @@ def run(
         reference_complex=ref_complex,
         processors=processors,
         reference_ligands=ref_ligands,
+        charge_results_file=charge_results,
     )
     output_folder = pathlib.Path(dataset_name)
     output_folder.mkdir(parents=True, exist_ok=True)
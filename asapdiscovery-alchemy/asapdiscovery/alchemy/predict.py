@@ -1003,10 +1003,6 @@ def clean_result_network(network, console=None, ddg_outlier_threshold=15):
 
     returns the loaded FreeEnergyCalculationNetwork.
     """
-    import math
-    from collections import defaultdict
-
-    import numpy as np
     from asapdiscovery.alchemy.schema.fec import (
         AlchemiscaleResults,
         FreeEnergyCalculationNetwork,
@@ -1014,87 +1010,88 @@ def clean_result_network(network, console=None, ddg_outlier_threshold=15):
     )
     from rich.padding import Padding
 
-    # load in to schema  and extract the results
+    # load in to schema  and extract the results into a table, the schema objects are
+    # only rebuilt for the results which survive the cleaning
     network_schema = FreeEnergyCalculationNetwork.from_file(network)
     input_results = network_schema.results.results
+    results_df = pd.DataFrame(
+        {
+            "ligand_a": [result.ligand_a for result in input_results],
+            "ligand_b": [result.ligand_b for result in input_results],
+            "phase": [result.phase for result in input_results],
+            "estimate": np.array(
+                [result.estimate.magnitude for result in input_results], dtype=float
+            ),
+            "uncertainty": np.array(
+                [result.uncertainty.magnitude for result in input_results], dtype=float
+            ),
+        }
+    )
 
     # 1. remove edges where DG is 0.0
-    cleaned_results = [
-        result for result in input_results if not result.estimate.magnitude == 0.0
-    ]
-
-    num_0_0_removed = len(input_results) - len(cleaned_results)
-
-    # 2. balance between complex/solvent replicates, such that n=N=1
-
-    deduped_results_dict = defaultdict(list)
-    for result in cleaned_results:
-        transform = f"{result.ligand_a}~{result.ligand_b}_{result.phase}"
-        deduped_results_dict[transform].append(result)
-
-    deduped_results = []
-    for _, results in deduped_results_dict.items():
-        if len(results) > 1:
-            # take the arithmetic mean of DG and dDG and add the replaced first result,
-            # all provenance data is constant between these repeats anyway
-            mean_DG = np.mean([result.estimate.magnitude for result in results])
-            mean_dDG = np.mean([result.uncertainty.magnitude for result in results])
-            result_data = results[0].dict(exclude={"estimate", "uncertainty"})
-
-            tf_res = TransformationResult(
-                estimate=mean_DG, uncertainty=mean_dDG, **result_data
-            )
-
-        else:
-            tf_res = results[0]
-
-        deduped_results.append(tf_res)
-    num_dupes_removed = len(cleaned_results) - len(deduped_results)
+    cleaned_df = results_df[results_df["estimate"] != 0.0]
+    num_0_0_removed = len(results_df) - len(cleaned_df)
+
+    # 2. balance between complex/solvent replicates, such that n=N=1 by taking the
+    # arithmetic mean of DG and dDG, keeping the transforms in the order they are first
+    # seen. A NaN in any replicate makes the mean NaN, so track it explicitly as the
+    # pandas mean would skip it.
+    cleaned_df = cleaned_df.assign(
+        has_nan=cleaned_df["estimate"].isna() | cleaned_df["uncertainty"].isna()
+    )
+    deduped_df = (
+        cleaned_df.groupby(["ligand_a", "ligand_b", "phase"], sort=False)
+        .agg(
+            estimate=("estimate", "mean"),
+            uncertainty=("uncertainty", "mean"),
+            has_nan=("has_nan", "any"),
+        )
+        .reset_index()
+    )
+    num_dupes_removed = len(cleaned_df) - len(deduped_df)
 
     # remove predictions that have a NaN as either prediction or unc - this is extremely rare
-    denand_results = []
-    for result in deduped_results:
-        if not math.isnan(result.estimate.magnitude) and not math.isnan(
-            result.uncertainty.magnitude
-        ):
-            denand_results.append(result)
+    denand_df = deduped_df[~deduped_df["has_nan"]]
 
     # remove edges that have erroneously high DDG values
-    results_complex = []
-    results_solvent = []
-
-    for edge_result in denand_results:
-        if edge_result.phase == "complex":
-            results_complex.append(edge_result)
-        elif edge_result.phase == "solvent":
-            results_solvent.append(edge_result)
-        else:
-            raise ValueError(
-                f"Edge phase {edge_result.phase} not recognized for edge {edge_result}"
-            )
+    unknown_phases = ~denand_df["phase"].isin(["complex", "solvent"])
+    if unknown_phases.any():
+        edge = denand_df[unknown_phases].iloc[0]
+        raise ValueError(
+            f"Edge phase {edge['phase']} not recognized for edge {edge['ligand_a']}~{edge['ligand_b']}"
+        )
+    # an inner merge keeps the order of the complex legs, each complex leg has at most
+    # one solvent leg after deduplication
+    edges_df = pd.merge(
+        denand_df[denand_df["phase"] == "complex"],
+        denand_df[denand_df["phase"] == "solvent"],
+        on=["ligand_a", "ligand_b"],
+        how="inner",
+        suffixes=("_complex", "_solvent"),
+    )
+    below_threshold = (
+        edges_df["estimate_solvent"] - edges_df["estimate_complex"]
+    ).abs() < ddg_outlier_threshold
+    large_edge_removal_counter = int((~below_threshold).sum())
+    edges_df = edges_df[below_threshold]
+
     results_not_overly_large = []
-    large_edge_removal_counter = 0
-    for res_complex in results_complex:
-        # find the solvent match
-        for res_solvent in results_solvent:
-            if (
-                res_complex.ligand_a == res_solvent.ligand_a
-                and res_complex.ligand_b == res_solvent.ligand_b
-            ):
-                # only add back in if the edge's DDG is below the outlier threshold
-                if (
-                    abs(res_solvent.estimate.magnitude - res_complex.estimate.magnitude)
-                    < ddg_outlier_threshold
-                ):
-                    results_not_overly_large.append(res_solvent)
-                    results_not_overly_large.append(res_complex)
-                else:
-                    large_edge_removal_counter += 1
+    for edge in edges_df.itertuples(index=False):
+        for phase in ["solvent", "complex"]:
+            results_not_overly_large.append(
+                TransformationResult(
+                    ligand_a=edge.ligand_a,
+                    ligand_b=edge.ligand_b,
+                    phase=phase,
+                    estimate=getattr(edge, f"estimate_{phase}"),
+                    uncertainty=getattr(edge, f"uncertainty_{phase}"),
+                )
+            )
 
     # done! let's repack everything.
     if console:
         message = Padding(
-            f"Cleaned incoming result network:\n- Removed {num_0_0_removed} edge(s) with DG==0.0 kcal/mol\n- Removed {num_dupes_removed} edge(s) to balance between complex/solvent replicates.\n- Removed {len(deduped_results)-len(denand_results)} edge(s) that contained a NaN measurement\n- Removed {large_edge_removal_counter} edges that have an abs(DDG) of more than {ddg_outlier_threshold} kcal/mol",
+            f"Cleaned incoming result network:\n- Removed {num_0_0_removed} edge(s) with DG==0.0 kcal/mol\n- Removed {num_dupes_removed} edge(s) to balance between complex/solvent replicates.\n- Removed {len(deduped_df)-len(denand_df)} edge(s) that contained a NaN measurement\n- Removed {large_edge_removal_counter} edges that have an abs(DDG) of more than {ddg_outlier_threshold} kcal/mol",
             (1, 0, 1, 0),
         )
         console.print(message)
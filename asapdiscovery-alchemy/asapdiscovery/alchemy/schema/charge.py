@@ -1,7 +1,11 @@
 import abc
+import hashlib
+import json
+import pathlib
 import warnings
-from typing import Any, Literal
+from typing import Any, Literal, Optional, Union
 
+import numpy as np
 from asapdiscovery.alchemy.schema.base import _SchemaBase
 from asapdiscovery.data.schema.ligand import Ligand
 from pydantic import Field
@@ -32,14 +36,40 @@ class _BaseChargeMethod(_SchemaBase, abc.ABC):
         self,
         ligands: list[Ligand],
         processors: int = 1,
+        chunk_size: Optional[int] = None,
+        partial_results: Optional[Union[str, pathlib.Path]] = None,
     ) -> list[Ligand]:
         """The main worker method which should be used to generate charges for the ligands."""
         ...
 
     def generate_charges(
-        self, ligands: list[Ligand], processors: int = 1
+        self,
+        ligands: list[Ligand],
+        processors: int = 1,
+        chunk_size: Optional[int] = None,
+        partial_results: Optional[Union[str, pathlib.Path]] = None,
     ) -> list[Ligand]:
-        return self._generate_charges(ligands=ligands, processors=processors)
+        """
+        Generate partial charges for the ligands.
+
+        Args:
+            ligands: The ligands to generate charges for.
+            processors: The number of processes to use.
+            chunk_size: The number of ligands sent to a process at a time, by default
+                this is chosen based on the number of ligands and processes.
+            partial_results: The name of a file the charges are saved to as they are
+                generated, ligands which already have charges in the file are not
+                charged again so an interrupted run can be resumed.
+
+        Returns:
+            The charged ligands and the ligands which could not be charged.
+        """
+        return self._generate_charges(
+            ligands=ligands,
+            processors=processors,
+            chunk_size=chunk_size,
+            partial_results=partial_results,
+        )
 
 
 class OpenFFCharges(_BaseChargeMethod):
@@ -68,62 +98,178 @@ class OpenFFCharges(_BaseChargeMethod):
             provenance["ambertools"] = get_ambertools_version()
         return provenance
 
-    def _charge_molecule(self, ligand: Ligand) -> Ligand:
-        """Generate charges for the molecule using the openff toolkit."""
-        from openff.toolkit import Molecule
-
-        try:
-            off_mol = Molecule.from_rdkit(ligand.to_rdkit())
-            off_mol.assign_partial_charges(partial_charge_method=self.charge_method)
-            # fake the creation of the rdkit double property list
-            charges = " ".join([str(e) for e in off_mol.partial_charges.m])
-            ligand.tags["atom.dprop.PartialCharge"] = charges
-            return True, ligand, None
-        except Exception as e:
-            return False, ligand, e
-
     def _generate_charges(
         self,
         ligands: list[Ligand],
         processors: int = 1,
+        chunk_size: Optional[int] = None,
+        partial_results: Optional[Union[str, pathlib.Path]] = None,
     ) -> list[Ligand]:
         from concurrent.futures import ProcessPoolExecutor, as_completed
 
         provenance = self.provenance()
-        charged_ligands = []
-        failed_ligands = []
+        result_store = (
+            _PartialChargeResults(partial_results, provenance=provenance)
+            if partial_results is not None
+            else None
+        )
+        done = result_store.load() if result_store is not None else {}
 
-        if processors > 1:
-            progressbar = tqdm(total=len(ligands))
-            with ProcessPoolExecutor(max_workers=processors) as pool:
-                work_list = [
-                    pool.submit(self._charge_molecule, ligand) for ligand in ligands
-                ]
-                for work in as_completed(work_list):
-                    succ, result_ligand, err_code = work.result()
-                    if succ:
-                        charged_ligands.append(result_ligand)
-                    else:
-                        failed_ligands.append(result_ligand)
-                        warnings.warn(
-                            f"Ligand charging failed for ligand {result_ligand.compound_name}:{result_ligand.smiles} with exception: {err_code}"
-                        )
+        # only the SDF block is needed to charge a ligand, so send that to the workers
+        # rather than the full ligand
+        keys = [_charge_key(ligand) for ligand in ligands]
+        todo = [
+            (i, ligand.data)
+            for i, (key, ligand) in enumerate(zip(keys, ligands))
+            if key not in done
+        ]
+        errors = {}
+        progressbar = tqdm(total=len(ligands), initial=len(ligands) - len(todo))
 
-                    progressbar.update(1)
+        def _store(chunk_results):
+            new_charges = {}
+            for i, charges, error in chunk_results:
+                if charges is not None:
+                    done[keys[i]] = charges
+                    new_charges[keys[i]] = charges
+                else:
+                    errors[i] = error
+            if result_store is not None:
+                result_store.append(new_charges)
+            progressbar.update(len(chunk_results))
 
+        if processors > 1 and len(todo) > 1:
+            if chunk_size is None:
+                # a few chunks per worker to balance the load
+                chunk_size = max(1, min(50, len(todo) // (processors * 4)))
+            chunks = [todo[i : i + chunk_size] for i in range(0, len(todo), chunk_size)]
+            with ProcessPoolExecutor(
+                max_workers=processors,
+                initializer=_init_charge_worker,
+                initargs=(self.charge_method,),
+            ) as pool:
+                work_list = [pool.submit(_charge_chunk, chunk) for chunk in chunks]
+                for work in as_completed(work_list):
+                    _store(work.result())
         else:
-            for ligand in tqdm(ligands, total=len(ligands)):
-                succ, result_ligand, err_code = self._charge_molecule(ligand=ligand)
-                if succ:
-                    charged_ligands.append(result_ligand)
-                else:
-                    failed_ligands.append(result_ligand)
-                    warnings.warn(
-                        f"Ligand charging failed for ligand {result_ligand.compound_name}:{result_ligand.smiles} with exception: {err_code}"
-                    )
+            _init_charge_worker(self.charge_method)
+            for i, sdf in todo:
+                _store(_charge_chunk([(i, sdf)]))
+        progressbar.close()
 
-        for ligand in charged_ligands:
-            # stamp how the charges were made
-            ligand.charge_provenance = provenance
+        charged_ligands = []
+        failed_ligands = []
+        for i, (key, ligand) in enumerate(zip(keys, ligands)):
+            if key in done:
+                # fake the creation of the rdkit double property list
+                ligand.tags["atom.dprop.PartialCharge"] = " ".join(
+                    [str(e) for e in done[key]]
+                )
+                # stamp how the charges were made
+                ligand.charge_provenance = provenance
+                charged_ligands.append(ligand)
+            else:
+                failed_ligands.append(ligand)
+                warnings.warn(
+                    f"Ligand charging failed for ligand {ligand.compound_name}:{ligand.smiles} with exception: {errors[i]}"
+                )
 
         return charged_ligands, failed_ligands
+
+
+def _charge_key(ligand: Ligand) -> str:
+    """A key for the charges of a ligand which only depends on its SDF block."""
+    return hashlib.sha256(ligand.data.encode()).hexdigest()
+
+
+class _PartialChargeResults:
+    """
+    An append-only JSON lines file of the charges generated so far, which lets an
+    interrupted charging run pick up where it stopped. The charge provenance is stored
+    with each record so results made with different settings or software versions are
+    never reused.
+    """
+
+    def __init__(self, filename: Union[str, pathlib.Path], provenance: dict[str, Any]):
+        self.filename = pathlib.Path(filename)
+        self.provenance = provenance
+
+    def load(self) -> dict[str, np.ndarray]:
+        """Load the charges stored with this provenance, keyed by ligand."""
+        charges = {}
+        if not self.filename.exists():
+            return charges
+        with self.filename.open() as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # a partial line written when the run was interrupted
+                    continue
+                if record.get("provenance") == self.provenance:
+                    charges[record["key"]] = np.asarray(record["charges"], dtype=float)
+        return charges
+
+    def append(self, charges: dict[str, np.ndarray]):
+        """Append the charges of some ligands to the file."""
+        if not charges:
+            return
+        # finish any partial line left by an interrupted run so the new records start on
+        # their own line
+        needs_newline = False
+        if self.filename.exists() and self.filename.stat().st_size > 0:
+            with self.filename.open("rb") as f:
+                f.seek(-1, 2)
+                needs_newline = f.read(1) != b"\n"
+        with self.filename.open("a") as f:
+            if needs_newline:
+                f.write("\n")
+            for key, ligand_charges in charges.items():
+                record = {
+                    "key": key,
+                    "provenance": self.provenance,
+                    "charges": ligand_charges.tolist(),
+                }
+                f.write(json.dumps(record) + "\n")
+
+
+# the charge method of the worker process set by `_init_charge_worker`
+_WORKER_CHARGE_METHOD = None
+
+
+def _init_charge_worker(charge_method: str):
+    """Import the OpenFF toolkit and the backend toolkits once per worker process."""
+    global _WORKER_CHARGE_METHOD
+    from openff.toolkit import Molecule
+
+    if charge_method == "am1bccelf10":
+        from openeye import oeomega, oequacpac  # noqa: F401
+
+    # build a small molecule to make sure the toolkit registry is set up
+    Molecule.from_smiles("C")
+    _WORKER_CHARGE_METHOD = charge_method
+
+
+def _charge_chunk(chunk: list[tuple[int, str]]) -> list[tuple]:
+    """
+    Generate charges for a chunk of ligands in the worker process.
+
+    Args:
+        chunk: The index and SDF block of each ligand to charge.
+
+    Returns:
+        The index, charges and error message of each ligand, the charges are `None`
+        if charging failed.
+    """
+    from asapdiscovery.data.backend.rdkit import sdf_str_to_rdkit_mol
+    from openff.toolkit import Molecule
+
+    results = []
+    for i, sdf in chunk:
+        try:
+            off_mol = Molecule.from_rdkit(sdf_str_to_rdkit_mol(sdf))
+            off_mol.assign_partial_charges(partial_charge_method=_WORKER_CHARGE_METHOD)
+            results.append((i, np.asarray(off_mol.partial_charges.m), None))
+        except Exception as e:
+            results.append((i, None, str(e)))
+    return results
@@ -1,5 +1,6 @@
+import pathlib
 import warnings
-from typing import TYPE_CHECKING, Any, Literal, Optional
+from typing import TYPE_CHECKING, Any, Literal, Optional, Union
 
 import gufe
 import openfe
@@ -300,6 +301,40 @@ class AlchemiscaleResults(_BaseResults):
     )
 
 
+class CollectedTransformation(_SchemaBaseFrozen):
+    """
+    The state of a transformation the last time its results were collected from alchemiscale.
+    """
+
+    type: Literal["CollectedTransformation"] = "CollectedTransformation"
+
+    n_complete: int = Field(
+        ...,
+        description="The number of complete tasks of the transformation when its results were collected.",
+    )
+    result: Optional[TransformationResult] = Field(
+        None,
+        description="The result of the transformation, or None if alchemiscale had no results for it.",
+    )
+
+
+class AlchemiscaleResultStore(_SchemaBase):
+    """
+    A local store of the transformation results already collected for an alchemiscale network, so later gathers only
+    need to fetch the transformations which have new results.
+    """
+
+    type: Literal["AlchemiscaleResultStore"] = "AlchemiscaleResultStore"
+
+    network_key: ScopedKey = Field(
+        ..., description="The alchemiscale key of the network the results belong to."
+    )
+    transformations: dict[str, CollectedTransformation] = Field(
+        {},
+        description="The collected transformations keyed by their alchemiscale transformation key.",
+    )
+
+
 class _FreeEnergyBase(_SchemaBase):
     """
     A base class for the FreeEnergyCalculationFactory and Network to work around the serialisation issues with
@@ -451,10 +486,13 @@ class FreeEnergyCalculationNetwork(_FreeEnergyBase):
         receptor = self.to_openfe_receptor()
         protocol = self.to_openfe_protocol()
 
+        # build the force fields for all edges at once, this returns the name of the ff for edges with no bespoke
+        # parameters
+        edges = list(ligand_network.edges)
+        edge_forcefields = self._get_edge_forcefields(edges=edges)
+
         # build the network
-        for mapping in ligand_network.edges:
-            # returns the name of the ff if we have no bespoke parameters
-            ff_string = self._inject_bespoke_parameters(edge=mapping)
+        for mapping, ff_string in zip(edges, edge_forcefields):
             # make a copy of the protocol and add the bespoke force field
             edge_protocol = copy.deepcopy(protocol)
             # make the settings editable
@@ -501,35 +539,15 @@ class FreeEnergyCalculationNetwork(_FreeEnergyBase):
 
         return openfe.AlchemicalNetwork(edges=transformations, name=self.dataset_name)
 
-    def _inject_bespoke_parameters(self, edge: "LigandAtomMapping") -> str:
+    def _get_bespoke_parameter_data(self) -> dict[str, list[tuple[str, dict]]]:
         """
-        Inject the bespoke torsion parameters for the given edge into the base force field.
-
-        Args:
-            edge: The edge from the OpenFE alchemical network which we want the parameters for.
+        Build the force field parameter data for each ligand in the network with bespoke parameters.
 
         Returns:
-            The string of the force field with bespoke parameters added or the name of the base force field if no
-            bespoke parameters are found
-
-        Notes:
-            They will always be added in the order of the mapping (ligandA, ligandB)
+            A dict of the ligand name to a list of (parameter handler name, parameter kwargs) tuples.
         """
-        from openff.toolkit import ForceField
-        from openff.toolkit.utils.exceptions import DuplicateParameterError
         from openff.units import unit
 
-        # get the name of the base ff and load it
-        ff_string = self.forcefield_settings.small_molecule_forcefield
-        if ".offxml" not in ff_string:
-            ff_string += ".offxml"
-        ff = ForceField(ff_string)
-
-        # map the names to ligands to quickly find the parameters
-        names_to_ligands = {
-            ligand.compound_name: ligand for ligand in self.network.ligands
-        }
-
         # torsion data to manually set the phase idivf and periodicity
         torsion_data = {
             "idivf1": 1.0,
@@ -546,34 +564,96 @@ class FreeEnergyCalculationNetwork(_FreeEnergyBase):
             "periodicity4": 4,
         }
 
-        # track if we have any bespoke parameters
-        bespoke_parameters = False
-        for ofe_ligand in [edge.componentA, edge.componentB]:
-            if (
-                edge_ligand := names_to_ligands[ofe_ligand.name]
-            ).bespoke_parameters is not None:
-                bespoke_parameters = True
-                for parameter in edge_ligand.bespoke_parameters.parameters:
-                    handler = ff.get_parameter_handler(parameter.interaction)
-                    parameter_data = {
-                        key: value * getattr(unit, parameter.units)
-                        for key, value in parameter.values.items()
-                    }
-                    parameter_data["smirks"] = parameter.smirks
-                    parameter_data["id"] = f"bespokefit_{edge_ligand.compound_name}"
-                    if parameter.interaction == "ProperTorsions":
-                        parameter_data.update(torsion_data)
-                    try:
-                        # similar ligands will share parameters so make sure we don't add it twice
-                        handler.add_parameter(parameter_kwargs=parameter_data)
-                    except DuplicateParameterError:
-                        continue
-
-        # if we found bespoke parameters return the new force field
-        if bespoke_parameters:
-            ff_string = ff.to_string()
-
-        return ff_string
+        bespoke_data = {}
+        for ligand in self.network.ligands:
+            if ligand.bespoke_parameters is None:
+                continue
+            ligand_data = []
+            for parameter in ligand.bespoke_parameters.parameters:
+                parameter_data = {
+                    key: value * getattr(unit, parameter.units)
+                    for key, value in parameter.values.items()
+                }
+                parameter_data["smirks"] = parameter.smirks
+                parameter_data["id"] = f"bespokefit_{ligand.compound_name}"
+                if parameter.interaction == "ProperTorsions":
+                    parameter_data.update(torsion_data)
+                ligand_data.append((parameter.interaction, parameter_data))
+            bespoke_data[ligand.compound_name] = ligand_data
+        return bespoke_data
+
+    def _get_edge_forcefields(self, edges: list["LigandAtomMapping"]) -> list[str]:
+        """
+        Get the small molecule force field for each edge with the bespoke torsion parameters of its ligands injected
+        into the base force field.
+
+        The base force field is loaded once and the force field for each combination of bespoke ligands is only built
+        once, so edges with the same bespoke ligands share the same force field string.
+
+        Args:
+            edges: The edges from the OpenFE alchemical network which we want the force fields for.
+
+        Returns:
+            The string of the force field with bespoke parameters added or the name of the base force field if no
+            bespoke parameters are found, for each edge.
+
+        Notes:
+            They will always be added in the order of the mapping (ligandA, ligandB)
+        """
+        import copy
+
+        from openff.toolkit import ForceField
+        from openff.toolkit.utils.exceptions import DuplicateParameterError
+
+        # get the name of the base ff
+        ff_name = self.forcefield_settings.small_molecule_forcefield
+        if ".offxml" not in ff_name:
+            ff_name += ".offxml"
+
+        bespoke_data = self._get_bespoke_parameter_data()
+        base_ff = None
+        ff_strings = {}
+        edge_forcefields = []
+        for edge in edges:
+            # the ligands with bespoke parameters in the order of the mapping
+            bespoke_ligands = tuple(
+                ofe_ligand.name
+                for ofe_ligand in [edge.componentA, edge.componentB]
+                if ofe_ligand.name in bespoke_data
+            )
+            if not bespoke_ligands:
+                edge_forcefields.append(ff_name)
+                continue
+
+            if bespoke_ligands not in ff_strings:
+                if base_ff is None:
+                    base_ff = ForceField(ff_name)
+                ff = copy.deepcopy(base_ff)
+                for ligand_name in bespoke_ligands:
+                    for interaction, parameter_data in bespoke_data[ligand_name]:
+                        handler = ff.get_parameter_handler(interaction)
+                        try:
+                            # similar ligands will share parameters so make sure we don't add it twice
+                            handler.add_parameter(parameter_kwargs=dict(parameter_data))
+                        except DuplicateParameterError:
+                            continue
+                ff_strings[bespoke_ligands] = ff.to_string()
+            edge_forcefields.append(ff_strings[bespoke_ligands])
+
+        return edge_forcefields
+
+    def _inject_bespoke_parameters(self, edge: "LigandAtomMapping") -> str:
+        """
+        Inject the bespoke torsion parameters for the given edge into the base force field.
+
+        Args:
+            edge: The edge from the OpenFE alchemical network which we want the parameters for.
+
+        Returns:
+            The string of the force field with bespoke parameters added or the name of the base force field if no
+            bespoke parameters are found
+        """
+        return self._get_edge_forcefields(edges=[edge])[0]
 
 
 class FreeEnergyCalculationFactory(_FreeEnergyBase):
@@ -596,6 +676,8 @@ class FreeEnergyCalculationFactory(_FreeEnergyBase):
         graphml: Optional[str] = None,
         experimental_protocol: Optional[str] = None,
         target: Optional[str] = None,
+        processors: int = 1,
+        mapping_cache: Optional[Union[str, pathlib.Path]] = None,
     ) -> FreeEnergyCalculationNetwork:
         """
          Use the factory settings to create a FEC dataset using OpenFE models.
@@ -610,6 +692,9 @@ class FreeEnergyCalculationFactory(_FreeEnergyBase):
             experimental_protocol: The name of the experimental protocol in the CDD vault that should be
                 associated with this Alchemy network.
             target: The name of the biological target associated with this Alchemy network.
+            processors: The number of processes used to map and score pairs of ligands when planning the network.
+            mapping_cache: An optional SQLite file used to store the scored mappings between pairs of ligands so only
+                new pairs are mapped when re-planning.
 
          Returns:
              The planned FEC network which can be executed locally or submitted to alchemiscale.
@@ -621,6 +706,8 @@ class FreeEnergyCalculationFactory(_FreeEnergyBase):
             planned_network = self.network_planner.generate_network(
                 ligands=ligands,
                 central_ligand=central_ligand,
+                processors=processors,
+                mapping_cache=mapping_cache,
             )
         # pre-generated network
         elif graphml:
@@ -1,5 +1,11 @@
 import abc
-from typing import Callable, Literal, Optional, Union
+import hashlib
+import itertools
+import json
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Callable, ClassVar, Literal, Optional, Union
 
 import openfe
 from asapdiscovery.data.schema.ligand import Ligand
@@ -18,6 +24,9 @@ class _NetworkPlannerMethod(_SchemaBase, abc.ABC):
 
     type: Literal["_NetworkPlannerMethod"] = "_NetworkPlannerMethod"
 
+    # if the planning function maps and scores every pair of ligands
+    all_pairs: ClassVar[bool] = False
+
     @abc.abstractmethod
     def get_planning_function(self) -> Callable:
         """
@@ -42,6 +51,7 @@ class MaximalPlanner(_NetworkPlannerMethod):
     """Plan maximally connected networks using openfe."""
 
     type: Literal["MaximalPlanner"] = "MaximalPlanner"
+    all_pairs: ClassVar[bool] = True
 
     def get_planning_function(self) -> Callable:
         return openfe.ligand_network_planning.generate_maximal_network
@@ -51,6 +61,7 @@ class MinimalSpanningPlanner(_NetworkPlannerMethod):
     """Plan minimal spanning networks where each ligand has a single connection to the graph with openfe."""
 
     type: Literal["MinimalSpanningPlanner"] = "MinimalSpanningPlanner"
+    all_pairs: ClassVar[bool] = True
 
     def get_planning_function(self) -> Callable:
         return openfe.ligand_network_planning.generate_minimal_spanning_network
@@ -60,6 +71,7 @@ class MinimalRedundantPlanner(_NetworkPlannerMethod):
     """Planing minimally spanning networks with configurable redundancy using openfe."""
 
     type: Literal["MinimalRedundantPlanner"] = "MinimalRedundantPlanner"
+    all_pairs: ClassVar[bool] = True
 
     redundancy: int = Field(
         2,
@@ -95,6 +107,123 @@ class CustomNetworkPlanner(_NetworkPlannerMethod):
         return _plan_from_names
 
 
+class AtomMappingCache:
+    """
+    An on-disk SQLite store of the scored atom mappings between pairs of ligands, so that re-planning a network with a
+    different topology, or after adding ligands, only needs to map and score the new pairs.
+
+    Mappings are stored for the ordered pair of ligands (by their openfe component keys) under a settings key which
+    captures the atom mapper settings, the scorer and the software versions used.
+    """
+
+    def __init__(self, filename: Union[str, Path]):
+        """
+        Args:
+            filename: The SQLite file to store the mappings in, this will be created if it does not exist.
+        """
+        self.filename = str(filename)
+        with closing(sqlite3.connect(self.filename)) as db, db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS mappings (settings TEXT, ligand_a TEXT, ligand_b TEXT, mappings TEXT, "
+                "PRIMARY KEY (settings, ligand_a, ligand_b))"
+            )
+
+    def get(self, settings_key: str) -> dict[tuple[str, str], list]:
+        """
+        Get all the stored mappings made with the given settings.
+
+        Args:
+            settings_key: The key of the mapper and scorer settings.
+
+        Returns:
+            A dict of the (ligand_a, ligand_b) component keys to a list of (atom map, score) tuples.
+        """
+        with closing(sqlite3.connect(self.filename)) as db:
+            rows = db.execute(
+                "SELECT ligand_a, ligand_b, mappings FROM mappings WHERE settings = ?",
+                (settings_key,),
+            ).fetchall()
+        return {
+            (ligand_a, ligand_b): [
+                (dict(atom_map), score) for atom_map, score in json.loads(mappings)
+            ]
+            for ligand_a, ligand_b, mappings in rows
+        }
+
+    def put(self, settings_key: str, mappings: dict[tuple[str, str], list]):
+        """
+        Store the mappings made with the given settings.
+
+        Args:
+            settings_key: The key of the mapper and scorer settings.
+            mappings: A dict of the (ligand_a, ligand_b) component keys to a list of (atom map, score) tuples.
+        """
+        rows = [
+            (
+                settings_key,
+                ligand_a,
+                ligand_b,
+                # mappers can return numpy indices and scores which json can't handle
+                json.dumps(
+                    [
+                        ([(int(a), int(b)) for a, b in atom_map.items()], float(score))
+                        for atom_map, score in pair_maps
+                    ]
+                ),
+            )
+            for (ligand_a, ligand_b), pair_maps in mappings.items()
+        ]
+        with closing(sqlite3.connect(self.filename)) as db, db:
+            db.executemany("INSERT OR REPLACE INTO mappings VALUES (?, ?, ?, ?)", rows)
+
+
+def _map_and_score_pairs(
+    mapper, scorer: Callable, pairs: list[tuple[openfe.SmallMoleculeComponent, ...]]
+) -> dict[tuple[str, str], list]:
+    """
+    Generate and score all the suggested atom mappings for each pair of ligands.
+
+    Returns:
+        A dict of the (ligand_a, ligand_b) component keys to a list of (atom map, score) tuples.
+    """
+    results = {}
+    for ligand_a, ligand_b in pairs:
+        results[(str(ligand_a.key), str(ligand_b.key))] = [
+            (dict(mapping.componentA_to_componentB), scorer(mapping))
+            for mapping in mapper.suggest_mappings(ligand_a, ligand_b)
+        ]
+    return results
+
+
+class _PrecomputedMapper:
+    """
+    An atom mapper which can be passed to the openfe planning functions in place of a real mapper, which returns
+    pre-computed mappings annotated with their score.
+    """
+
+    def __init__(self, mappings: dict[tuple[str, str], list]):
+        self.mappings = mappings
+
+    def suggest_mappings(
+        self,
+        componentA: openfe.SmallMoleculeComponent,
+        componentB: openfe.SmallMoleculeComponent,
+    ):
+        for atom_map, score in self.mappings.get(
+            (str(componentA.key), str(componentB.key)), []
+        ):
+            yield openfe.LigandAtomMapping(
+                componentA=componentA,
+                componentB=componentB,
+                componentA_to_componentB=atom_map,
+                annotations={"score": score},
+            )
+
+
+def _precomputed_score(mapping: openfe.LigandAtomMapping) -> float:
+    return mapping.annotations["score"]
+
+
 class _NetworkPlannerSettings(_SchemaBase):
     """
     The Network planner settings which configure how the FEC networks should be constructed.
@@ -217,10 +346,83 @@ class NetworkPlanner(_NetworkPlannerSettings):
         else:
             return openfe.perses_scorers.default_perses_scorer
 
+    def _mapping_settings_key(self) -> str:
+        """Get a key for the atom mapper settings, scorer and software versions which produce a set of mappings."""
+        settings = {
+            "atom_mapping_engine": self.atom_mapping_engine.dict(),
+            "scorer": self.scorer,
+            "provenance": self.atom_mapping_engine.provenance(),
+        }
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+    def _map_all_pairs(
+        self,
+        ligands: list[openfe.SmallMoleculeComponent],
+        processors: int = 1,
+        mapping_cache: Optional[AtomMappingCache] = None,
+    ) -> _PrecomputedMapper:
+        """
+        Map and score every pair of ligands in the order the openfe planning functions visit them, using a pool of
+        processes and skipping any pairs already in the mapping cache.
+
+        Args:
+            ligands: The ligands to map between.
+            processors: The number of processes to map the pairs over.
+            mapping_cache: The cache to read existing mappings from and write new mappings to.
+
+        Returns:
+            A mapper which returns the pre-computed mappings for each pair.
+        """
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        mapper = self.atom_mapping_engine.get_mapper()
+        if isinstance(mapper, openfe.LomapAtomMapper):
+            # openfe seeds lomap with the common core of all ligands to speed up the MCS searches, as the seed only
+            # speeds up the search it is not part of the settings key so adding ligands doesn't invalidate the cache
+            from openfe.setup.ligand_network_planning import _hasten_lomap
+
+            mapper = _hasten_lomap(mapper, ligands)
+        scorer = self._get_scorer()
+
+        settings_key = self._mapping_settings_key()
+        mappings = mapping_cache.get(settings_key) if mapping_cache else {}
+        new_pairs = [
+            (ligand_a, ligand_b)
+            for ligand_a, ligand_b in itertools.combinations(ligands, 2)
+            if (str(ligand_a.key), str(ligand_b.key)) not in mappings
+        ]
+
+        def _store(new_mappings):
+            mappings.update(new_mappings)
+            # write as we go so an interrupted run can be resumed
+            if mapping_cache is not None:
+                mapping_cache.put(settings_key, new_mappings)
+
+        if processors > 1 and len(new_pairs) > 1:
+            chunk_size = max(1, -(-len(new_pairs) // (processors * 4)))
+            with ProcessPoolExecutor(max_workers=processors) as pool:
+                work_list = [
+                    pool.submit(
+                        _map_and_score_pairs,
+                        mapper=mapper,
+                        scorer=scorer,
+                        pairs=new_pairs[i : i + chunk_size],
+                    )
+                    for i in range(0, len(new_pairs), chunk_size)
+                ]
+                for work in as_completed(work_list):
+                    _store(work.result())
+        elif new_pairs:
+            _store(_map_and_score_pairs(mapper=mapper, scorer=scorer, pairs=new_pairs))
+
+        return _PrecomputedMapper(mappings=mappings)
+
     def generate_network(
         self,
         ligands: list[Ligand],
         central_ligand: Optional[Ligand] = None,
+        processors: int = 1,
+        mapping_cache: Optional[Union[str, Path]] = None,
     ) -> PlannedNetwork:
         """
         Generate a network with the configured settings.
@@ -230,6 +432,10 @@ class NetworkPlanner(_NetworkPlannerSettings):
         Args:
             ligands: The set of ligands which should be included in the network.
             central_ligand: The ligand which should be considered as the central node in a radial network
+            processors: The number of processes used to map and score all pairs of ligands for planning methods which
+                consider every pair.
+            mapping_cache: An optional SQLite file used to store the scored mappings between pairs of ligands for
+                planning methods which consider every pair, so only new pairs are mapped when re-planning.
         """
 
         # validate the inputs
@@ -254,6 +460,21 @@ class NetworkPlanner(_NetworkPlannerSettings):
         if self.network_planning_method.type == "RadialPlanner":
             planner_data["central_ligand"] = central_ligand.to_openfe()
 
+        if self.network_planning_method.all_pairs and (
+            processors > 1 or mapping_cache is not None
+        ):
+            # map and score all pairs up front, the planning function then picks the edges from these
+            planner_data["mappers"] = [
+                self._map_all_pairs(
+                    ligands=planner_data["ligands"],
+                    processors=processors,
+                    mapping_cache=(
+                        AtomMappingCache(mapping_cache) if mapping_cache else None
+                    ),
+                )
+            ]
+            planner_data["scorer"] = _precomputed_score
+
         network_method = self.network_planning_method.get_planning_function()
         ligand_network = network_method(**planner_data)
 
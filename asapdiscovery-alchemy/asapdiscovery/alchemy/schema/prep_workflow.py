@@ -315,6 +315,7 @@ class AlchemyPrepWorkflow(_AlchemyPrepBase):
         reference_complex: PreppedComplex,
         processors: int = 1,
         reference_ligands: Optional[list[Ligand]] = None,
+        charge_results_file: Optional[str] = None,
     ) -> AlchemyDataSet:
         """
         Run the set of input ligands through the state enumeration and pose generation workflow to create a set of posed
@@ -333,6 +334,8 @@ class AlchemyPrepWorkflow(_AlchemyPrepBase):
             processors: The number of parallel processors that should be used to run the workflow.
             reference_ligands: The list of reference ligands with experimental data which we should also generate
                 poses for if `self.n_references` > 0.
+            charge_results_file: The name of a file the partial charges are saved to as they are generated, if the
+                file already exists the ligands charged in a previous run will not be charged again.
 
         Returns:
             A prepared AlchemyDataset with state expanded ligands posed in the receptor ready for FEC, along with the
@@ -360,7 +363,7 @@ class AlchemyPrepWorkflow(_AlchemyPrepBase):
                 f"Running state expansion using {expansion_engine.expander_type}"
             )
             stage_status.start()
-            ligands = expansion_engine.expand(ligands)
+            ligands = expansion_engine.expand(ligands, processors=processors)
             # log the software versions used
             provenance[expansion_engine.expander_type] = expansion_engine.provenance()
             stage_status.stop()
@@ -468,7 +471,9 @@ class AlchemyPrepWorkflow(_AlchemyPrepBase):
             console.print(f"Generating charges locally using {self.charge_method}")
 
             posed_ligands, charge_fails = self.charge_method.generate_charges(
-                ligands=posed_ligands, processors=processors
+                ligands=posed_ligands,
+                processors=processors,
+                partial_results=charge_results_file,
             )
             if charge_fails:
                 # add the new fails to the rest
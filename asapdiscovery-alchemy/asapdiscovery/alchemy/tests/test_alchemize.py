@@ -1,6 +1,8 @@
 from glob import glob
 
+import pytest
 from asapdiscovery.alchemy.alchemize import (
+    ScaffoldMatcher,
     calc_mcs_residuals,
     compute_clusters,
     partial_sanitize,
@@ -102,6 +104,54 @@ def test_rescue_outsiders(test_ligands):
     assert len(resc_alchemical_clusters) == 2
 
 
+def test_rescue_outsiders_parallel(test_ligands):
+    """Make sure rescuing outsiders in parallel gives the same clusters as in serial."""
+    serial_outsiders, serial_clusters = rescue_outsiders(
+        *compute_clusters(test_ligands, outsider_number=2),
+        max_transform=9,
+        processors=1,
+    )
+    parallel_outsiders, parallel_clusters = rescue_outsiders(
+        *compute_clusters(test_ligands, outsider_number=2),
+        max_transform=9,
+        processors=2,
+    )
+    assert list(parallel_outsiders.keys()) == list(serial_outsiders.keys())
+    assert {
+        scaffold: [ligand.smiles for ligand in ligands]
+        for scaffold, ligands in parallel_clusters.items()
+    } == {
+        scaffold: [ligand.smiles for ligand in ligands]
+        for scaffold, ligands in serial_clusters.items()
+    }
+
+
+@pytest.mark.parametrize("max_transform", [2, 9, 30])
+def test_scaffold_matcher_pruning(test_ligands, max_transform):
+    """Make sure pruning with the heavy atom bounds does not change the best match."""
+    outsiders, alchemical_clusters = compute_clusters(test_ligands, outsider_number=2)
+    matcher = ScaffoldMatcher(list(alchemical_clusters.keys()))
+
+    for scaffold in outsiders:
+        singleton = partial_sanitize(Chem.MolFromSmiles(scaffold, sanitize=False))
+        expected = None
+        best_total = max_transform * 2
+        for cluster_scaffold in alchemical_clusters:
+            cluster = partial_sanitize(
+                Chem.MolFromSmiles(cluster_scaffold, sanitize=False)
+            )
+            cluster_residual, singleton_residual = calc_mcs_residuals(
+                cluster, singleton
+            )
+            if cluster_residual > max_transform or singleton_residual > max_transform:
+                continue
+            if cluster_residual + singleton_residual < best_total:
+                best_total = cluster_residual + singleton_residual
+                expected = cluster_scaffold
+
+        assert matcher.best_match(scaffold, max_transform) == expected
+
+
 def test_write_clusters(test_ligands, tmp_path):
     # generate clusters and write them to a tmp dir
     outsiders, alchemical_clusters = compute_clusters(test_ligands, outsider_number=2)
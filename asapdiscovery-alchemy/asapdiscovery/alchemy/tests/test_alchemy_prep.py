@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from asapdiscovery.alchemy.schema.prep_workflow import (
     AlchemyPrepWorkflow,
@@ -236,3 +237,72 @@ def test_prep_with_charges(mac1_complex):
         alchemy_dataset.posed_ligands[0].charge_provenance.dict(exclude={"type"})
         == workflow.charge_method.provenance()
     )
+
+
+def test_charge_resume_from_partial_results(tmp_path, monkeypatch):
+    """Make sure charges generated in parallel are saved to the partial results file and
+    reused when the run is repeated."""
+    from asapdiscovery.alchemy.schema import charge as charge_module
+    from asapdiscovery.alchemy.schema.charge import OpenFFCharges
+
+    names = ["lig_0", "lig_1", "lig_2"]
+    smiles = ["CCO", "c1ccccc1O", "CC(=O)N"]
+    ligands = [
+        Ligand.from_smiles(smi, compound_name=name) for name, smi in zip(names, smiles)
+    ]
+    partial_results = tmp_path / "charges.jsonl"
+    charge_method = OpenFFCharges(charge_method="am1bcc")
+
+    charged, failed = charge_method.generate_charges(
+        ligands=[ligand.copy(deep=True) for ligand in ligands],
+        processors=2,
+        chunk_size=1,
+        partial_results=partial_results,
+    )
+    assert not failed
+    # the ligands are returned in the input order
+    assert [ligand.compound_name for ligand in charged] == ["lig_0", "lig_1", "lig_2"]
+    assert len(partial_results.read_text().splitlines()) == 3
+
+    # no new charges should be needed when resuming
+    def _fail(chunk):
+        raise RuntimeError("Ligands should not be charged again")
+
+    monkeypatch.setattr(charge_module, "_charge_chunk", _fail)
+    resumed, failed = charge_method.generate_charges(
+        ligands=[ligand.copy(deep=True) for ligand in ligands],
+        processors=1,
+        partial_results=partial_results,
+    )
+    assert not failed
+    for ligand, resumed_ligand in zip(charged, resumed):
+        assert (
+            resumed_ligand.tags["atom.dprop.PartialCharge"]
+            == ligand.tags["atom.dprop.PartialCharge"]
+        )
+        assert resumed_ligand.charge_provenance == ligand.charge_provenance
+
+
+def test_partial_charge_results_recovery(tmp_path):
+    """Make sure a partial line from an interrupted run is skipped without losing the
+    next record and that charges with a different provenance are not reused."""
+    from asapdiscovery.alchemy.schema.charge import _PartialChargeResults
+
+    partial_results = tmp_path / "charges.jsonl"
+    provenance = {"protocol": {"charge_method": "am1bcc"}, "provenance": {}}
+    result_store = _PartialChargeResults(partial_results, provenance=provenance)
+    result_store.append({"a": np.array([0.1, -0.1])})
+    # simulate a run interrupted part way through writing a record
+    with partial_results.open("a") as f:
+        f.write('{"key": "b", "prov')
+
+    result_store.append({"c": np.array([0.2, -0.2])})
+    charges = result_store.load()
+    assert sorted(charges) == ["a", "c"]
+    assert np.allclose(charges["c"], [0.2, -0.2])
+
+    other_store = _PartialChargeResults(
+        partial_results,
+        provenance={"protocol": {"charge_method": "am1bccelf10"}, "provenance": {}},
+    )
+    assert other_store.load() == {}
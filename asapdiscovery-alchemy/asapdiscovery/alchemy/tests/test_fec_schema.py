@@ -1,8 +1,10 @@
 import functools
 
+import numpy as np
 import openfe
 import pytest
 from alchemiscale import Scope, ScopedKey
+from asapdiscovery.alchemy.schema import network as network_module
 from asapdiscovery.alchemy.schema.atom_mapping import (
     KartografAtomMapper,
     LomapAtomMapper,
@@ -12,10 +14,12 @@ from asapdiscovery.alchemy.schema.fec import (
     AdaptiveSettings,
     AlchemiscaleResults,
     FreeEnergyCalculationFactory,
+    FreeEnergyCalculationNetwork,
     SolventSettings,
     TransformationResult,
 )
 from asapdiscovery.alchemy.schema.network import (
+    AtomMappingCache,
     CustomNetworkPlanner,
     MaximalPlanner,
     MinimalRedundantPlanner,
@@ -182,6 +186,58 @@ def test_generate_network_lomap(network_type, tyk2_ligands):
     assert isinstance(openfe_ligands[0], openfe.SmallMoleculeComponent)
 
 
+def _edges(ligand_network):
+    return {
+        (
+            edge.componentA.name,
+            edge.componentB.name,
+            tuple(sorted(edge.componentA_to_componentB.items())),
+            edge.annotations["score"],
+        )
+        for edge in ligand_network.edges
+    }
+
+
+def test_generate_network_parallel_cached(tyk2_ligands, tmp_path, monkeypatch):
+    """Make sure planning with pre-computed pairwise mappings gives the same network as openfe, and re-planning with
+    a different topology only uses the cached mappings."""
+
+    planner = NetworkPlanner(network_planning_method=MinimalSpanningPlanner())
+    expected = planner.generate_network(ligands=tyk2_ligands).to_ligand_network()
+
+    cache_file = tmp_path.joinpath("mappings.sqlite")
+    network = planner.generate_network(
+        ligands=tyk2_ligands, processors=2, mapping_cache=cache_file
+    ).to_ligand_network()
+    assert _edges(network) == _edges(expected)
+
+    # every pair should now be stored
+    cache = AtomMappingCache(cache_file)
+    stored = cache.get(planner._mapping_settings_key())
+    assert len(stored) == len(tyk2_ligands) * (len(tyk2_ligands) - 1) // 2
+
+    # re-plan a maximal network without mapping any pairs
+    def _fail(*args, **kwargs):
+        raise AssertionError("pairs should be read from the cache")
+
+    monkeypatch.setattr(network_module, "_map_and_score_pairs", _fail)
+    maximal_planner = NetworkPlanner(network_planning_method=MaximalPlanner())
+    maximal = maximal_planner.generate_network(
+        ligands=tyk2_ligands, mapping_cache=cache_file
+    ).to_ligand_network()
+    assert len(maximal.edges) == len(stored)
+
+
+def test_atom_mapping_cache_numpy(tmp_path):
+    """Make sure mappings with numpy indices and scores can be stored."""
+    cache = AtomMappingCache(tmp_path / "mappings.sqlite")
+    cache.put(
+        "settings",
+        {("a", "b"): [({np.int64(0): np.int64(1), 2: 3}, np.float32(0.5))]},
+    )
+    assert cache.get("settings") == {("a", "b"): [({0: 1, 2: 3}, 0.5)]}
+
+
 def test_plan_radial_error(tyk2_ligands):
     """Make sure an error is raised if we try and plan a radial network with no central ligand"""
     planner = NetworkPlanner(network_planning_method=RadialPlanner())
@@ -428,6 +484,41 @@ def test_fec_with_bespoke_parameters(tyk2_fec_network):
         assert off_param.k1.m == 10.0
 
 
+def test_edge_forcefields_shared(tyk2_fec_network):
+    """
+    Make sure edges with the same bespoke ligands share a single force field string, and that building the force
+    fields for the whole network matches building them one edge at a time.
+    """
+    fec_network = tyk2_fec_network.copy(deep=True)
+    bespoke_parameters = BespokeParameters(
+        base_force_field=fec_network.forcefield_settings.small_molecule_forcefield
+    )
+    bespoke_parameters.parameters.append(
+        BespokeParameter(
+            interaction="ProperTorsions",
+            smirks="[#17]-[#6a:1]@[#6a:2]-[#6:3]=[#8:4]",
+            values={"k1": 10, "k2": 1, "k3": 2, "k4": 3},
+        )
+    )
+    # only one ligand has bespoke parameters
+    bespoke_ligand = fec_network.network.ligands[0]
+    bespoke_ligand.bespoke_parameters = bespoke_parameters
+
+    edges = list(fec_network.network.to_ligand_network().edges)
+    edge_forcefields = fec_network._get_edge_forcefields(edges=edges)
+
+    bespoke_forcefields = []
+    for edge, ff_string in zip(edges, edge_forcefields):
+        assert ff_string == fec_network._inject_bespoke_parameters(edge=edge)
+        if bespoke_ligand.compound_name in (edge.componentA.name, edge.componentB.name):
+            bespoke_forcefields.append(ff_string)
+        else:
+            assert ff_string.endswith(".offxml")
+    # all edges with the bespoke ligand share one object
+    assert len(bespoke_forcefields) > 0
+    assert all(ff_string is bespoke_forcefields[0] for ff_string in bespoke_forcefields)
+
+
 def test_results_to_cinnabar_missing_phase(tyk2_fec_network):
     """Make sure an error is raised if we try and convert to a cinnabar results with missing simulated phases."""
 
@@ -536,3 +627,110 @@ def test_results_to_cinnabar_with_prediction(tyk2_result_network):
             uncertainty, abs=1e-6
         )
         assert relative_row["source"] == "calculated"
+
+
+def _clean_results_reference(results, ddg_outlier_threshold):
+    """The original loop based cleaning used by `clean_result_network`, kept to check
+    the vectorised version against."""
+    import math
+    from collections import defaultdict
+
+    results = [result for result in results if not result.estimate.m == 0.0]
+    grouped = defaultdict(list)
+    for result in results:
+        grouped[f"{result.ligand_a}~{result.ligand_b}_{result.phase}"].append(result)
+    deduped = []
+    for group in grouped.values():
+        if len(group) > 1:
+            deduped.append(
+                TransformationResult(
+                    estimate=np.mean([result.estimate.m for result in group]),
+                    uncertainty=np.mean([result.uncertainty.m for result in group]),
+                    **group[0].dict(exclude={"estimate", "uncertainty"}),
+                )
+            )
+        else:
+            deduped.append(group[0])
+    denand = [
+        result
+        for result in deduped
+        if not math.isnan(result.estimate.m) and not math.isnan(result.uncertainty.m)
+    ]
+    complex_legs = [result for result in denand if result.phase == "complex"]
+    solvent_legs = [result for result in denand if result.phase == "solvent"]
+    cleaned = []
+    for res_complex in complex_legs:
+        for res_solvent in solvent_legs:
+            if (
+                res_complex.ligand_a == res_solvent.ligand_a
+                and res_complex.ligand_b == res_solvent.ligand_b
+            ):
+                if (
+                    abs(res_solvent.estimate.m - res_complex.estimate.m)
+                    < ddg_outlier_threshold
+                ):
+                    cleaned.extend([res_solvent, res_complex])
+    return cleaned
+
+
+def test_clean_result_network_matches_reference(tyk2_result_network, tmp_path):
+    """Make sure the vectorised result cleaning gives the same results, in the same
+    order, as the original loop based cleaning."""
+    from asapdiscovery.alchemy.predict import clean_result_network
+
+    results = list(tyk2_result_network.results.results)
+    complex_legs = [result for result in results if result.phase == "complex"]
+    solvent_legs = [result for result in results if result.phase == "solvent"]
+
+    def _modified(result, **kwargs):
+        data = result.dict()
+        data.update(kwargs)
+        return TransformationResult(**data)
+
+    results.extend(
+        [
+            # replicates of an edge which should be averaged
+            _modified(complex_legs[0], estimate=complex_legs[0].estimate.m + 1.0),
+            _modified(solvent_legs[0], uncertainty=0.5),
+            # a replicate with DG == 0.0 which should be dropped
+            _modified(complex_legs[1], estimate=0.0),
+            # a NaN replicate which removes the edge
+            _modified(solvent_legs[2], estimate=np.nan),
+            # an outlier edge
+            _modified(
+                complex_legs[3],
+                ligand_a="outlier_a",
+                ligand_b="outlier_b",
+                estimate=-30.0,
+            ),
+            _modified(
+                solvent_legs[3],
+                ligand_a="outlier_a",
+                ligand_b="outlier_b",
+                estimate=1.0,
+            ),
+            # a complex leg with no solvent leg
+            _modified(complex_legs[4], ligand_a="missing_a", ligand_b="missing_b"),
+        ]
+    )
+    data = tyk2_result_network.dict(exclude={"results"})
+    data["results"] = AlchemiscaleResults(
+        results=results, network_key=tyk2_result_network.results.network_key
+    ).dict()
+    network_file = tmp_path / "network.json"
+    FreeEnergyCalculationNetwork.parse_obj(data).to_file(network_file)
+
+    expected = _clean_results_reference(results, ddg_outlier_threshold=15)
+    cleaned = clean_result_network(network_file, ddg_outlier_threshold=15)
+
+    assert len(cleaned.results.results) == len(expected)
+    assert len(expected) < len(results)
+    for result, ref in zip(cleaned.results.results, expected):
+        assert (result.ligand_a, result.ligand_b, result.phase) == (
+            ref.ligand_a,
+            ref.ligand_b,
+            ref.phase,
+        )
+        assert result.estimate.m == pytest.approx(ref.estimate.m)
+        assert result.uncertainty.m == pytest.approx(ref.uncertainty.m)
+    assert cleaned.results.network_key == tyk2_result_network.results.network_key
@@ -169,6 +169,103 @@ def test_collect_results(monkeypatch, tyk2_fec_network, alchemiscale_helper):
     )  # divide by 2 as we have a node for the solvent and complex phase
 
 
+class FakeAlchemiscaleClient:
+    """A local stand-in for the alchemiscale client which serves results for a network's transformations."""
+
+    def __init__(self, alchem_network, scope):
+        self.transformations = {
+            ScopedKey(gufe_key=edge.key, **scope.dict()): edge
+            for edge in alchem_network.edges
+        }
+        # the number of complete tasks and the estimate of each transformation
+        self.n_complete = {key: 1 for key in self.transformations}
+        self.estimates = {
+            key: 3 if "complex" in edge.name else 1
+            for key, edge in self.transformations.items()
+        }
+        self.fetched = []
+        self.status_requests = []
+
+    def get_network_transformations(self, network):
+        return list(self.transformations)
+
+    def get_network_status(self, network, visualize=True):
+        assert not visualize
+        return {"complete": sum(self.n_complete.values())}
+
+    def get_transformation_status(self, transformation, visualize=True):
+        assert not visualize
+        self.status_requests.append(transformation)
+        return {"complete": self.n_complete[transformation]}
+
+    def get_transformation_results(self, transformation, **kwargs):
+        self.fetched.append(transformation)
+        edge = self.transformations[transformation]
+        task_result = ProtocolUnitResult(
+            name=edge.name,
+            source_key=transformation,
+            inputs={"stateA": edge.stateA, "stateB": edge.stateB},
+            outputs={
+                "unit_estimate": self.estimates[transformation]
+                * OFFUnit.kilocalorie
+                / OFFUnit.mole,
+                "unit_estimate_error": 0.1 * OFFUnit.kilocalorie / OFFUnit.mole,
+            },
+        )
+        return RelativeHybridTopologyProtocolResult(**{edge.name: [task_result]})
+
+    def get_network_results(self, network, **kwargs):
+        return {
+            key: self.get_transformation_results(key) for key in self.transformations
+        }
+
+
+def test_collect_results_incremental(tyk2_fec_network, alchemiscale_helper, tmp_path):
+    """Make sure gathering with a result store only fetches transformations with new results."""
+
+    client = alchemiscale_helper
+    scope = Scope(org="asap", campaign="testing", project="tyk2")
+    alchem_network = tyk2_fec_network.to_alchemical_network()
+    network_key = ScopedKey(gufe_key=alchem_network.key, **scope.dict())
+    result_network = FreeEnergyCalculationNetwork(
+        **tyk2_fec_network.dict(exclude={"results"}),
+        results=AlchemiscaleResults(network_key=network_key),
+    )
+    fake_client = FakeAlchemiscaleClient(alchem_network=alchem_network, scope=scope)
+    client._client = fake_client
+    result_store = tmp_path.joinpath("result_store.json")
+
+    # the first gather has to fetch everything and should match the full gather
+    full = client.collect_results(planned_network=result_network)
+    fake_client.fetched = []
+    first = client.collect_results(
+        planned_network=result_network, result_store=result_store
+    )
+    assert len(fake_client.fetched) == len(fake_client.transformations)
+    assert first.results.results == full.results.results
+
+    # nothing has changed so nothing should be fetched, or even checked per transformation
+    fake_client.fetched = []
+    fake_client.status_requests = []
+    second = client.collect_results(
+        planned_network=result_network, result_store=result_store
+    )
+    assert fake_client.fetched == []
+    assert fake_client.status_requests == []
+    assert second.results.results == first.results.results
+
+    # a new task completes for one transformation so only it should be fetched
+    updated = list(fake_client.transformations)[0]
+    fake_client.n_complete[updated] += 1
+    fake_client.estimates[updated] = 5
+    third = client.collect_results(
+        planned_network=result_network, result_store=result_store
+    )
+    assert fake_client.fetched == [updated]
+    assert third.results.results[0].estimate.m == 5
+    assert third.results.results[1:] == first.results.results[1:]
+
+
 def test_restart_tasks(monkeypatch, tyk2_fec_network, alchemiscale_helper):
     client = alchemiscale_helper
 
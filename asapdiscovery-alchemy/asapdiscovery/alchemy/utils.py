@@ -1,3 +1,4 @@
+from pathlib import Path
 from typing import TYPE_CHECKING, Optional
 
 import numpy as np
@@ -6,6 +7,8 @@ from asapdiscovery.alchemy.interfaces import AlchemiscaleSettings
 from asapdiscovery.alchemy.schema.fec import (
     AlchemiscaleFailure,
     AlchemiscaleResults,
+    AlchemiscaleResultStore,
+    CollectedTransformation,
     FreeEnergyCalculationNetwork,
     TransformationResult,
 )
@@ -209,10 +212,135 @@ class AlchemiscaleHelper:
 
         return restarted_tasks
 
+    @staticmethod
+    def _to_transformation_result(raw_result) -> TransformationResult:
+        """
+        Format a raw alchemiscale transformation result into our custom result schema.
+        """
+        estimate = raw_result.get_estimate()
+        uncertainty = raw_result.get_uncertainty()
+        # if there is a single repeat the error is 0.0 so extract the mbar error
+        if uncertainty.m == 0.0:
+            uncertainty = [
+                edge[0].outputs["unit_estimate_error"]
+                for edge in raw_result.data.values()
+            ][0]
+
+        # work out the name of the molecules and the phase of the calculation
+        individual_runs = list(raw_result.data.values())
+        # track the phase to correctly work out the total relative energy as complex - solvent
+        if "protein" in individual_runs[0][0].inputs["stateA"].components:
+            phase = "complex"
+        else:
+            phase = "solvent"
+
+        # extract the names of the end state ligands to build the affinity estimate graph
+        name_a = individual_runs[0][0].inputs["stateA"].components["ligand"].name
+        name_b = individual_runs[0][0].inputs["stateB"].components["ligand"].name
+
+        # if end state ligands did not have names, use SMILES instead
+        if not name_a:
+            name_a = individual_runs[0][0].inputs["stateA"].components["ligand"].smiles
+        if not name_b:
+            name_b = individual_runs[0][0].inputs["stateB"].components["ligand"].smiles
+
+        return TransformationResult(
+            ligand_a=name_a,
+            ligand_b=name_b,
+            phase=phase,
+            estimate=estimate,
+            uncertainty=uncertainty,
+        )
+
+    def _collect_results_incremental(
+        self, network_key: ScopedKey, result_store: str, n_workers: int = 4
+    ) -> list[TransformationResult]:
+        """
+        Collect the results for the network, only fetching the transformations which have completed tasks since they
+        were last collected into the local result store.
+
+        Args:
+            network_key: The `alchemiscale` network key for the network whose results we should collect.
+            result_store: The JSON file of the local result store, this is created if it does not exist and updated
+                with the newly collected results.
+            n_workers: The number of threads used to query alchemiscale concurrently.
+
+        Returns:
+            The results of all transformations in the network with results.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        if Path(result_store).exists():
+            store = AlchemiscaleResultStore.from_file(result_store)
+            if str(store.network_key) != str(network_key):
+                raise ValueError(
+                    f"The result store {result_store} holds results for the network {store.network_key} not {network_key}."
+                )
+        else:
+            store = AlchemiscaleResultStore(network_key=network_key)
+
+        transformations = list(self._client.get_network_transformations(network_key))
+
+        def _n_complete(transformation: ScopedKey) -> int:
+            return self._client.get_transformation_status(
+                transformation, visualize=False
+            ).get("complete", 0)
+
+        def _fetch(transformation: ScopedKey) -> Optional[TransformationResult]:
+            raw_result = self._client.get_transformation_results(
+                transformation, visualize=False
+            )
+            if raw_result is None:
+                return None
+            return self._to_transformation_result(raw_result)
+
+        # a single network level status tells us if any tasks have completed since the last gather, if not we can
+        # skip asking for the status of every transformation
+        network_complete = self._client.get_network_status(
+            network_key, visualize=False
+        ).get("complete", 0)
+        collected_complete = sum(
+            store.transformations[str(transformation)].n_complete
+            for transformation in transformations
+            if str(transformation) in store.transformations
+        )
+        if network_complete == collected_complete:
+            candidates = []
+        else:
+            candidates = transformations
+
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            # the number of complete tasks only changes when there are new results to fetch
+            n_complete = dict(zip(candidates, pool.map(_n_complete, candidates)))
+            to_fetch = []
+            for transformation in candidates:
+                collected = store.transformations.get(str(transformation))
+                if n_complete[transformation] > 0 and (
+                    collected is None
+                    or collected.n_complete != n_complete[transformation]
+                ):
+                    to_fetch.append(transformation)
+
+            for transformation, result in zip(to_fetch, pool.map(_fetch, to_fetch)):
+                store.transformations[str(transformation)] = CollectedTransformation(
+                    n_complete=n_complete[transformation], result=result
+                )
+
+        store.to_file(result_store)
+
+        results = []
+        for transformation in transformations:
+            collected = store.transformations.get(str(transformation))
+            if collected is not None and collected.result is not None:
+                results.append(collected.result)
+        return results
+
     def collect_results(
         self,
         planned_network: Optional[FreeEnergyCalculationNetwork] = None,
         network_key: Optional[str] = None,
+        result_store: Optional[str] = None,
+        n_workers: int = 4,
     ) -> FreeEnergyCalculationNetwork:
         """
         Collect the results for the given network.
@@ -220,13 +348,13 @@ class AlchemiscaleHelper:
         Args:
             planned_network: The network whose results we should collect.
             network_key: The `alchemsicale` network key for the network whose results we should collect.
+            result_store: An optional JSON file used to store the results already collected for the network, if given
+                only transformations with new completed tasks are fetched from alchemiscale.
+            n_workers: The number of threads used to query alchemiscale concurrently when using a result store.
 
         Returns:
             A FreeEnergyCalculationNetwork with all current results. If any are missing and allow missing is false an error is raised.
         """
-        # collect results following the notebook from openFE
-        results = []
-
         if network_key:
             raise NotImplementedError(
                 "ASAP-Alchemy gather using network keys (-nk) is currently not implemented."
@@ -242,55 +370,21 @@ class AlchemiscaleHelper:
         if planned_network:
             network_key = planned_network.results.network_key
 
-        alchemiscale_network_results = self._client.get_network_results(
-            network_key
-        ).items()
-        # use the process pool api point to gather all transformations for the network
-        for _, raw_result in alchemiscale_network_results:
-            if raw_result is None:
-                continue
-            # format into our custom result schema and save
-            estimate = raw_result.get_estimate()
-            uncertainty = raw_result.get_uncertainty()
-            # if there is a single repeat the error is 0.0 so extract the mbar error
-            if uncertainty.m == 0.0:
-                uncertainty = [
-                    edge[0].outputs["unit_estimate_error"]
-                    for edge in raw_result.data.values()
-                ][0]
-
-            # work out the name of the molecules and the phase of the calculation
-            individual_runs = list(raw_result.data.values())
-            # track the phase to correctly work out the total relative energy as complex - solvent
-            if "protein" in individual_runs[0][0].inputs["stateA"].components:
-                phase = "complex"
-            else:
-                phase = "solvent"
-
-            # extract the names of the end state ligands to build the affinity estimate graph
-            name_a = individual_runs[0][0].inputs["stateA"].components["ligand"].name
-            name_b = individual_runs[0][0].inputs["stateB"].components["ligand"].name
-            # print(individual_runs[0][0].inputs["stateB"].components["ligand"], name_b)
-
-            # if end state ligands did not have names, use SMILES instead
-            if not name_a:
-                name_a = (
-                    individual_runs[0][0].inputs["stateA"].components["ligand"].smiles
-                )
-            if not name_b:
-                name_b = (
-                    individual_runs[0][0].inputs["stateB"].components["ligand"].smiles
-                )
-
-            results.append(
-                TransformationResult(
-                    ligand_a=name_a,
-                    ligand_b=name_b,
-                    phase=phase,
-                    estimate=estimate,
-                    uncertainty=uncertainty,
-                )
+        if result_store is not None:
+            results = self._collect_results_incremental(
+                network_key=network_key, result_store=result_store, n_workers=n_workers
             )
+        else:
+            # collect results following the notebook from openFE
+            alchemiscale_network_results = self._client.get_network_results(
+                network_key
+            ).items()
+            # use the process pool api point to gather all transformations for the network
+            results = [
+                self._to_transformation_result(raw_result)
+                for _, raw_result in alchemiscale_network_results
+                if raw_result is not None
+            ]
 
         # save to a new results object as they are frozen
         alchem_results = AlchemiscaleResults(network_key=network_key, results=results)
@@ -0,0 +1,490 @@
+"""
+In-process detection of protein-ligand interactions, working directly on OEMol
+coordinates. Detects the same main interaction types as PLIP (hydrophobic contacts,
+hydrogen bonds, salt bridges, and pi-stacking) using PLIP's default geometric criteria,
+and reports each interaction in the same format as an entry in PLIP's XML report.
+Water bridges, pi-cation interactions, halogen bonds, and metal complexes are not
+detected, so PLIP remains the default wherever interactions are scored.
+
+Protein features are computed once per receptor and cached, and each pose only looks
+at the binding-site subset of protein atoms within BS_DIST of the ligand.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+from asapdiscovery.data.backend.openeye import oechem
+
+# Default geometric criteria, taken from PLIP's config
+BS_DIST = 7.5
+HYDROPH_DIST_MAX = 4.0
+HBOND_DIST_MAX = 4.1
+HBOND_DON_ANGLE_MIN = 100.0
+PISTACK_DIST_MAX = 5.5
+PISTACK_ANG_DEV = 30.0
+PISTACK_OFFSET_MAX = 2.0
+SALTBRIDGE_DIST_MAX = 5.5
+
+# Charged atoms in standard residues, same as PLIP (His is treated as positive)
+_POS_RESIDUE_ATOMS = {
+    "ARG": {"NE", "NH1", "NH2"},
+    "LYS": {"NZ"},
+    "HIS": {"ND1", "NE2"},
+}
+_NEG_RESIDUE_ATOMS = {"ASP": {"OD1", "OD2"}, "GLU": {"OE1", "OE2"}}
+
+# Aromatic rings in standard residues
+_RESIDUE_RINGS = {
+    "PHE": [("CG", "CD1", "CD2", "CE1", "CE2", "CZ")],
+    "TYR": [("CG", "CD1", "CD2", "CE1", "CE2", "CZ")],
+    "HIS": [("CG", "ND1", "CD2", "CE1", "NE2")],
+    "TRP": [
+        ("CG", "CD1", "NE1", "CE2", "CD2"),
+        ("CD2", "CE2", "CE3", "CZ2", "CZ3", "CH2"),
+    ],
+}
+
+# Order that interaction types appear in a PLIP report
+INTERACTION_TYPES = [
+    "hydrophobic_interaction",
+    "hydrogen_bond",
+    "salt_bridge",
+    "pi_stack",
+]
+
+# Cache of protein features, keyed by a hash of the protein coordinates
+_RECEPTOR_CACHE_SIZE = 16
+_receptor_cache = OrderedDict()
+
+
+def _get_coords(mol) -> np.ndarray:
+    """
+    Get all coordinates of an OEMol in one call, indexed by atom idx.
+    """
+    coords = oechem.OEFloatArray(3 * mol.GetMaxAtomIdx())
+    mol.GetCoords(coords)
+    return np.asarray(coords, dtype=np.float64).reshape((-1, 3))
+
+
+def _heavy_neighbors(atom):
+    return [nbr for nbr in atom.GetAtoms() if nbr.GetAtomicNum() != 1]
+
+
+def _is_hydrophobic(atom) -> bool:
+    # Carbon atoms only bonded to carbons and hydrogens
+    return atom.GetAtomicNum() == 6 and all(
+        nbr.GetAtomicNum() == 6 for nbr in _heavy_neighbors(atom)
+    )
+
+
+def _is_donor(atom) -> bool:
+    return atom.GetAtomicNum() in {7, 8} and atom.GetTotalHCount() > 0
+
+
+def _is_acceptor(atom) -> bool:
+    match atom.GetAtomicNum():
+        case 8:
+            return True
+        case 7:
+            # Only N without hydrogens and with a free lone pair
+            return (
+                atom.GetTotalHCount() == 0
+                and atom.GetFormalCharge() <= 0
+                and len(_heavy_neighbors(atom)) < 3
+            )
+        case _:
+            return False
+
+
+def _ring_geometry(coords: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get the center and unit normal of a ring from its atom coordinates.
+    """
+    center = coords.mean(axis=0)
+    # Normal is the direction of least variance
+    normal = np.linalg.svd(coords - center)[2][-1]
+    return center, normal / np.linalg.norm(normal)
+
+
+def _aromatic_rings(mol) -> list[list[int]]:
+    """
+    Find all 5- and 6-membered rings of aromatic atoms in a molecule, returned as
+    lists of atom idxs.
+    """
+    aromatic = {atom.GetIdx(): atom for atom in mol.GetAtoms() if atom.IsAromatic()}
+    nbrs = {
+        idx: [n.GetIdx() for n in atom.GetAtoms() if n.GetIdx() in aromatic]
+        for idx, atom in aromatic.items()
+    }
+
+    rings = set()
+
+    def _walk(start, path):
+        for nbr in nbrs[path[-1]]:
+            if nbr == start and len(path) >= 5:
+                rings.add(frozenset(path))
+            # Only walk to higher idxs so each ring is only found starting from its
+            #  lowest idx
+            elif nbr > start and nbr not in path and len(path) < 6:
+                _walk(start, path + [nbr])
+
+    for idx in aromatic:
+        _walk(idx, [idx])
+
+    return sorted(sorted(ring) for ring in rings)
+
+
+def _ligand_charged_groups(mol) -> list[tuple[int, list[int]]]:
+    """
+    Find charged (or ionizable) groups in a ligand, returned as a list of
+    (sign, [atom idxs]).
+    """
+    groups = []
+    for atom in mol.GetAtoms():
+        heavy = _heavy_neighbors(atom)
+        match atom.GetAtomicNum():
+            case 6:
+                # Carboxylic acids/carboxylates, and amidines/guanidines
+                o_nbrs = [n for n in heavy if n.GetAtomicNum() == 8]
+                n_nbrs = [n for n in heavy if n.GetAtomicNum() == 7]
+                if len(o_nbrs) == 2 and len(heavy) == 3:
+                    groups.append((-1, [n.GetIdx() for n in o_nbrs]))
+                elif (
+                    len(n_nbrs) >= 2
+                    and not atom.IsAromatic()
+                    and any(atom.GetBond(n).GetOrder() == 2 for n in n_nbrs)
+                    and all(len(_heavy_neighbors(n)) < 3 for n in n_nbrs)
+                ):
+                    groups.append((1, [n.GetIdx() for n in n_nbrs]))
+            case 15 | 16:
+                # Phosphates and sulfonates
+                o_nbrs = [n for n in heavy if n.GetAtomicNum() == 8]
+                if len(o_nbrs) >= 3:
+                    groups.append((-1, [n.GetIdx() for n in o_nbrs]))
+            case 7:
+                # Aliphatic amines, which would be protonated
+                if (
+                    not atom.IsAromatic()
+                    and oechem.OEGetHybridization(atom) == oechem.OEHybridization_sp3
+                    and all(n.GetAtomicNum() == 6 and not n.IsAromatic() for n in heavy)
+                    and not any(b.GetOrder() > 1 for n in heavy for b in n.GetBonds())
+                ):
+                    groups.append((1, [atom.GetIdx()]))
+
+    # Any other formally charged atoms
+    grouped = {idx for _, group in groups for idx in group}
+    for atom in mol.GetAtoms():
+        if atom.GetFormalCharge() != 0 and atom.GetIdx() not in grouped:
+            groups.append((int(np.sign(atom.GetFormalCharge())), [atom.GetIdx()]))
+
+    return groups
+
+
+def _residue_info(atom) -> tuple[str, str, str]:
+    res = oechem.OEAtomGetResidue(atom)
+    return res.GetName(), str(res.GetResidueNumber()), res.GetChainID()
+
+
+def _fmt_coords(coords) -> dict[str, str]:
+    # Same precision as the PLIP report
+    return {k: f"{v:.3f}" for k, v in zip("xyz", coords)}
+
+
+class ReceptorInteractionFeatures:
+    """
+    Interaction features for all atoms in a protein, computed once per receptor and
+    reused for every pose docked into it.
+    """
+
+    def __init__(self, protein: oechem.OEMolBase):
+        """
+        Parameters
+        ----------
+        protein : oechem.OEMolBase
+            Protein molecule, with residue information
+        """
+        all_coords = _get_coords(protein)
+
+        heavy_atoms = [a for a in protein.GetAtoms() if a.GetAtomicNum() != 1]
+        idxs = np.asarray([a.GetIdx() for a in heavy_atoms], dtype=np.int64)
+        self.coords = all_coords[idxs]
+        self.residues = [_residue_info(a) for a in heavy_atoms]
+
+        self.hydrophobic = np.asarray(
+            [_is_hydrophobic(a) for a in heavy_atoms], dtype=bool
+        )
+        self.donor = np.asarray([_is_donor(a) for a in heavy_atoms], dtype=bool)
+        self.acceptor = np.asarray([_is_acceptor(a) for a in heavy_atoms], dtype=bool)
+        # Explicit hydrogen coordinates for each donor
+        self.donor_hs = {
+            i: all_coords[[n.GetIdx() for n in a.GetAtoms() if n.GetAtomicNum() == 1]]
+            for i, a in enumerate(heavy_atoms)
+            if self.donor[i]
+        }
+
+        # Charged groups and aromatic rings from residue templates
+        res_atoms = {}
+        for i, a in enumerate(heavy_atoms):
+            res_atoms.setdefault(self.residues[i], {})[a.GetName().strip()] = i
+
+        self.charged = []
+        self.rings = []
+        for res, atom_names in res_atoms.items():
+            for sign, template in [(1, _POS_RESIDUE_ATOMS), (-1, _NEG_RESIDUE_ATOMS)]:
+                group = [
+                    atom_names[n] for n in template.get(res[0], ()) if n in atom_names
+                ]
+                if group:
+                    self.charged.append(
+                        (sign, self.coords[group].mean(axis=0), res, group)
+                    )
+            for ring in _RESIDUE_RINGS.get(res[0], []):
+                if all(n in atom_names for n in ring):
+                    ring_idxs = [atom_names[n] for n in ring]
+                    center, normal = _ring_geometry(self.coords[ring_idxs])
+                    self.rings.append((center, normal, res, ring_idxs))
+
+    @staticmethod
+    def key(protein: oechem.OEMolBase) -> str:
+        """
+        Key identifying a protein structure, based on its coordinates.
+        """
+        return hashlib.sha1(_get_coords(protein).tobytes()).hexdigest()
+
+    def binding_site(self, ligand_coords: np.ndarray) -> np.ndarray:
+        """
+        Mask of protein atoms within BS_DIST of any ligand atom.
+        """
+        lo = ligand_coords.min(axis=0) - BS_DIST
+        hi = ligand_coords.max(axis=0) + BS_DIST
+        in_box = np.flatnonzero(((self.coords >= lo) & (self.coords <= hi)).all(axis=1))
+        diff = self.coords[in_box, None, :] - ligand_coords[None, :, :]
+        d2 = (diff**2).sum(axis=-1)
+        mask = np.zeros(len(self.coords), dtype=bool)
+        mask[in_box[(d2 <= BS_DIST**2).any(axis=1)]] = True
+        return mask
+
+
+def get_receptor_features(protein: oechem.OEMolBase) -> ReceptorInteractionFeatures:
+    """
+    Get the interaction features for a protein, building them if this protein hasn't
+    been seen recently.
+    """
+    key = ReceptorInteractionFeatures.key(protein)
+    try:
+        _receptor_cache.move_to_end(key)
+        return _receptor_cache[key]
+    except KeyError:
+        features = ReceptorInteractionFeatures(protein)
+        _receptor_cache[key] = features
+        if len(_receptor_cache) > _RECEPTOR_CACHE_SIZE:
+            _receptor_cache.popitem(last=False)
+        return features
+
+
+def _record(res, lig_coords, prot_coords, **kwargs) -> dict:
+    """
+    Build an interaction record in the same format as in a PLIP XML report.
+    """
+    return {
+        "restype": res[0],
+        "resnr": res[1],
+        "reschain": res[2],
+        "ligcoo": _fmt_coords(lig_coords),
+        "protcoo": _fmt_coords(prot_coords),
+    } | kwargs
+
+
+def _hbond_ok(donor_coords, donor_hs, acceptor_coords) -> bool:
+    """
+    Check the D-H...A angle for any of the donor's hydrogens. Donors without explicit
+    hydrogens are only checked by distance.
+    """
+    if len(donor_hs) == 0:
+        return True
+    v1 = donor_coords - donor_hs
+    v2 = acceptor_coords - donor_hs
+    cos = (v1 * v2).sum(axis=1) / (
+        np.linalg.norm(v1, axis=1) * np.linalg.norm(v2, axis=1)
+    )
+    angles = np.degrees(np.arccos(np.clip(cos, -1, 1)))
+    return bool((angles > HBOND_DON_ANGLE_MIN).any())
+
+
+def detect_interactions(
+    protein: oechem.OEMolBase,
+    ligand: oechem.OEMolBase,
+    receptor_features: ReceptorInteractionFeatures | None = None,
+) -> dict[str, list[dict]]:
+    """
+    Detect interactions between a protein and a ligand.
+
+    Parameters
+    ----------
+    protein : oechem.OEMolBase
+        Protein molecule
+    ligand : oechem.OEMolBase
+        Posed ligand molecule
+    receptor_features : ReceptorInteractionFeatures, optional
+        Precomputed protein features. If not given, they are taken from the cache (and
+        built if necessary)
+
+    Returns
+    -------
+    dict[str, list[dict]]
+        Dict mapping interaction type (named as in PLIP) to a list of interactions, each
+        in the same format as an interaction in a PLIP XML report
+    """
+    if receptor_features is None:
+        receptor_features = get_receptor_features(protein)
+    rec = receptor_features
+
+    ligand = oechem.OEMol(ligand)
+    oechem.OEAssignAromaticFlags(ligand)
+    all_lig_coords = _get_coords(ligand)
+    lig_atoms = {a.GetIdx(): a for a in ligand.GetAtoms() if a.GetAtomicNum() != 1}
+    lig_idxs = np.asarray(list(lig_atoms.keys()), dtype=np.int64)
+    lig_coords = all_lig_coords[lig_idxs]
+
+    site = rec.binding_site(lig_coords)
+    interactions = {intn_type: [] for intn_type in INTERACTION_TYPES}
+    if not site.any():
+        return interactions
+
+    def _pairs(prot_mask, lig_mask, dist_max):
+        # (protein idx, ligand idx, distance) for all pairs within dist_max
+        prot_sel = np.flatnonzero(prot_mask & site)
+        lig_sel = np.flatnonzero(lig_mask)
+        if len(prot_sel) == 0 or len(lig_sel) == 0:
+            return []
+        d = np.linalg.norm(
+            rec.coords[prot_sel, None, :] - lig_coords[None, lig_sel, :], axis=-1
+        )
+        pi, li = np.nonzero(d <= dist_max)
+        return [(prot_sel[p], lig_sel[q], d[p, q]) for p, q in zip(pi, li)]
+
+    atoms = [lig_atoms[i] for i in lig_idxs]
+
+    # Pi-stacking
+    lig_rings = []
+    for ring in _aromatic_rings(ligand):
+        center, normal = _ring_geometry(all_lig_coords[ring])
+        lig_rings.append((center, normal, ring))
+    stacking = set()
+    for prot_center, prot_normal, res, _ in rec.rings:
+        for lig_center, lig_normal, lig_ring in lig_rings:
+            dist = np.linalg.norm(prot_center - lig_center)
+            if dist > PISTACK_DIST_MAX:
+                continue
+            angle = np.degrees(np.arccos(np.clip(abs(prot_normal @ lig_normal), 0, 1)))
+            # Offset of each ring center from the other ring's normal axis
+            diff = lig_center - prot_center
+            offset = min(
+                np.linalg.norm(diff - (diff @ prot_normal) * prot_normal),
+                np.linalg.norm(diff - (diff @ lig_normal) * lig_normal),
+            )
+            if offset > PISTACK_OFFSET_MAX:
+                continue
+            if angle < PISTACK_ANG_DEV:
+                stack_type = "P"
+            elif abs(angle - 90) < PISTACK_ANG_DEV:
+                stack_type = "T"
+            else:
+                continue
+            stacking.update((res, i) for i in lig_ring)
+            interactions["pi_stack"].append(
+                _record(
+                    res,
+                    lig_center,
+                    prot_center,
+                    centdist=f"{dist:.2f}",
+                    angle=f"{angle:.2f}",
+                    offset=f"{offset:.2f}",
+                    type=stack_type,
+                )
+            )
+
+    # Hydrophobic contacts. Like PLIP, skip ligand atoms already stacking with the
+    #  same residue, keep the closest contact for each (ligand atom, residue), and then
+    #  keep the closest ligand atom for each protein atom
+    lig_hydrophobic = np.asarray([_is_hydrophobic(a) for a in atoms], dtype=bool)
+    best_lig_res = {}
+    for p, q, d in _pairs(rec.hydrophobic, lig_hydrophobic, HYDROPH_DIST_MAX):
+        res = rec.residues[p]
+        if (res, lig_idxs[q]) in stacking:
+            continue
+        if (q, res) not in best_lig_res or d < best_lig_res[(q, res)][2]:
+            best_lig_res[(q, res)] = (p, q, d)
+    best_prot = {}
+    for p, q, d in best_lig_res.values():
+        if p not in best_prot or d < best_prot[p][2]:
+            best_prot[p] = (p, q, d)
+    for p, q, d in sorted(best_prot.values(), key=lambda x: (x[1], x[0])):
+        interactions["hydrophobic_interaction"].append(
+            _record(rec.residues[p], lig_coords[q], rec.coords[p], dist=f"{d:.2f}")
+        )
+
+    # Salt bridges between charged group centers
+    lig_charged = []
+    for sign, group in _ligand_charged_groups(ligand):
+        lig_charged.append((sign, all_lig_coords[group].mean(axis=0), set(group)))
+    salt_bridge_atoms = set()
+    for prot_sign, prot_center, res, prot_group in rec.charged:
+        if not site[prot_group].any():
+            continue
+        for lig_sign, lig_center, lig_group in lig_charged:
+            if prot_sign == lig_sign:
+                continue
+            dist = np.linalg.norm(prot_center - lig_center)
+            if 0.5 < dist <= SALTBRIDGE_DIST_MAX:
+                salt_bridge_atoms.update((p, q) for p in prot_group for q in lig_group)
+                interactions["salt_bridge"].append(
+                    _record(
+                        res,
+                        lig_center,
+                        prot_center,
+                        dist=f"{dist:.2f}",
+                        protispos="True" if prot_sign > 0 else "False",
+                    )
+                )
+
+    # Hydrogen bonds in both directions, skipping atom pairs already in a salt bridge.
+    #  Each donor keeps at most one H-bond per hydrogen, shortest first
+    lig_donor = np.asarray([_is_donor(a) for a in atoms], dtype=bool)
+    lig_acceptor = np.asarray([_is_acceptor(a) for a in atoms], dtype=bool)
+    hbonds = []
+    for p, q, d in _pairs(rec.donor, lig_acceptor, HBOND_DIST_MAX):
+        if (p, lig_idxs[q]) in salt_bridge_atoms:
+            continue
+        if _hbond_ok(rec.coords[p], rec.donor_hs[p], lig_coords[q]):
+            hbonds.append((("prot", p), p, q, d, True))
+    for p, q, d in _pairs(rec.acceptor, lig_donor, HBOND_DIST_MAX):
+        if (p, lig_idxs[q]) in salt_bridge_atoms:
+            continue
+        lig_hs = all_lig_coords[
+            [n.GetIdx() for n in atoms[q].GetAtoms() if n.GetAtomicNum() == 1]
+        ]
+        if _hbond_ok(lig_coords[q], lig_hs, rec.coords[p]):
+            hbonds.append((("lig", q), p, q, d, False))
+
+    n_donor_hbonds = {}
+    for donor, p, q, d, protisdon in sorted(hbonds, key=lambda x: x[3]):
+        if donor[0] == "prot":
+            n_h = len(rec.donor_hs[p])
+        else:
+            n_h = atoms[q].GetTotalHCount()
+        if n_donor_hbonds.get(donor, 0) >= max(n_h, 1):
+            continue
+        n_donor_hbonds[donor] = n_donor_hbonds.get(donor, 0) + 1
+        interactions["hydrogen_bond"].append(
+            _record(
+                rec.residues[p],
+                lig_coords[q],
+                rec.coords[p],
+                dist_d_a=f"{d:.2f}",
+                protisdon="True" if protisdon else "False",
+            )
+        )
+
+    return interactions
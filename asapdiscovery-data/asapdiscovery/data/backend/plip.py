@@ -3,11 +3,17 @@ import os
 import subprocess
 import tempfile
 import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 
 import numpy as np
 import xmltodict
 import yaml
+from asapdiscovery.data.backend.interactions import (
+    ReceptorInteractionFeatures,
+    detect_interactions,
+)
 from asapdiscovery.data.backend.openeye import (
     combine_protein_ligand,
     oechem,
@@ -131,52 +137,110 @@ def get_interaction_color(intn_type) -> str:
         raise ValueError(f"Interaction type {intn_type} not recognized.")
 
 
+class ProteinAtomLookup:
+    """
+    Per-protein lookup from (rounded) atom coordinates to atom idx, with a backbone
+    bitmask, so interactions reported by coordinates can be matched to protein atoms
+    in O(1). Built once per protein and shared between all poses and interactions
+    (see get_protein_atom_lookup). Fitness colors per residue are also memoised per
+    target.
+    """
+
+    def __init__(self, protein):
+        # round to 3 because OE pointlessly extends the coordinates float. If several
+        # atoms have the same coordinates, the last one wins.
+        self.coords_to_idx = {
+            tuple(round(c, 3) for c in res_coords): idx
+            for idx, res_coords in protein.GetCoords().items()
+        }
+
+        self.backbone = np.zeros(protein.GetMaxAtomIdx(), dtype=bool)
+        self.backbone[
+            [at.GetIdx() for at in protein.GetAtoms(oechem.OEIsBackboneAtom())]
+        ] = True
+
+        self._protein = protein
+        self._fitness_colors = {}
+
+    def find_atom(self, x, y, z) -> int | None:
+        """
+        Get the idx of the atom at the given coordinates, or None if there isn't one.
+        """
+        return self.coords_to_idx.get((float(x), float(y), float(z)))
+
+    def is_backbone(self, x, y, z) -> bool:
+        idx = self.find_atom(x, y, z)
+        return idx is not None and bool(self.backbone[idx])
+
+    def fitness_colors(self, target) -> dict[str, str]:
+        """
+        Get a dict mapping residue id (resnum_chain) to fitness color for a target.
+        """
+        try:
+            return self._fitness_colors[target]
+        except KeyError:
+            res_colors = {
+                res_id: color
+                for color, res_ids in make_color_res_fitness(
+                    self._protein, target
+                ).items()
+                for res_id in res_ids
+            }
+            self._fitness_colors[target] = res_colors
+            return res_colors
+
+
+# Cache of ProteinAtomLookups, keyed by a hash of the protein coordinates
+_PROTEIN_LOOKUP_CACHE_SIZE = 16
+_protein_lookup_cache = OrderedDict()
+
+
+def get_protein_atom_lookup(protein) -> ProteinAtomLookup:
+    """
+    Get the ProteinAtomLookup for a protein, building it if this protein hasn't been
+    seen recently.
+    """
+    key = ReceptorInteractionFeatures.key(protein)
+    try:
+        _protein_lookup_cache.move_to_end(key)
+        return _protein_lookup_cache[key]
+    except KeyError:
+        lookup = ProteinAtomLookup(protein)
+        _protein_lookup_cache[key] = lookup
+        if len(_protein_lookup_cache) > _PROTEIN_LOOKUP_CACHE_SIZE:
+            _protein_lookup_cache.popitem(last=False)
+        return lookup
+
+
 def is_backbone_residue(protein, x, y, z) -> bool:
     """
     Given xyz coordinates, find the atom in the protein and return whether
     it is a backbone atom. This would be much easier if PLIP would return
     the atom idx of the protein, currently all we have are the coordinates.
+
+    This also catches pi-pi stack where protein coordinates are centered to a ring
+    (e.g. Phe), in which case no atom is found at the coordinates. pi-pi of this form
+    can never be on backbone anyway, so this works.
     """
-    # make a list with this protein's backbone atom indices. Could do higher up,
-    # but this is very fast so ok to repeat.
-    backbone_atoms = [at.GetIdx() for at in protein.GetAtoms(oechem.OEIsBackboneAtom())]
-
-    # with oe, iterate over atoms until this one's found. then use oechem.OEIsBackboneAtom
-    is_backbone = False
-    for idx, res_coords in protein.GetCoords().items():
-        # round to 3 because OE pointlessly extends the coordinates float.
-        if (
-            float(x) == round(res_coords[0], 3)
-            and float(y) == round(res_coords[1], 3)
-            and float(z) == round(res_coords[2], 3)
-        ):
-            is_backbone = True if idx in backbone_atoms else False
-
-    if is_backbone:
-        return True
-    else:
-        # this also catches pi-pi stack where protein coordinates are centered to a ring (e.g. Phe),
-        # in which case the above coordinate matching doesn't find any atoms. pi-pi of this form
-        # can never be on backbone anyway, so this works.
-        return False
+    return get_protein_atom_lookup(protein).is_backbone(x, y, z)
 
 
-def get_interaction_fitness_color(plip_xml_dict, protein, target) -> str:
+def get_interaction_fitness_color(
+    plip_xml_dict, lookup: ProteinAtomLookup, target
+) -> str:
     """
     Get fitness color for a residue. If the interaction is with a backbone atom on
-    the residue, color it green.
+    the residue, color it green. The lookup is resolved once per pose (see
+    build_interactions_dict), so this is O(1) per interaction.
     """
     # first get the fitness color of the residue the interaction hits, this
     # can be white->red or blue if fitness data is missing.
-    intn_color = None
-    for fitness_color, res_ids in make_color_res_fitness(protein, target).items():
-        if f"{plip_xml_dict['resnr']}_{plip_xml_dict['reschain']}" in res_ids:
-            intn_color = fitness_color
-            break
+    intn_color = lookup.fitness_colors(target).get(
+        f"{plip_xml_dict['resnr']}_{plip_xml_dict['reschain']}"
+    )
 
     # overwrite the interaction as green if it hits a backbone atom.
-    if is_backbone_residue(
-        protein,
+    if lookup.is_backbone(
         plip_xml_dict["protcoo"]["x"],
         plip_xml_dict["protcoo"]["y"],
         plip_xml_dict["protcoo"]["z"],
@@ -187,15 +251,16 @@ def get_interaction_fitness_color(plip_xml_dict, protein, target) -> str:
 
 
 def build_interaction_dict(
-    plip_xml_dict, intn_counter, intn_type, color_method, protein, target
+    plip_xml_dict, intn_counter, intn_type, color_method, lookup, target
 ):
     """
     Parses a PLIP interaction dict and builds the dict key values needed for 3DMol.
+    lookup is the ProteinAtomLookup of the protein, only needed for fitness coloring.
     """
     k = f"{intn_counter}_{plip_xml_dict['restype']}{plip_xml_dict['resnr']}.{plip_xml_dict['reschain']}"
 
     if color_method == "fitness":
-        intn_color = get_interaction_fitness_color(plip_xml_dict, protein, target)
+        intn_color = get_interaction_fitness_color(plip_xml_dict, lookup, target)
     else:
         intn_color = get_interaction_color(intn_type)
     v = {
@@ -211,6 +276,30 @@ def build_interaction_dict(
     return k, v
 
 
+def build_interactions_dict(interactions, color_method, protein, target) -> dict:
+    """
+    Wrangle interactions into a dict that can be read directly by 3DMol.
+
+    Parameters
+    ----------
+    interactions : Iterable[tuple[str, dict]]
+        (interaction type, interaction) pairs, where each interaction is in the format
+        of an interaction in a PLIP XML report
+    """
+    # only look up the protein once per pose rather than once per interaction
+    lookup = get_protein_atom_lookup(protein) if color_method == "fitness" else None
+
+    intn_dict = {}
+    # we build keys for the dict to be unique, so no interactions are overwritten
+    for intn_counter, (intn_type, intn_data) in enumerate(interactions):
+        k, v = build_interaction_dict(
+            intn_data, intn_counter, intn_type, color_method, lookup, target
+        )
+        intn_dict[k] = v
+
+    return intn_dict
+
+
 def get_interactions_plip(protein, pose, color_method, target) -> dict:
     """
     Get protein-ligand interactions according to PLIP.
@@ -239,53 +328,72 @@ def get_interactions_plip(protein, pose, color_method, target) -> dict:
             ET.tostring(ET.parse(os.path.join(tmpdirname, "report.xml")).getroot())
         )
 
-    intn_dict = {}
-    intn_counter = 0
-    # wrangle all interactions into a dict that can be read directly by 3DMol.
-
     # if there is only one site we get a dict, otherwise a list of dicts.
     sites = intn_dict_xml["report"]["bindingsite"]
     if isinstance(sites, dict):
         sites = [sites]
 
-    for bs in sites:
-        for _, data in bs["interactions"].items():
-            if data:
-                # we build keys for the dict to be unique, so no interactions are overwritten
-                for intn_type, intn_data in data.items():
-                    if isinstance(
-                        intn_data, list
-                    ):  # multiple interactions of this type
-                        for intn_data_i in intn_data:
-                            k, v = build_interaction_dict(
-                                intn_data_i,
-                                intn_counter,
-                                intn_type,
-                                color_method,
-                                protein,
-                                target,
-                            )
-                            intn_dict[k] = v
-                            intn_counter += 1
-
-                    elif isinstance(intn_data, dict):  # single interaction of this type
-                        k, v = build_interaction_dict(
-                            intn_data,
-                            intn_counter,
-                            intn_type,
-                            color_method,
-                            protein,
-                            target,
-                        )
-                        intn_dict[k] = v
-                        intn_counter += 1
+    def _iter_interactions():
+        for bs in sites:
+            for _, data in bs["interactions"].items():
+                if data:
+                    for intn_type, intn_data in data.items():
+                        # multiple interactions of this type
+                        if isinstance(intn_data, list):
+                            for intn_data_i in intn_data:
+                                yield intn_type, intn_data_i
+                        # single interaction of this type
+                        elif isinstance(intn_data, dict):
+                            yield intn_type, intn_data
 
-    return intn_dict
+    return build_interactions_dict(_iter_interactions(), color_method, protein, target)
+
+
+def get_interactions_inprocess(protein, pose, color_method, target) -> dict:
+    """
+    Get protein-ligand interactions without running PLIP, using the in-process
+    detection in asapdiscovery.data.backend.interactions. This runs directly on the
+    OEMol coordinates, and the protein features are only computed once per receptor,
+    so it is much faster than get_interactions_plip when scoring many poses. The
+    returned dict has the same format as get_interactions_plip.
+    """
+    interactions = detect_interactions(protein, pose)
+    return build_interactions_dict(
+        (
+            (intn_type, intn_data)
+            for intn_type, intn_list in interactions.items()
+            for intn_data in intn_list
+        ),
+        color_method,
+        protein,
+        target,
+    )
+
+
+def get_interactions(protein, pose, color_method, target, use_plip=True) -> dict:
+    """
+    Get protein-ligand interactions, either with the PLIP CLI (default) or in-process.
+    The in-process detection is much faster, but doesn't detect water bridges,
+    pi-cation interactions, halogen bonds, or metal complexes.
+    """
+    if use_plip:
+        return get_interactions_plip(protein, pose, color_method, target)
+    else:
+        return get_interactions_inprocess(protein, pose, color_method, target)
+
+
+@lru_cache(maxsize=None)
+def get_fintscore_parameters() -> dict:
+    """
+    Read the YAML file that contains settings for rewards/penalties of interaction
+    types. Only parsed once, so the returned dict should not be modified.
+    """
+    return yaml.safe_load(Path(FINTSCORE_PARAMETERS).read_text())
 
 
 # this should be placed around that area as well, but FINTscore should be added to docking scores by default
 def compute_fint_score(
-    protein: oechem.OEMol, pose: oechem.OEMol, target: TargetTags
+    protein: oechem.OEMol, pose: oechem.OEMol, target: TargetTags, use_plip=True
 ) -> tuple[float, float]:
     """
     Compute the Fitness Interaction Score (FINTscore) given a dict with interactions generated by PLIP.
@@ -298,7 +406,9 @@ def compute_fint_score(
         Pose molecule
     target: str
         Target name
-
+    use_plip: bool, default=True
+        Detect interactions with the PLIP CLI. If False, detect them in-process, which
+        is much faster but misses the interaction types listed in get_interactions
 
     Returns
     ----------
@@ -312,8 +422,8 @@ def compute_fint_score(
             f"Target {target} does not have fitness data, cannot compute FINTscore."
         )
 
-    # read YAML file that contains settings for rewards/penalties of interaction types.
-    fintscore_parameters = yaml.safe_load(Path(FINTSCORE_PARAMETERS).read_text())
+    # settings for rewards/penalties of interaction types.
+    fintscore_parameters = get_fintscore_parameters()
 
     # set empty parameters to add to when iterating over interactions.
     penalty_multipliers = 1
@@ -321,7 +431,7 @@ def compute_fint_score(
     intn_score_bucket = []
 
     # iterate over each interaction that was found.
-    intn_dict = get_interactions_plip(protein, pose, "fitness", target)
+    intn_dict = get_interactions(protein, pose, "fitness", target, use_plip=use_plip)
 
     for _, data in intn_dict.items():
         # if the interaction is with backbone, add a reward to the score.
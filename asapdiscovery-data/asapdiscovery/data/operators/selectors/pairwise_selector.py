@@ -1,15 +1,121 @@
 import logging
-from itertools import product
-from typing import ClassVar, Union
+from collections import defaultdict
+from typing import Any, ClassVar, Union
 
+from asapdiscovery.data.backend.openeye import oechem
 from asapdiscovery.data.operators.selectors.selector import SelectorBase
 from asapdiscovery.data.schema.complex import Complex, ComplexBase, PreppedComplex
-from asapdiscovery.data.schema.ligand import ChemicalRelationship, Ligand
-from asapdiscovery.data.schema.pairs import CompoundStructurePair
+from asapdiscovery.data.schema.ligand import Ligand
+from asapdiscovery.data.schema.pairs import LazyPairList
 
 logger = logging.getLogger(__name__)
 
 
+def _check_complexes(complexes: list[Union[Complex, PreppedComplex]]):
+    if not all(isinstance(c, ComplexBase) for c in complexes):
+        raise ValueError("All complexes must be of type Complex, or PreppedComplex")
+
+    if not all(isinstance(c, type(complexes[0])) for c in complexes):
+        raise ValueError("All complexes must be of the same type")
+
+
+def _select_by_inchi(
+    pair_cls,
+    ligands: list[Ligand],
+    complexes: list[Union[Complex, PreppedComplex]],
+    same: bool,
+) -> LazyPairList:
+    """
+    Pair each ligand with every complex whose ligand has the same InChI (same=True)
+    or a different InChI (same=False). The InChIs are computed once per ligand and
+    once per complex rather than once per pair.
+    """
+    complex_idxs_by_inchi = defaultdict(list)
+    for i, complex in enumerate(complexes):
+        complex_idxs_by_inchi[complex.ligand.inchi].append(i)
+
+    lig_idxs = []
+    complex_idxs = []
+    for i, lig in enumerate(ligands):
+        matches = complex_idxs_by_inchi.get(lig.inchi, [])
+        if not same:
+            matches = sorted(set(range(len(complexes))).difference(matches))
+        lig_idxs.extend([i] * len(matches))
+        complex_idxs.extend(matches)
+
+    return LazyPairList(pair_cls, ligands, complexes, lig_idxs, complex_idxs)
+
+
+def _identity_key(lig: Ligand) -> tuple[str, bool]:
+    # Key that is equal for two ligands iff Ligand.is_chemically_equal is True
+    return lig.fixed_inchikey, lig.has_defined_stereo
+
+
+def _tautomer_key(lig: Ligand) -> tuple[int, tuple[str, bool]]:
+    # Key that is equal for two ligands with the same charge and canonical tautomer
+    return oechem.OENetCharge(lig.to_oemol()), _identity_key(lig.canonical_tautomer)
+
+
+def _similarity_keys(lig: Ligand) -> dict[str, Any]:
+    """
+    Compute all of the keys needed to decide whether two ligands are identical,
+    stereoisomers, tautomers, or protonation state isomers of each other (as decided
+    by Ligand.get_chemical_relationship), so they only need to be computed once per
+    ligand rather than once per pair. Keys that can't be computed (eg if the ligand
+    can't be neutralized or tautomerized) are None and never match.
+    """
+    flattened = lig.flattened
+    keys = {
+        "identity": _identity_key(lig),
+        "non_iso_smiles": lig.non_iso_smiles,
+        "tautomer": None,
+        "flat_identity": _identity_key(flattened),
+        "flat_tautomer": None,
+        "canonical_tautomer_identity": None,
+        "canonical_tautomer_non_iso_smiles": None,
+        "neutralized": None,
+        "flat_neutralized": None,
+        "neutral_flat_identity": None,
+        "neutral_flat_tautomer": None,
+    }
+
+    # Generating the canonical tautomer can fail, in which case the keys that need it
+    #  just never match
+    try:
+        canonical_tautomer = lig.canonical_tautomer
+        keys["tautomer"] = _tautomer_key(lig)
+        keys["flat_tautomer"] = _tautomer_key(flattened)
+        keys["canonical_tautomer_identity"] = _identity_key(canonical_tautomer)
+        keys["canonical_tautomer_non_iso_smiles"] = canonical_tautomer.non_iso_smiles
+    except ValueError as e:
+        logger.warning(
+            f"Could not generate canonical tautomer for {lig.compound_name}: {e}"
+        )
+
+    # Neutralizing can fail, in which case the keys that need it just never match
+    try:
+        neutral_flattened = lig.neutralized.flattened
+        keys["neutralized"] = _identity_key(lig.neutralized)
+        keys["flat_neutralized"] = _identity_key(flattened.neutralized)
+        keys["neutral_flat_identity"] = _identity_key(neutral_flattened)
+        keys["neutral_flat_tautomer"] = _tautomer_key(neutral_flattened)
+    except ValueError as e:
+        logger.warning(f"Could not neutralize {lig.compound_name}: {e}")
+
+    return keys
+
+
+# Ligands are similar if they share any of these keys
+_SIMILAR_IF_SHARED = ["identity", "non_iso_smiles", "neutralized", "tautomer"]
+# Ligands are similar if they share the first key of any of these but not the second
+_SIMILAR_IF_SHARED_UNLESS = [
+    ("flat_tautomer", "flat_identity"),
+    ("flat_neutralized", "flat_identity"),
+    ("neutral_flat_tautomer", "neutral_flat_identity"),
+    ("canonical_tautomer_non_iso_smiles", "canonical_tautomer_identity"),
+]
+
+
 class PairwiseSelector(SelectorBase):
     """
     Selects ligand and complex pairs by enumerating all possible pairs.
@@ -19,20 +125,12 @@ class PairwiseSelector(SelectorBase):
 
     def _select(
         self, ligands: list[Ligand], complexes: list[Union[Complex, PreppedComplex]]
-    ) -> list[CompoundStructurePair]:
-        if not all(isinstance(c, ComplexBase) for c in complexes):
-            raise ValueError("All complexes must be of type Complex, or PreppedComplex")
-
-        if not all(isinstance(c, type(complexes[0])) for c in complexes):
-            raise ValueError("All complexes must be of the same type")
+    ) -> LazyPairList:
+        _check_complexes(complexes)
 
         pair_cls = self._pair_type_from_complex(complexes[0])
 
-        pairs = []
-        for lig, complex in product(ligands, complexes):
-            pairs.append(pair_cls(complex=complex, ligand=lig))
-
-        return pairs
+        return LazyPairList(pair_cls, ligands, complexes)
 
     def provenance(self):
         return {"selector": self.dict()}
@@ -47,22 +145,13 @@ class LeaveOneOutSelector(SelectorBase):
 
     def _select(
         self, ligands: list[Ligand], complexes: list[Union[Complex, PreppedComplex]]
-    ) -> list[CompoundStructurePair]:
-        if not all(isinstance(c, ComplexBase) for c in complexes):
-            raise ValueError("All complexes must be of type Complex, or PreppedComplex")
-
-        if not all(isinstance(c, type(complexes[0])) for c in complexes):
-            raise ValueError("All complexes must be of the same type")
+    ) -> LazyPairList:
+        _check_complexes(complexes)
 
         pair_cls = self._pair_type_from_complex(complexes[0])
 
-        pairs = []
-        for lig, complex in product(ligands, complexes):
-            # Need to compare chemical identity instead of compound ID
-            if not lig.inchi == complex.ligand.inchi:
-                pairs.append(pair_cls(complex=complex, ligand=lig))
-
-        return pairs
+        # Need to compare chemical identity instead of compound ID
+        return _select_by_inchi(pair_cls, ligands, complexes, same=False)
 
     def provenance(self):
         return {"selector": self.dict()}
@@ -78,28 +167,39 @@ class LeaveSimilarOutSelector(SelectorBase):
 
     def _select(
         self, ligands: list[Ligand], complexes: list[Union[Complex, PreppedComplex]]
-    ) -> list[CompoundStructurePair]:
-        if not all(isinstance(c, ComplexBase) for c in complexes):
-            raise ValueError("All complexes must be of type Complex, or PreppedComplex")
-
-        if not all(isinstance(c, type(complexes[0])) for c in complexes):
-            raise ValueError("All complexes must be of the same type")
+    ) -> LazyPairList:
+        _check_complexes(complexes)
 
         pair_cls = self._pair_type_from_complex(complexes[0])
 
-        pairs = []
-        for lig, complex in product(ligands, complexes):
-            # Need to compare chemical identity instead of compound ID
-            if (
-                lig.get_chemical_relationship(complex.ligand)
-                not in ChemicalRelationship.IDENTICAL
-                | ChemicalRelationship.STEREOISOMER
-                | ChemicalRelationship.TAUTOMER
-                | ChemicalRelationship.PROTONATION_STATE_ISOMER
-            ):
-                pairs.append(pair_cls(complex=complex, ligand=lig))
-
-        return pairs
+        # Index the complexes by each of their ligand's keys, so the similar complexes
+        #  for each ligand can be looked up rather than compared pair by pair
+        complex_idxs_by_key = defaultdict(lambda: defaultdict(set))
+        for i, complex in enumerate(complexes):
+            for name, key in _similarity_keys(complex.ligand).items():
+                if key is not None:
+                    complex_idxs_by_key[name][key].add(i)
+
+        def _lookup(name, keys):
+            if keys[name] is None:
+                return set()
+            return complex_idxs_by_key[name].get(keys[name], set())
+
+        lig_idxs = []
+        complex_idxs = []
+        for i, lig in enumerate(ligands):
+            keys = _similarity_keys(lig)
+            similar = set()
+            for name in _SIMILAR_IF_SHARED:
+                similar |= _lookup(name, keys)
+            for name, unless_name in _SIMILAR_IF_SHARED_UNLESS:
+                similar |= _lookup(name, keys) - _lookup(unless_name, keys)
+
+            matches = [j for j in range(len(complexes)) if j not in similar]
+            lig_idxs.extend([i] * len(matches))
+            complex_idxs.extend(matches)
+
+        return LazyPairList(pair_cls, ligands, complexes, lig_idxs, complex_idxs)
 
     def provenance(self):
         return {"selector": self.dict()}
@@ -114,22 +214,13 @@ class SelfDockingSelector(SelectorBase):
 
     def _select(
         self, ligands: list[Ligand], complexes: list[Union[Complex, PreppedComplex]]
-    ) -> list[CompoundStructurePair]:
-        if not all(isinstance(c, ComplexBase) for c in complexes):
-            raise ValueError("All complexes must be of type Complex, or PreppedComplex")
-
-        if not all(isinstance(c, type(complexes[0])) for c in complexes):
-            raise ValueError("All complexes must be of the same type")
+    ) -> LazyPairList:
+        _check_complexes(complexes)
 
         pair_cls = self._pair_type_from_complex(complexes[0])
 
-        pairs = []
-        for lig, complex in product(ligands, complexes):
-            # Need to compare chemical identity instead of compound ID
-            if lig.inchi == complex.ligand.inchi:
-                pairs.append(pair_cls(complex=complex, ligand=lig))
-
-        return pairs
+        # Need to compare chemical identity instead of compound ID
+        return _select_by_inchi(pair_cls, ligands, complexes, same=True)
 
     def provenance(self):
         return {"selector": self.dict()}
@@ -2,9 +2,10 @@ import abc
 from typing import Literal, Union
 
 import dask
+import numpy as np
 from asapdiscovery.data.schema.complex import Complex, PreppedComplex
 from asapdiscovery.data.schema.ligand import Ligand
-from asapdiscovery.data.schema.pairs import CompoundStructurePair
+from asapdiscovery.data.schema.pairs import CompoundStructurePair, LazyPairList
 from asapdiscovery.data.util.dask_utils import (
     FailureMode,
     actualise_dask_delayed_iterable,
@@ -36,23 +37,56 @@ class SelectorBase(abc.ABC, BaseModel):
     ) -> list[Union[CompoundStructurePair, DockingInputPair]]:
         if use_dask:
             delayed_outputs = []
-            for lig in ligands:
-                out = dask.delayed(self._select)(
-                    ligands=[lig], complexes=complexes, **kwargs
+            for i, lig in enumerate(ligands):
+                out = dask.delayed(self._select_single)(
+                    i, lig, complexes, **kwargs
                 )  # be careful here, need ALL complexes to perform a full search, ie no parallelism over complexes is possible with current setup
                 # see # 560
                 delayed_outputs.append(out)
             outputs = actualise_dask_delayed_iterable(
                 delayed_outputs, dask_client, errors=failure_mode
             )
-            outputs = [
-                item for sublist in outputs for item in sublist
-            ]  # flatten post hoc
+            if outputs and all(isinstance(out, tuple) for out in outputs):
+                # lazy selections come back as indices, so merge them into one lazy
+                #  list over the input ligands and complexes
+                outputs = LazyPairList(
+                    outputs[0][1],
+                    ligands,
+                    complexes,
+                    np.concatenate(
+                        [
+                            np.full(len(idxs), i, dtype=np.int64)
+                            for i, _, idxs in outputs
+                        ]
+                    ),
+                    np.concatenate([idxs for _, _, idxs in outputs]),
+                )
+            else:
+                outputs = [
+                    item for sublist in outputs for item in sublist
+                ]  # flatten post hoc
         else:
             outputs = self._select(ligands=ligands, complexes=complexes, **kwargs)
 
         return outputs
 
+    def _select_single(
+        self,
+        lig_idx: int,
+        ligand: Ligand,
+        complexes: list[Union[Complex, PreppedComplex]],
+        **kwargs,
+    ):
+        """
+        Select pairs for a single ligand, as run by each dask task. A lazy selection is
+        returned as (lig_idx, pair class, complex indices) so that neither the pairs
+        nor the complexes have to be sent back from the worker.
+        """
+        out = self._select(ligands=[ligand], complexes=complexes, **kwargs)
+        if isinstance(out, LazyPairList):
+            return lig_idx, out.pair_cls, out.indices()[1]
+        return out
+
     @abc.abstractmethod
     def provenance(self) -> dict[str, str]: ...
 
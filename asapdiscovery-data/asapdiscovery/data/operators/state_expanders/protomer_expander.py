@@ -37,21 +37,18 @@ class ProtomerExpander(StateExpanderBase):
         provenance = self.provenance()
         for parent_ligand in ligands:
             oemol = parent_ligand.to_oemol()
-            for protomer in oequacpac.OEGetReasonableProtomers(oemol):
-                fmol = oechem.OEMol(protomer)
-                # copy the ligand properties over to the new molecule, we may want to have more fine grained control over this
-                # down the track.
-                protomer_ligand = Ligand.from_oemol(fmol, **parent_ligand.dict())
-                if protomer_ligand.fixed_inchikey != parent_ligand.fixed_inchikey:
-                    # only add tags to new microstates of the input molecule
-                    protomer_ligand.set_expansion(
-                        parent=parent_ligand, provenance=provenance
-                    )
-                    expanded_states.append(protomer_ligand)
-                else:
-                    expanded_states.append(parent_ligand)
+            # copy the ligand properties over to the new molecule, we may want to have more fine grained control over this
+            # down the track.
+            protomers = self._states_to_ligands(
+                parent_ligand=parent_ligand,
+                parent_mol=oemol,
+                states=oequacpac.OEGetReasonableProtomers(oemol),
+                provenance=provenance,
+                ligand_kwargs=parent_ligand.dict(),
+            )
+            expanded_states.extend(protomers)
             # add the parent if it is not present.
-            if parent_ligand not in expanded_states:
+            if parent_ligand not in protomers:
                 expanded_states.append(parent_ligand)
 
         return expanded_states
@@ -1,6 +1,9 @@
 import abc
-from typing import Literal
+from collections.abc import Callable, Iterable
+from typing import Any, Literal, Optional
 
+from asapdiscovery.data.backend.openeye import oechem, oemol_to_smiles
+from asapdiscovery.data.operators.state_expanders.expansion_tag import StateExpansionTag
 from asapdiscovery.data.schema.ligand import Ligand
 from pydantic import BaseModel, Field
 
@@ -13,13 +16,109 @@ class StateExpanderBase(abc.ABC, BaseModel):
     @abc.abstractmethod
     def _expand(self, ligands: list[Ligand], unique: bool = False) -> list[Ligand]: ...
 
-    def expand(self, ligands: list[Ligand], unique: bool = True) -> list[Ligand]:
-        expanded_ligands = self._expand(ligands=ligands)
+    def expand(
+        self,
+        ligands: list[Ligand],
+        unique: bool = True,
+        processors: int = 1,
+        chunk_size: Optional[int] = None,
+    ) -> list[Ligand]:
+        """
+        Expand the states of the input ligands.
+
+        Parameters
+        ----------
+        ligands: The list of ligands whose states should be expanded.
+        unique: If True, only keep the first copy of any duplicated ligand states.
+        processors: The number of processes to expand the ligands over.
+        chunk_size: The number of parent ligands sent to a process at a time, by default the ligands are split into
+            four chunks per process.
+
+        Returns
+        -------
+            A list of expanded ligand states, in the same order regardless of the number of processors.
+        """
+        if processors > 1 and len(ligands) > 1:
+            expanded_ligands = self._expand_parallel(
+                ligands=ligands, processors=processors, chunk_size=chunk_size
+            )
+        else:
+            expanded_ligands = self._expand(ligands=ligands)
         if unique:
-            return list(set(expanded_ligands))
+            # dict keeps the first of each duplicate so the order is deterministic
+            return list(dict.fromkeys(expanded_ligands))
         else:
             return expanded_ligands
 
+    def _expand_parallel(
+        self, ligands: list[Ligand], processors: int, chunk_size: Optional[int] = None
+    ) -> list[Ligand]:
+        """
+        Expand chunks of the input ligands in a pool of processes and join the results back together in the order of
+        the input ligands.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        if chunk_size is None:
+            chunk_size = max(1, -(-len(ligands) // (processors * 4)))
+        chunks = [
+            ligands[i : i + chunk_size] for i in range(0, len(ligands), chunk_size)
+        ]
+
+        with ProcessPoolExecutor(max_workers=min(processors, len(chunks))) as pool:
+            work_list = [pool.submit(self._expand, ligands=chunk) for chunk in chunks]
+            return [ligand for work in work_list for ligand in work.result()]
+
+    @staticmethod
+    def _states_to_ligands(
+        parent_ligand: Ligand,
+        parent_mol: oechem.OEMol,
+        states: Iterable[oechem.OEMol],
+        provenance: dict[str, Any],
+        ligand_kwargs: dict[str, Any],
+        prepare: Optional[Callable[[oechem.OEMol], Any]] = None,
+    ) -> list[Ligand]:
+        """
+        Convert the expanded states of a parent ligand to Ligands, tagging any which are new states of the parent.
+
+        States are compared to the parent by canonical isomeric SMILES of the molecules, so only the new states need to
+        be converted to a Ligand, and the expansion tag is only built once per parent.
+
+        Parameters
+        ----------
+        parent_ligand: The ligand the states were expanded from.
+        parent_mol: The molecule the states were expanded from.
+        states: The expanded states of the parent.
+        provenance: The provenance of the expander to store in the expansion tag.
+        ligand_kwargs: The fields to copy from the parent to each new state.
+        prepare: An optional function to modify each new state in place before it is converted to a Ligand.
+
+        Returns
+        -------
+            The expanded states, where any state which is the same as the parent is the parent ligand itself.
+        """
+        parent_smiles = oemol_to_smiles(parent_mol)
+        expansion_tag = None
+        expanded_states = []
+        for state in states:
+            mol = oechem.OEMol(state)
+            if oemol_to_smiles(mol) == parent_smiles:
+                # if the ligand is the parent ie no possible expansions don't tag it
+                expanded_states.append(parent_ligand)
+                continue
+
+            if expansion_tag is None:
+                expansion_tag = StateExpansionTag.from_parent(
+                    parent=parent_ligand, provenance=provenance
+                )
+            if prepare is not None:
+                prepare(mol)
+            state_ligand = Ligand.from_oemol(mol, **ligand_kwargs)
+            state_ligand.expansion_tag = expansion_tag
+            expanded_states.append(state_ligand)
+
+        return expanded_states
+
     @abc.abstractmethod
     def _provenance(self) -> dict[str, str]:
         """Return the software used to perform the state expansion in the workflow."""
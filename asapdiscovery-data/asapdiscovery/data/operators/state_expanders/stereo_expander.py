@@ -59,23 +59,18 @@ class StereoExpander(StateExpanderBase):
         for parent_ligand in ligands:
             # need to clear the SD data otherwise the provenance will break
             oemol = clear_SD_data(parent_ligand.to_oemol())
-            for enantiomer in oeomega.OEFlipper(
-                oemol, maxcenters, force_flip, enum_nitrogen, warts
-            ):
-                enantiomer = oechem.OEMol(enantiomer)
-                omega.Build(
-                    enantiomer
-                )  # a single conformer needs to be built to fully define stereochemistry
-                enantiomer_ligand = Ligand.from_oemol(
-                    enantiomer, **parent_ligand.dict(exclude={"provenance", "data"})
+            enantiomers.extend(
+                self._states_to_ligands(
+                    parent_ligand=parent_ligand,
+                    parent_mol=oemol,
+                    states=oeomega.OEFlipper(
+                        oemol, maxcenters, force_flip, enum_nitrogen, warts
+                    ),
+                    provenance=provenance,
+                    ligand_kwargs=parent_ligand.dict(exclude={"provenance", "data"}),
+                    # a single conformer needs to be built to fully define stereochemistry
+                    prepare=omega.Build,
                 )
-                # if the ligand is the parent ie no possible expansions don't tag it
-                if enantiomer_ligand.fixed_inchikey == parent_ligand.fixed_inchikey:
-                    enantiomers.append(parent_ligand)
-                else:
-                    enantiomer_ligand.set_expansion(
-                        parent_ligand, provenance=provenance
-                    )
-                    enantiomers.append(enantiomer_ligand)
+            )
 
         return enantiomers
@@ -46,26 +46,21 @@ class TautomerExpander(StateExpanderBase):
             # need to clear the SD data otherwise the provenance will break
             oemol = clear_SD_data(parent_ligand.to_oemol())
 
-            for tautomer in oequacpac.OEGetReasonableTautomers(
-                oemol, tautomer_opts, self.pka_norm
-            ):
-                fmol = oechem.OEMol(tautomer)
-                # copy the ligand properties over to the new molecule, we may want to have more fine grained control over this
-                # down the track.
-                tautomer_ligand = Ligand.from_oemol(
-                    fmol, **parent_ligand.dict(exclude={"provenance", "data"})
-                )
-                # only add the expansion tag to new molecules
-                if tautomer_ligand.fixed_inchikey != parent_ligand.fixed_inchikey:
-                    tautomer_ligand.set_expansion(
-                        parent=parent_ligand, provenance=provenance
-                    )
-                    expanded_states.append(tautomer_ligand)
-                else:
-                    expanded_states.append(parent_ligand)
+            # copy the ligand properties over to the new molecule, we may want to have more fine grained control over this
+            # down the track.
+            tautomers = self._states_to_ligands(
+                parent_ligand=parent_ligand,
+                parent_mol=oemol,
+                states=oequacpac.OEGetReasonableTautomers(
+                    oemol, tautomer_opts, self.pka_norm
+                ),
+                provenance=provenance,
+                ligand_kwargs=parent_ligand.dict(exclude={"provenance", "data"}),
+            )
+            expanded_states.extend(tautomers)
 
             # return the input ligand
-            if parent_ligand not in expanded_states:
+            if parent_ligand not in tautomers:
                 expanded_states.append(parent_ligand)
 
         return expanded_states
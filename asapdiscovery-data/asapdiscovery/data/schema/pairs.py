@@ -1,6 +1,9 @@
 import logging
-from typing import Any, ClassVar
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import islice, product
+from typing import Any, ClassVar, Optional
 
+import numpy as np
 from asapdiscovery.data.schema.complex import Complex
 from asapdiscovery.data.schema.ligand import Ligand
 from pydantic import BaseModel, Field
@@ -38,3 +41,145 @@ class CompoundStructurePair(PairBase):
     @property
     def unique_name(self):
         return f"{self.complex.unique_name}_{self.ligand.compound_name}-{self.ligand.fixed_inchikey}"
+
+
+class LazyPairList(Sequence):
+    """
+    Read-only sequence of ligand-complex pairs that stores the ligands and complexes
+    once, and each pair only as a pair of indices into them. Pair objects are only
+    built when an element is accessed, so selecting over N ligands and M complexes
+    doesn't allocate N x M pair objects up front.
+
+    If no indices are given, the pairs are the full cross product in ligand-major
+    order, ie the same order as ``itertools.product(ligands, complexes)``.
+    """
+
+    def __init__(
+        self,
+        pair_cls: type[PairBase],
+        ligands: list,
+        complexes: list,
+        ligand_idxs: Optional[Iterable[int]] = None,
+        complex_idxs: Optional[Iterable[int]] = None,
+    ):
+        """
+        Parameters
+        ----------
+        pair_cls : type[PairBase]
+            Pair class to build for each element
+        ligands : list[Ligand]
+            Ligands to pair
+        complexes : list[Union[Complex, PreppedComplex]]
+            Complexes to pair
+        ligand_idxs : Iterable[int], optional
+            Index into ligands for each pair. Must be given together with
+            complex_idxs
+        complex_idxs : Iterable[int], optional
+            Index into complexes for each pair. Must be given together with
+            ligand_idxs
+        """
+        if (ligand_idxs is None) != (complex_idxs is None):
+            raise ValueError("ligand_idxs and complex_idxs must be given together")
+
+        self.pair_cls = pair_cls
+        self.ligands = list(ligands)
+        self.complexes = list(complexes)
+
+        if ligand_idxs is None:
+            self.ligand_idxs = None
+            self.complex_idxs = None
+        else:
+            self.ligand_idxs = np.asarray(ligand_idxs, dtype=np.int64)
+            self.complex_idxs = np.asarray(complex_idxs, dtype=np.int64)
+            if self.ligand_idxs.shape != self.complex_idxs.shape:
+                raise ValueError("ligand_idxs and complex_idxs must be the same length")
+
+    def __len__(self) -> int:
+        if self.ligand_idxs is None:
+            return len(self.ligands) * len(self.complexes)
+        return len(self.ligand_idxs)
+
+    def _idxs(self, i: int) -> tuple[int, int]:
+        if self.ligand_idxs is None:
+            return divmod(i, len(self.complexes))
+        return int(self.ligand_idxs[i]), int(self.complex_idxs[i])
+
+    def _make_pair(self, lig_idx: int, complex_idx: int) -> PairBase:
+        # The ligands and complexes have already been validated, so skip validation
+        #  (and the copy of each complex that comes with it)
+        return self.pair_cls.construct(
+            complex=self.complexes[complex_idx], ligand=self.ligands[lig_idx]
+        )
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            idxs = range(len(self))[i]
+            if self.ligand_idxs is None:
+                idxs = np.arange(idxs.start, idxs.stop, idxs.step)
+                lig_idxs, complex_idxs = np.divmod(idxs, len(self.complexes))
+            else:
+                lig_idxs = self.ligand_idxs[i]
+                complex_idxs = self.complex_idxs[i]
+            return LazyPairList(
+                self.pair_cls, self.ligands, self.complexes, lig_idxs, complex_idxs
+            )
+
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("LazyPairList index out of range")
+        return self._make_pair(*self._idxs(i))
+
+    def __iter__(self) -> Iterator[PairBase]:
+        if self.ligand_idxs is None:
+            for lig_idx, complex_idx in product(
+                range(len(self.ligands)), range(len(self.complexes))
+            ):
+                yield self._make_pair(lig_idx, complex_idx)
+        else:
+            for lig_idx, complex_idx in zip(
+                self.ligand_idxs.tolist(), self.complex_idxs.tolist()
+            ):
+                yield self._make_pair(lig_idx, complex_idx)
+
+    def __repr__(self) -> str:
+        return (
+            f"LazyPairList({self.pair_cls.__name__}, {len(self)} pairs, "
+            f"{len(self.ligands)} ligands, {len(self.complexes)} complexes)"
+        )
+
+    def indices(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the index into ligands and the index into complexes of every pair.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Ligand indices and complex indices
+        """
+        if self.ligand_idxs is not None:
+            return self.ligand_idxs, self.complex_idxs
+        if len(self) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.divmod(np.arange(len(self), dtype=np.int64), len(self.complexes))
+
+    def chunks(self, chunk_size: int) -> Iterator[list[PairBase]]:
+        """
+        Iterate over the pairs in lists of at most chunk_size pairs.
+
+        Parameters
+        ----------
+        chunk_size : int
+            Maximum number of pairs in each chunk
+
+        Returns
+        -------
+        Iterator[list[PairBase]]
+            Lists of pairs
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        it = iter(self)
+        while chunk := list(islice(it, chunk_size)):
+            yield chunk
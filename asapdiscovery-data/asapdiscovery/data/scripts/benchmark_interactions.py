@@ -0,0 +1,146 @@
+"""
+Validate the in-process interaction detection against PLIP on a set of complexes, and
+compare the throughput of the two.
+
+For each complex, the interactions found by each method are compared at the level of
+(interaction type, residue), and the per-type recall (fraction of PLIP interactions
+also found in-process) and precision (fraction of in-process interactions also found
+by PLIP) are reported over the whole set. Interaction types that are only detected by
+PLIP (eg water bridges) are included, so they show up with zero recall. If a target is
+given, the FINTscores from both methods are also compared.
+"""
+
+import argparse
+import time
+from glob import glob
+from pathlib import Path
+
+import numpy as np
+from asapdiscovery.data.backend.interactions import INTERACTION_TYPES
+from asapdiscovery.data.backend.plip import (
+    compute_fint_score,
+    get_interactions_inprocess,
+    get_interactions_plip,
+)
+from asapdiscovery.data.schema.complex import Complex
+
+
+################################################################################
+def get_args():
+    parser = argparse.ArgumentParser(description="")
+
+    parser.add_argument(
+        "-i",
+        "--structures",
+        required=True,
+        help="Glob or directory containing complex PDB files.",
+    )
+    parser.add_argument(
+        "-n",
+        "--n-repeats",
+        type=int,
+        default=1,
+        help=(
+            "Number of times to run the in-process detection on each complex, to "
+            "measure throughput when the protein features are reused."
+        ),
+    )
+    parser.add_argument(
+        "-t",
+        "--target",
+        help="Target with fitness data, to also compare FINTscores.",
+    )
+
+    return parser.parse_args()
+
+
+def _residue_intns(intn_dict):
+    # (interaction type, residue) for each interaction
+    return {(v["type"], k.split("_", 1)[1]) for k, v in intn_dict.items()}
+
+
+def main():
+    args = get_args()
+
+    if Path(args.structures).is_dir():
+        str_fns = sorted(glob(f"{args.structures}/*.pdb"))
+    else:
+        str_fns = sorted(glob(args.structures))
+    if len(str_fns) == 0:
+        raise FileNotFoundError(f"No PDB files found for {args.structures}")
+
+    complexes = [
+        Complex.from_pdb(
+            fn,
+            target_kwargs={"target_name": Path(fn).stem},
+            ligand_kwargs={"compound_name": Path(fn).stem},
+        )
+        for fn in str_fns
+    ]
+    mols = [(c.target.to_oemol(), c.ligand.to_oemol()) for c in complexes]
+
+    intn_types = list(INTERACTION_TYPES)
+    n_ref = {intn_type: 0 for intn_type in intn_types}
+    n_test = {intn_type: 0 for intn_type in intn_types}
+    n_both = {intn_type: 0 for intn_type in intn_types}
+    fint_diffs = []
+    plip_time = 0
+    inprocess_time = 0
+    for protein, pose in mols:
+        start = time.perf_counter()
+        ref = _residue_intns(get_interactions_plip(protein, pose, "subpockets", None))
+        plip_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.n_repeats):
+            test = _residue_intns(
+                get_interactions_inprocess(protein, pose, "subpockets", None)
+            )
+        inprocess_time += time.perf_counter() - start
+
+        # Don't filter the PLIP interactions, so any types that aren't detected
+        #  in-process count as misses
+        for intn_type, _ in ref:
+            if intn_type not in intn_types:
+                intn_types.append(intn_type)
+                n_ref[intn_type] = n_test[intn_type] = n_both[intn_type] = 0
+        for intn_type in intn_types:
+            ref_type = {intn for intn in ref if intn[0] == intn_type}
+            test_type = {intn for intn in test if intn[0] == intn_type}
+            n_ref[intn_type] += len(ref_type)
+            n_test[intn_type] += len(test_type)
+            n_both[intn_type] += len(ref_type & test_type)
+
+        if args.target:
+            plip_score = compute_fint_score(protein, pose, args.target)[1]
+            inprocess_score = compute_fint_score(
+                protein, pose, args.target, use_plip=False
+            )[1]
+            fint_diffs.append(abs(plip_score - inprocess_score))
+
+    for intn_type in intn_types:
+        recall = n_both[intn_type] / n_ref[intn_type] if n_ref[intn_type] else 1.0
+        precision = n_both[intn_type] / n_test[intn_type] if n_test[intn_type] else 1.0
+        print(
+            f"{intn_type}: {n_ref[intn_type]} PLIP, {n_test[intn_type]} in-process, "
+            f"recall {recall:.2f}, precision {precision:.2f}",
+            flush=True,
+        )
+
+    n_inprocess = len(mols) * args.n_repeats
+    print(
+        f"PLIP: {1000 * plip_time / len(mols):.1f} ms/pose, "
+        f"in-process: {1000 * inprocess_time / n_inprocess:.1f} ms/pose "
+        f"({plip_time / len(mols) / (inprocess_time / n_inprocess):.1f}x faster)",
+        flush=True,
+    )
+    if fint_diffs:
+        print(
+            f"FINTscore difference: mean {np.mean(fint_diffs):.3f}, "
+            f"max {np.max(fint_diffs):.3f}",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark how state expansion scales with the number of processes, and check that the
+expanded states are the same (and in the same order) for every number of processes.
+"""
+
+import argparse
+import time
+
+from asapdiscovery.data.operators.state_expanders.protomer_expander import (
+    ProtomerExpander,
+)
+from asapdiscovery.data.operators.state_expanders.stereo_expander import StereoExpander
+from asapdiscovery.data.operators.state_expanders.tautomer_expander import (
+    TautomerExpander,
+)
+from asapdiscovery.data.readers.molfile import MolFileFactory
+
+EXPANDERS = {
+    "stereo": StereoExpander,
+    "tautomer": TautomerExpander,
+    "protomer": ProtomerExpander,
+}
+
+
+################################################################################
+def get_args():
+    parser = argparse.ArgumentParser(description="")
+
+    parser.add_argument(
+        "-i",
+        "--ligands",
+        required=True,
+        help="Molecule file (SDF or SMILES) with the ligands to expand.",
+    )
+    parser.add_argument(
+        "-e",
+        "--expander",
+        choices=list(EXPANDERS.keys()),
+        default="stereo",
+        help="State expander to benchmark.",
+    )
+    parser.add_argument(
+        "-n",
+        "--processors",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8],
+        help="Numbers of processes to benchmark.",
+    )
+    parser.add_argument(
+        "-c",
+        "--chunk-size",
+        type=int,
+        help="Number of ligands sent to a process at a time.",
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+
+    ligands = MolFileFactory(filename=args.ligands).load()
+    expander = EXPANDERS[args.expander]()
+
+    ref = None
+    ref_time = None
+    for processors in args.processors:
+        start = time.perf_counter()
+        expanded = expander.expand(
+            ligands, unique=False, processors=processors, chunk_size=args.chunk_size
+        )
+        elapsed = time.perf_counter() - start
+
+        if ref is None:
+            ref = expanded
+            ref_time = elapsed
+        matches = expanded == ref
+
+        print(
+            f"{processors} processes: {len(ligands)} ligands -> {len(expanded)} "
+            f"states in {elapsed:.2f} s ({len(ligands) / elapsed:.1f} ligands/s, "
+            f"{ref_time / elapsed:.2f}x), matches first run: {matches}",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,24 @@
+import shutil
 from pathlib import Path
 
-from asapdiscovery.data.backend.openeye import load_openeye_pdb
-from asapdiscovery.data.backend.plip import compute_fint_score
+import pytest
+from asapdiscovery.data.backend.interactions import (
+    INTERACTION_TYPES,
+    ReceptorInteractionFeatures,
+    detect_interactions,
+    get_receptor_features,
+)
+from asapdiscovery.data.backend.openeye import load_openeye_pdb, oechem
+from asapdiscovery.data.backend.plip import (
+    build_interactions_dict,
+    compute_fint_score,
+    get_fintscore_parameters,
+    get_interactions,
+    get_interactions_inprocess,
+    get_interactions_plip,
+    get_protein_atom_lookup,
+    is_backbone_residue,
+)
 from asapdiscovery.data.readers.molfile import MolFileFactory
 from asapdiscovery.data.testing.test_resources import fetch_test_file
 
@@ -32,3 +49,123 @@ def test_fint_score():
     # should both fall between 0 and 1
     assert 0 <= fint_score[0] <= 1.0
     assert 0 <= fint_score[1] <= 1.0
+
+
+@pytest.fixture(scope="module")
+def protein_and_pose():
+    protein = load_openeye_pdb(
+        Path(
+            fetch_test_file("Mpro-P0008_0A_ERI-UCB-ce40166b-17_prepped_receptor_0.pdb")
+        )
+    )
+    pose = (
+        MolFileFactory(
+            filename=Path(fetch_test_file("Mpro-P0008_0A_ERI-UCB-ce40166b-17.sdf"))
+        )
+        .load()[0]
+        .to_oemol()
+    )
+    return protein, pose
+
+
+def test_inprocess_interactions_format(protein_and_pose):
+    protein, pose = protein_and_pose
+    intn_dict = get_interactions_inprocess(protein, pose, "fitness", "SARS-CoV-2-Mpro")
+
+    assert len(intn_dict) > 0
+    for k, v in intn_dict.items():
+        assert set(v.keys()) == {
+            "lig_at_x",
+            "lig_at_y",
+            "lig_at_z",
+            "prot_at_x",
+            "prot_at_y",
+            "prot_at_z",
+            "type",
+            "color",
+        }
+        assert v["type"] in INTERACTION_TYPES
+        # Coordinates are formatted the same as in the PLIP report
+        assert all(len(v[c].split(".")[1]) == 3 for c in ["lig_at_x", "prot_at_x"])
+
+    # Protein features are only built once
+    assert get_receptor_features(protein) is get_receptor_features(protein)
+
+
+@pytest.mark.skipif(shutil.which("plip") is None, reason="PLIP CLI not installed")
+def test_inprocess_interactions_match_plip(protein_and_pose):
+    protein, pose = protein_and_pose
+
+    def _residue_intns(intn_dict):
+        # (interaction type, residue) for each interaction
+        return {(v["type"], k.split("_", 1)[1]) for k, v in intn_dict.items()}
+
+    # Compare against everything PLIP finds, so types that aren't detected in-process
+    #  count as misses
+    ref = _residue_intns(
+        get_interactions_plip(protein, pose, "subpockets", "SARS-CoV-2-Mpro")
+    )
+    test = _residue_intns(
+        get_interactions_inprocess(protein, pose, "subpockets", "SARS-CoV-2-Mpro")
+    )
+
+    # Most of the residues that PLIP finds interactions with should be found, and not
+    #  too many extra
+    assert len(ref & test) >= 0.75 * len(ref)
+    assert len(test - ref) <= 0.25 * len(test)
+
+    # PLIP is the default
+    assert get_interactions(
+        protein, pose, "subpockets", "SARS-CoV-2-Mpro"
+    ) == get_interactions_plip(protein, pose, "subpockets", "SARS-CoV-2-Mpro")
+
+    plip_scores = compute_fint_score(protein, pose, "SARS-CoV-2-Mpro")
+    inprocess_scores = compute_fint_score(
+        protein, pose, "SARS-CoV-2-Mpro", use_plip=False
+    )
+    assert inprocess_scores == pytest.approx(plip_scores, abs=0.05)
+
+
+def test_protein_atom_lookup(protein_and_pose):
+    protein, _ = protein_and_pose
+    lookup = get_protein_atom_lookup(protein)
+    assert get_protein_atom_lookup(protein) is lookup
+
+    backbone_idxs = {at.GetIdx() for at in protein.GetAtoms(oechem.OEIsBackboneAtom())}
+    for idx, coords in list(protein.GetCoords().items())[:200]:
+        x, y, z = (f"{c:.3f}" for c in coords)
+        assert lookup.find_atom(x, y, z) == idx
+        assert is_backbone_residue(protein, x, y, z) == (idx in backbone_idxs)
+
+    # Coordinates that don't match an atom (eg ring centers) are never backbone
+    assert lookup.find_atom("1000.000", "0.000", "0.000") is None
+    assert not is_backbone_residue(protein, "1000.000", "0.000", "0.000")
+
+
+def test_fitness_lookup_once_per_pose(protein_and_pose, monkeypatch):
+    protein, pose = protein_and_pose
+    interactions = [
+        (intn_type, intn_data)
+        for intn_type, intn_list in detect_interactions(protein, pose).items()
+        for intn_data in intn_list
+    ]
+
+    # The protein is only hashed once for the whole pose, not once per interaction
+    n_keys = []
+    key = ReceptorInteractionFeatures.key
+
+    def _counting_key(protein):
+        n_keys.append(1)
+        return key(protein)
+
+    monkeypatch.setattr(ReceptorInteractionFeatures, "key", staticmethod(_counting_key))
+    intn_dict = build_interactions_dict(
+        interactions, "fitness", protein, "SARS-CoV-2-Mpro"
+    )
+    assert len(intn_dict) == len(interactions) > 1
+    assert len(n_keys) == 1
+
+
+def test_fintscore_parameters_memoised():
+    assert get_fintscore_parameters() is get_fintscore_parameters()
+    assert "backbone_reward_multiplier" in get_fintscore_parameters()
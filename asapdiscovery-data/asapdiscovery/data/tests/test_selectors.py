@@ -1,3 +1,5 @@
+from itertools import product
+
 import pytest
 from asapdiscovery.data.operators.selectors.mcs_selector import (
     MCSSelector,
@@ -9,8 +11,8 @@ from asapdiscovery.data.operators.selectors.pairwise_selector import (
     PairwiseSelector,
     SelfDockingSelector,
 )
-from asapdiscovery.data.schema.ligand import Ligand
-from asapdiscovery.data.schema.pairs import CompoundStructurePair
+from asapdiscovery.data.schema.ligand import ChemicalRelationship, Ligand
+from asapdiscovery.data.schema.pairs import CompoundStructurePair, LazyPairList
 from asapdiscovery.docking.docking import DockingInputPair  # TODO: move to data
 
 
@@ -38,6 +40,63 @@ def test_self_docking_selector(ligands_from_complexes, complexes):
     assert len(pairs) == 4
 
 
+@pytest.mark.parametrize(
+    "selector_cls, keep",
+    [
+        (PairwiseSelector, lambda lig, c: True),
+        (LeaveOneOutSelector, lambda lig, c: lig.inchi != c.ligand.inchi),
+        (
+            LeaveSimilarOutSelector,
+            lambda lig, c: lig.get_chemical_relationship(c.ligand)
+            not in ChemicalRelationship.IDENTICAL
+            | ChemicalRelationship.STEREOISOMER
+            | ChemicalRelationship.TAUTOMER
+            | ChemicalRelationship.PROTONATION_STATE_ISOMER,
+        ),
+        (SelfDockingSelector, lambda lig, c: lig.inchi == c.ligand.inchi),
+    ],
+)
+def test_lazy_selectors_match_eager(
+    ligands_from_complexes, complexes, selector_cls, keep
+):
+    # Check the lazy pairs are the same, in the same order, as comparing every pair
+    pairs = selector_cls().select(ligands_from_complexes, complexes)
+    assert isinstance(pairs, LazyPairList)
+
+    expected = [
+        CompoundStructurePair(ligand=lig, complex=c)
+        for lig, c in product(ligands_from_complexes, complexes)
+        if keep(lig, c)
+    ]
+    assert len(pairs) == len(expected)
+    assert list(pairs) == expected
+    assert [pairs[i] for i in range(len(pairs))] == expected
+    assert pairs[-1] == expected[-1]
+    assert list(pairs[1::3]) == expected[1::3]
+    assert [p for chunk in pairs.chunks(7) for p in chunk] == expected
+    assert all(len(chunk) <= 7 for chunk in pairs.chunks(7))
+
+
+def test_lazy_pair_list_shares_inputs(ligands_from_complexes, complexes):
+    pairs = PairwiseSelector().select(ligands_from_complexes, complexes)
+    # Pairs reference the input objects rather than copies of them
+    assert pairs[0].complex is complexes[0]
+    assert pairs[0].ligand is ligands_from_complexes[0]
+    with pytest.raises(IndexError):
+        pairs[len(pairs)]
+
+
+def test_lazy_pair_list_dask(ligands_from_complexes, complexes):
+    pairs = PairwiseSelector().select(ligands_from_complexes, complexes)
+    dask_pairs = PairwiseSelector().select(
+        ligands_from_complexes, complexes, use_dask=True
+    )
+    # The per-ligand results are merged into one lazy list over the inputs
+    assert isinstance(dask_pairs, LazyPairList)
+    assert dask_pairs[0].complex is complexes[0]
+    assert list(dask_pairs) == list(pairs)
+
+
 @pytest.mark.parametrize("use_dask", [True, False])
 def test_pairwise_selector_prepped(ligands_from_complexes, prepped_complexes, use_dask):
     selector = PairwiseSelector()
@@ -222,3 +222,34 @@ def test_openeye_tautomer_expander():
                 == ligand.fixed_inchikey
             )
             assert expanded_ligand.expansion_tag.provenance == expander.provenance()
+
+
+@pytest.mark.parametrize(
+    "expander", [StereoExpander(), TautomerExpander(), ProtomerExpander()]
+)
+@pytest.mark.parametrize("chunk_size", [None, 1, 2])
+def test_expand_parallel_matches_serial(expander, chunk_size):
+    """Make sure expanding over a process pool gives the same states, in the same order, as expanding in serial."""
+
+    ligands = [
+        Ligand.from_smiles(smiles, compound_name=f"lig_{i}")
+        for i, smiles in enumerate(
+            [
+                "CC[CH](O1)CC[C]12CCCO2",
+                "c1[nH]c2c(=O)[nH]c(nc2n1)N",
+                "CCO",
+                "CC(=O)CC(c1ccccc1)C1=C(O)c2ccccc2OC1=O",
+                "C[C@H](N)C(=O)O",
+            ]
+        )
+    ]
+    serial = expander.expand(ligands=ligands, unique=False)
+    parallel = expander.expand(
+        ligands=ligands, unique=False, processors=2, chunk_size=chunk_size
+    )
+    assert parallel == serial
+    assert [lig.expansion_tag for lig in parallel] == [
+        lig.expansion_tag for lig in serial
+    ]
+    # unique keeps the first copy of each state so the order is also deterministic
+    assert expander.expand(ligands=ligands, processors=2) == list(dict.fromkeys(serial))
@@ -128,6 +128,12 @@ def pose_html(
     help="Frames per nanosecond, default matches the default output frequency for VanillaMDSimulator",
 )
 @click.option("--smooth", default=5, type=int, help="Number of frames to smooth over")
+@click.option(
+    "--processors",
+    default=1,
+    type=int,
+    help="Number of PyMOL processes to render frames over",
+)
 @click.option(
     "--pymol-debug",
     is_flag=True,
@@ -141,6 +147,7 @@ def traj_gif(
     target: TargetTags,
     frames_per_ns: int,
     smooth: int,
+    processors: int,
     pymol_debug: bool,
     loglevel: Union[int, str] = logging.INFO,
 ):
@@ -211,6 +218,7 @@ def traj_gif(
             smooth=smooth,
             start=start,
             output_dir=output_dir,
+            processors=processors,
         )
         gif_visualiser.visualize(
             inputs=[(traj_path, top_path)], outpaths=[output_dir / "traj.gif"]
@@ -62,6 +62,8 @@ class GIFVisualizer(VisualizerBase):
         Stop frame
     interval : PositiveInt
         Interval between frames
+    processors : PositiveInt
+        Number of headless PyMOL processes to render trajectory frames over
     """
 
     target: TargetTags = Field(..., description="Target to visualize poses for")
@@ -91,6 +93,10 @@ class GIFVisualizer(VisualizerBase):
     )
     stop: int = Field(-1, description="Stop frame")
     interval: PositiveInt = Field(1, description="Interval between frames")
+    processors: PositiveInt = Field(
+        1,
+        description="Number of headless PyMOL processes to render trajectory frames over",
+    )
     debug: bool = Field(False, description="Whether to run in debug mode")
 
     class Config:
@@ -127,6 +133,7 @@ class GIFVisualizer(VisualizerBase):
         zoom_view: bool,
         outpath: Optional[Path] = None,
         out_dir: Optional[Path] = None,
+        processors: int = 1,
     ):
         view_coords = GIFBlockData.get_view_coords()
 
@@ -300,9 +307,15 @@ class GIFVisualizer(VisualizerBase):
         )  # limit to 1 threads to prevent PyMOL from oversubscribing
         p.cmd.mclear()  # clears cache
         prefix = str(tmpdir / "frame")
-        p.cmd.mpng(
-            prefix
-        )  # saves png of each frame as "frame001.png, frame002.png, .."
+        n_frames = p.cmd.count_frames()
+        if processors > 1 and n_frames > 1:
+            # save the prepared session so each render process can pick it up as is.
+            session = tmpdir / "prepared_session.pse"
+            p.cmd.save(str(session))
+        else:
+            p.cmd.mpng(
+                prefix
+            )  # saves png of each frame as "frame001.png, frame002.png, .."
 
         # stop pymol instance
         if pse or pse_share:
@@ -313,15 +326,31 @@ class GIFVisualizer(VisualizerBase):
 
         import imageio.v2 as iio
 
+        if processors > 1 and n_frames > 1:
+            # shard the frames into contiguous ranges, one headless PyMOL per range.
+            # progress bars are added by the render processes as frames are written.
+            render_frames_parallel(
+                session,
+                prefix,
+                n_frames=n_frames,
+                processors=processors,
+                frames_per_ns=frames_per_ns,
+                start_frame=start,
+            )
+
         png_files = glob(f"{prefix}*.png")
         if len(png_files) == 0:
             raise OSError(f"No {prefix}*.png files found - did PyMol not generate any?")
-        png_files.sort()  # for some reason *sometimes* this list is scrambled messing up the GIF. Sorting fixes the issue.
-
-        # add progress bar to each frame
+        # for some reason *sometimes* this list is scrambled messing up the GIF. Sorting by frame number fixes the issue.
+        png_files.sort(key=_frame_number)
 
-        add_gif_progress_bar(png_files, frames_per_ns=frames_per_ns, start_frame=start)
+        if not (processors > 1 and n_frames > 1):
+            # add progress bar to each frame
+            add_gif_progress_bar(
+                png_files, frames_per_ns=frames_per_ns, start_frame=start
+            )
 
+        # frames are encoded one at a time so they are never all held in memory.
         with iio.get_writer(str(path), mode="I") as writer:
             for filename in png_files:
                 image = iio.imread(filename)
@@ -384,6 +413,7 @@ class GIFVisualizer(VisualizerBase):
                     frames_per_ns=self.frames_per_ns,
                     zoom_view=self.zoom_view,
                     out_dir=self.output_dir,
+                    processors=self.processors,
                 )
                 row = {}
                 row[DockingResultCols.LIGAND_ID.value] = (
@@ -454,6 +484,7 @@ class GIFVisualizer(VisualizerBase):
                     frames_per_ns=self.frames_per_ns,
                     zoom_view=self.zoom_view,
                     out_dir=self.output_dir,
+                    processors=self.processors,
                 )
                 row = {}
                 row[DockingResultCols.LIGAND_ID.value] = complex.ligand.compound_name
@@ -473,8 +504,104 @@ class GIFVisualizer(VisualizerBase):
         return data
 
 
+def _frame_number(filename: Union[Path, str]) -> int:
+    """Get the frame index from a PNG named path/frame<INDEX>.png"""
+    return int(str(filename).split("frame")[-1].split(".png")[0])
+
+
+def _render_frame_range(
+    session: Path,
+    prefix: str,
+    first: int,
+    last: int,
+    n_frames: int,
+    frames_per_ns: int,
+    start_frame: int,
+) -> list[str]:
+    """
+    Render frames `first` to `last` (inclusive, 1-indexed) of a prepared PyMOL session
+    in a fresh headless PyMOL instance, then add the progress bar to each of them.
+    """
+    from glob import glob
+
+    import pymol2
+
+    p = pymol2.PyMOL()
+    p.start()
+    p.cmd.load(str(session))
+    p.cmd.set("ray_trace_frames", 0)
+    p.cmd.set("defer_builds_mode", 1)
+    p.cmd.set("cache_frames", 0)
+    p.cmd.set("max_threads", 1)
+    p.cmd.mclear()
+    p.cmd.mpng(prefix, first=first, last=last)
+    p.stop()
+
+    png_files = [f for f in glob(f"{prefix}*.png") if first <= _frame_number(f) <= last]
+    add_gif_progress_bar(
+        png_files,
+        frames_per_ns=frames_per_ns,
+        start_frame=start_frame,
+        total_frames=n_frames,
+    )
+    return png_files
+
+
+def render_frames_parallel(
+    session: Path,
+    prefix: str,
+    n_frames: int,
+    processors: int,
+    frames_per_ns: int,
+    start_frame: int = 1,
+) -> None:
+    """
+    Render all frames of a prepared PyMOL session to PNG files named <prefix><INDEX>.png by
+    sharding the frames into contiguous ranges across several headless PyMOL processes.
+
+    Parameters
+    ----------
+    session : Path
+        Path to the prepared PyMOL session holding the trajectory and view.
+    prefix : str
+        Prefix of the PNG files to write.
+    n_frames : int
+        Number of frames in the session.
+    processors : int
+        Number of PyMOL processes to render with.
+    frames_per_ns : int
+        Number of frames per nanosecond, used for the progress bar.
+    start_frame : int
+        Frame the trajectory was loaded from, used for the progress bar.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    n_shards = min(processors, n_frames)
+    shard_size = -(-n_frames // n_shards)  # ceiling division
+    with ProcessPoolExecutor(max_workers=n_shards) as pool:
+        work_list = [
+            pool.submit(
+                _render_frame_range,
+                session,
+                prefix,
+                first,
+                min(first + shard_size - 1, n_frames),
+                n_frames,
+                frames_per_ns,
+                start_frame,
+            )
+            for first in range(1, n_frames + 1, shard_size)
+        ]
+        for work in work_list:
+            # raise any error from the render processes
+            work.result()
+
+
 def add_gif_progress_bar(
-    png_files: list[Union[Path, str]], frames_per_ns: int, start_frame: int = 1
+    png_files: list[Union[Path, str]],
+    frames_per_ns: int,
+    start_frame: int = 1,
+    total_frames: Optional[int] = None,
 ) -> None:
     """
     adds a progress bar and nanosecond counter onto PNG images. This assumes PNG
@@ -489,16 +616,20 @@ def add_gif_progress_bar(
         Number of frames per nanosecond
     start_frame : int
         Frame to start from. Default is 1, which is the first frame, note indexed at 1.
+    total_frames : int, optional
+        Total number of frames in the GIF, defaults to the number of PNG files given.
+        Needed when only a subset of the frames is processed at once.
     """
     from PIL import Image, ImageDraw, ImageFont
 
     # global settings:
-    total_frames = len(png_files)
+    if total_frames is None:
+        total_frames = len(png_files)
 
     for filename in png_files:
         filename = str(filename)
         # get this file's frame number from the filename and calculate total amount of ns simulated for this frame
-        frame_num = int(filename.split("frame")[1].split(".png")[0])
+        frame_num = _frame_number(filename)
         # adjust for the fact that we may not have started at the first frame, which will still be written out  as frame0001.png
         # note 1 indexing here.
         frame_num_actual = frame_num + start_frame - 1
@@ -1,5 +1,7 @@
 import base64
+import hashlib
 import logging  # noqa: F401
+import os
 import tempfile
 import warnings
 from enum import Enum
@@ -20,7 +22,7 @@ from asapdiscovery.data.backend.openeye import (
     openeye_perceive_residues,
 )
 from asapdiscovery.data.backend.plip import (
-    get_interactions_plip,
+    get_interactions,
     make_color_res_fitness,
     make_color_res_subpockets,
 )
@@ -37,7 +39,10 @@ from asapdiscovery.dataviz._html_blocks import HTMLBlockData
 from asapdiscovery.dataviz.visualizer import VisualizerBase
 from asapdiscovery.docking.docking import DockingResult
 from asapdiscovery.docking.docking_data_validation import DockingResultCols
-from asapdiscovery.modeling.modeling import superpose_molecule  # TODO: move to backend
+from asapdiscovery.modeling.modeling import (  # TODO: move to backend
+    find_superposition,
+    superpose_molecule,
+)
 from asapdiscovery.spectrum.fitness import (
     _FITNESS_DATA_FIT_THRESHOLD,
     get_fitness_scores_bloom_by_target,
@@ -78,6 +83,10 @@ class HTMLVisualizer(VisualizerBase):
         Output directory to write HTML files to
     align : bool
         Whether to align the poses to the reference protein
+    shared_receptor : bool
+        Whether to write each receptor once as a shared asset referenced by the per-pose pages,
+        rather than embedding the full receptor in every page. Only used for `DockingResult`
+        inputs written to disk.
 
     """
 
@@ -102,9 +111,14 @@ class HTMLVisualizer(VisualizerBase):
     active_site_chain: Optional[str] = Field(
         None, description="Mobile chain ID to align."
     )
+    shared_receptor: bool = Field(
+        False,
+        description="Whether to write each receptor once as a shared asset referenced by the per-pose pages",
+    )
     fitness_data: Optional[Any]
     fitness_data_logoplots: Optional[Any]
     reference_protein: Optional[Any]
+    receptor_cache: Optional[Any]
 
     @root_validator(pre=True)
     def check_and_set_chains(cls, values):
@@ -126,6 +140,8 @@ class HTMLVisualizer(VisualizerBase):
                 self.target
             )
         self.reference_protein = load_openeye_pdb(master_structures[self.target])
+        # prepared receptors keyed by target hash and settings, reused across calls in shared receptor mode
+        self.receptor_cache = {}
 
     @root_validator
     @classmethod
@@ -218,9 +234,21 @@ class HTMLVisualizer(VisualizerBase):
                 else:
                     outpath = None  # we don't need to write to disk
 
-                viz = self.html_pose_viz(
-                    poses=[result.posed_ligand.to_oemol()], protein=result.to_protein()
-                )
+                if self.shared_receptor and self.write_to_disk:
+                    receptor = self.get_shared_receptor(result)
+                    viz = self.html_pose_viz(
+                        poses=[result.posed_ligand.to_oemol()],
+                        protein=receptor["protein"],
+                        receptor=receptor,
+                        receptor_src=os.path.relpath(
+                            receptor["asset_path"], outpath.parent
+                        ),
+                    )
+                else:
+                    viz = self.html_pose_viz(
+                        poses=[result.posed_ligand.to_oemol()],
+                        protein=result.to_protein(),
+                    )
                 viz_data.append(viz)
                 # write to disk
                 if self.write_to_disk:
@@ -430,8 +458,144 @@ class HTMLVisualizer(VisualizerBase):
             # if we are not writing to disk, return the HTML strings
             return viz_data
 
+    def get_shared_receptor(self, result: DockingResult) -> dict:
+        """
+        Get the prepared receptor for a docking result, preparing it and writing it as a
+        shared asset the first time it is seen. Prepared receptors are cached by target hash
+        so each receptor is only perceived, aligned and colored once.
+
+        Parameters
+        ----------
+        result : DockingResult
+            Docking result whose receptor to prepare
+
+        Returns
+        -------
+        dict
+            The prepared receptor, with the residue-perceived (and aligned if `align` is set)
+            `protein`, the `superposition` to apply to its poses (or None) and the
+            `asset_path` of the shared receptor script.
+        """
+        key = self.shared_receptor_key(result.input_pair.complex.target.hash)
+        if key in self.receptor_cache:
+            return self.receptor_cache[key]
+
+        protein = openeye_perceive_residues(result.to_protein(), preserve_all=True)
+        superposition = None
+        if self.align:
+            superposition = find_superposition(
+                self.reference_protein,
+                protein,
+                ref_chain=self.ref_chain,
+                mobile_chain=self.active_site_chain,
+            )
+            superposition.Transform(protein)
+
+        asset_path = self.output_dir / "receptors" / f"{key}.js"
+        if not asset_path.exists():
+            asset_path.parent.mkdir(parents=True, exist_ok=True)
+            # write to a temporary file and rename it into place so that parallel
+            # workers never see a partially written asset
+            with tempfile.NamedTemporaryFile(
+                "w", dir=asset_path.parent, suffix=".js.tmp", delete=False
+            ) as f:
+                f.write(
+                    self.make_receptor_js(
+                        protein, self.make_coloring_function_js(protein)
+                    )
+                )
+            os.replace(f.name, asset_path)
+
+        receptor = {
+            "protein": protein,
+            "superposition": superposition,
+            "asset_path": asset_path,
+        }
+        self.receptor_cache[key] = receptor
+        return receptor
+
+    def shared_receptor_key(self, target_hash: str) -> str:
+        """
+        Get the key of a shared receptor asset. As well as the receptor itself this
+        depends on the settings used to color and align it, so assets written with
+        different settings are never reused.
+
+        Parameters
+        ----------
+        target_hash : str
+            Hash of the receptor
+
+        Returns
+        -------
+        str
+            The key of the shared receptor asset
+        """
+        settings = [
+            target_hash,
+            str(self.target),
+            str(self.color_method),
+            str(self.align),
+            str(self.ref_chain),
+            str(self.active_site_chain),
+        ]
+        return hashlib.sha256("_".join(settings).encode()).hexdigest()
+
+    def make_coloring_function_js(self, protein: oechem.OEMolBase) -> str:
+        """
+        Make the body of the JS function coloring the protein surface by residue.
+        """
+        surface_coloring = self.get_color_dict(protein)
+
+        residue_coloring_function_js = ""
+        start = True
+        for color, residues in surface_coloring.items():
+            residues = [
+                f"'{res}'" for res in residues
+            ]  # need to wrap the string in quotes *within* the JS code
+            if start:
+                residue_coloring_function_js += (
+                    "if (["
+                    + ",".join(residues)
+                    + "].includes(atom.resi+'_'+atom.chain)){ \n return '"
+                    + color
+                    + "' \n "
+                )
+                start = False
+            else:
+                residue_coloring_function_js += (
+                    "} else if (["
+                    + ",".join(residues)
+                    + "].includes(atom.resi+'_'+atom.chain)){ \n return '"
+                    + color
+                    + "' \n "
+                )
+        return residue_coloring_function_js
+
+    @staticmethod
+    def make_receptor_js(
+        protein: oechem.OEMolBase, residue_coloring_function_js: str
+    ) -> str:
+        """
+        Make the JS block defining the receptor PDB string and its surface coloring function.
+        This is either inlined in a page or written once as a shared receptor asset.
+        """
+        return (
+            "var prot_pdb = `    "
+            + oemol_to_pdb_string(protein)
+            + "\n \n `;\n"
+            + "// define a coloring function based on our residue ranges. We can't call .addSurface separate times because the surfaces won't be merged nicely. \n"
+            + "var colorAsSnake = function(atom) { "
+            + residue_coloring_function_js
+            + " }};\n"
+        )
+
     def html_pose_viz(
-        self, poses: list[oechem.OEMolBase], protein: oechem.OEMolBase, **kwargs
+        self,
+        poses: list[oechem.OEMolBase],
+        protein: oechem.OEMolBase,
+        receptor: Optional[dict] = None,
+        receptor_src: Optional[str] = None,
+        **kwargs,
     ) -> str:
         """
         Generate HTML visualization of poses, called by the `_dispatch` method.
@@ -442,13 +606,20 @@ class HTMLVisualizer(VisualizerBase):
             List of poses to visualize
         protein : oechem.OEMolBase
             Protein to visualize
+        receptor : dict, optional
+            Receptor already prepared by `get_shared_receptor`, if given the protein is not
+            prepared again and the poses are moved with the receptor's superposition.
+        receptor_src : str, optional
+            Path of the shared receptor asset relative to the page. If given the page
+            references the asset instead of embedding the receptor.
 
         Returns
         -------
         str
             HTML string
         """
-        protein = openeye_perceive_residues(protein, preserve_all=True)
+        if receptor is None:
+            protein = openeye_perceive_residues(protein, preserve_all=True)
         if self.target == "EV-A71-Capsid" or self.target == "EV-D68-Capsid":
             # because capsid has an encapsulated ligand, we need to Z-clip.
             slab = "viewer.setSlab(-11, 50)\n"
@@ -464,7 +635,18 @@ class HTMLVisualizer(VisualizerBase):
 
         # first check if we need to align the protein and ligand. This already happens during docking, but not
         # during pose_to_viz.py.
-        if self.align:
+        if receptor is not None:
+            # the receptor is already prepared, only the poses need moving into its frame
+            protein = receptor["protein"]
+            _pose = oechem.OEGraphMol()
+            for pose in poses:
+                pose = oechem.OEGraphMol(pose)
+                if receptor["superposition"] is not None:
+                    receptor["superposition"].Transform(pose)
+                oechem.OEAddMols(_pose, pose)
+            pose = _pose
+
+        elif self.align:
             # merge
             complex = protein
             for pose in poses:
@@ -514,32 +696,13 @@ class HTMLVisualizer(VisualizerBase):
         oechem.OESuppressHydrogens(
             pose, True, True
         )  # retain polar hydrogens and hydrogens on chiral centers
-        # now prep the coloring function.
-        surface_coloring = self.get_color_dict(protein)
-
-        residue_coloring_function_js = ""
-        start = True
-        for color, residues in surface_coloring.items():
-            residues = [
-                f"'{res}'" for res in residues
-            ]  # need to wrap the string in quotes *within* the JS code
-            if start:
-                residue_coloring_function_js += (
-                    "if (["
-                    + ",".join(residues)
-                    + "].includes(atom.resi+'_'+atom.chain)){ \n return '"
-                    + color
-                    + "' \n "
-                )
-                start = False
-            else:
-                residue_coloring_function_js += (
-                    "} else if (["
-                    + ",".join(residues)
-                    + "].includes(atom.resi+'_'+atom.chain)){ \n return '"
-                    + color
-                    + "' \n "
-                )
+        # now prep the receptor and its coloring function, unless it lives in a shared asset.
+        if receptor_src is None:
+            receptor_js = self.make_receptor_js(
+                protein, self.make_coloring_function_js(protein)
+            )
+        else:
+            receptor_js = ""
 
         # start writing the HTML doc.
         a("<!DOCTYPE HTML>")
@@ -569,6 +732,9 @@ class HTMLVisualizer(VisualizerBase):
                 )
                 a.script(src="https://3Dmol.csb.pitt.edu/build/3Dmol-min.js")
                 a.script(src="https://d3js.org/d3.v5.min.js")
+                if receptor_src is not None:
+                    # defines prot_pdb and colorAsSnake
+                    a.script(src=receptor_src)
                 with a.style():
                     a(
                         "/* Dropdown Button */\n      .dropbtn {\n        background-color: #04AA6D;\n        color: white;\n        padding: 16px;\n        font-size: 16px;\n        border: none;\n        border-radius: 5;\n      }\n\n      /* The container <div> - needed to position the dropdown content */\n      .dropdown {\n        position: absolute;\n        display: inline-block;\n        left: 1%;\n        top: 1%;\n      }\n      .dropdown_ctcs {\n        position: absolute;\n        top: 7%;\n        left: 1%;\n        display: inline-block;\n      }\n\n  .dropdown_lgplts {\n        position: absolute;\n        top: 13%;\n        left: 1%;\n        display: inline-block;\n      }\n\n    /* Dropdown Content (Hidden by Default) */\n      .dropdown-content {\n        display: none;\n        position: relative;\n        background-color: #f1f1f1;\n        min-width: 160px;\n        box-shadow: 0px 8px 16px 0px rgba(0,0,0,0.2);\n        z-index: 1;\n      }\n\n      /* Links inside the dropdown */\n      .dropdown-content a {\n        color: black;\n        padding: 12px 16px;\n        text-decoration: none;\n        display: block;\n        cursor: default;\n      }\n                                                              \n      /* Show the dropdown menu on hover */\n      .dropdown:hover .dropdown-content {display: block;}\n      .dropdown_ctcs:hover .dropdown-content {display: block;}\n   .dropdown_lgplts:hover .dropdown-content {display: block;}\n   \n      /* Change the background color of the dropdown button when the dropdown content is shown */\n      .dropdown:hover .dropbtn {background-color: #3e8e41;}\n    \n\n      .viewerbox {\n        position: absolute;\n        width: 200px;\n        height: 100px;\n        padding: 10px;\n      }\n\n      .logoplotbox_unfit {\n        position: absolute;\n        top: 35%;\n        right:1%;\n        border: 5px solid black;\n      }\n      .logoplotbox_fit {\n        position: absolute;\n        top: 35%;\n        left:1%;\n        border: 5px solid black;\n      }"
@@ -720,13 +886,9 @@ class HTMLVisualizer(VisualizerBase):
 
                 # function to show 3DMol viewer
                 a(
-                    'var viewer=$3Dmol.createViewer($("#gldiv"));\n \
-                    var prot_pdb = `    '
-                    + oemol_to_pdb_string(protein)
-                    + "\n \
-                    \n \
-                    `;\n \
-                    var lig_sdf =`  "
+                    'var viewer=$3Dmol.createViewer($("#gldiv"));\n'
+                    + receptor_js
+                    + "var lig_sdf =`  "
                     + oemol_to_sdf_string(pose)
                     + '\n \
                     `;       \n \
@@ -734,12 +896,6 @@ class HTMLVisualizer(VisualizerBase):
                         viewer.addModel(prot_pdb, "pdb") \n \
                         // set protein sticks and surface\n \
                         viewer.setStyle({model: 0}, {stick: {colorscheme: "whiteCarbon", radius:0.15}});\n \
-                        // define a coloring function based on our residue ranges. We can\'t call .addSurface separate times because the surfaces won\'t be merged nicely. \n \
-                        var colorAsSnake = function(atom) { \
-                        '
-                    + residue_coloring_function_js
-                    + ' \
-                                        }}; \
                         viewer.addSurface("MS", {colorfunc: colorAsSnake, opacity: 0.9}) \n \
                     \n \
                         viewer.setStyle({bonds: 0}, {sphere:{radius:0.5}}); //water molecules\n \
@@ -774,9 +930,7 @@ class HTMLVisualizer(VisualizerBase):
                         //////////////// add protein-ligand interactions\n \
                         var intn_dict = "
                     + str(
-                        get_interactions_plip(
-                            protein, pose, self.color_method, self.target
-                        )
+                        get_interactions(protein, pose, self.color_method, self.target)
                     )
                     + '\n \
                         for (const [_, intn] of Object.entries(intn_dict)) {\n \
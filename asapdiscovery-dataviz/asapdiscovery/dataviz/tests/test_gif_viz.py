@@ -15,3 +15,10 @@ def test_gif_viz_paths(tmp_path, traj, top, use_dask, outpaths):
     gv = GIFVisualizer(target="SARS-CoV-2-Mpro", output_dir=tmp_path)
     vizs = gv.visualize(inputs=[(traj, top)], use_dask=use_dask, outpaths=outpaths)
     assert len(vizs) == 1
+
+
+def test_gif_viz_parallel_frames(tmp_path, traj, top):
+    gv = GIFVisualizer(target="SARS-CoV-2-Mpro", output_dir=tmp_path, processors=2)
+    vizs = gv.visualize(inputs=[(traj, top)], outpaths=["viz.gif"])
+    assert len(vizs) == 1
+    assert (tmp_path / "viz.gif").exists()
@@ -118,3 +118,39 @@ def test_html_viz_from_multisdf(tmp_path, protein, pose, use_dask):
     )
     vizs = html_viz.visualize(inputs=[(cmplx, ligs)], use_dask=use_dask)
     assert len(vizs) == 1
+
+
+@pytest.mark.parametrize("align", [True, False])
+def test_html_viz_shared_receptor(docking_results_in_memory, align, tmp_path):
+    html_viz = HTMLVisualizer(
+        target="SARS-CoV-2-Mpro",
+        output_dir=tmp_path,
+        color_method="subpockets",
+        align=align,
+        shared_receptor=True,
+    )
+    vizs = html_viz.visualize(inputs=docking_results_in_memory, use_dask=False)
+    assert len(vizs) == 1
+    receptors = list((tmp_path / "receptors").glob("*.js"))
+    assert len(receptors) == 1
+    assert len(html_viz.receptor_cache) == 1
+    # the page references the shared receptor rather than embedding it
+    page = open(vizs[html_viz.get_tag_for_color_method()].iloc[0]).read()
+    assert receptors[0].name in page
+    assert "var prot_pdb" not in page
+
+
+def test_html_viz_shared_receptor_key(tmp_path):
+    # assets written with different coloring or alignment settings are not reused
+    keys = {
+        HTMLVisualizer(
+            target="SARS-CoV-2-Mpro",
+            output_dir=tmp_path,
+            color_method=color_method,
+            align=align,
+            shared_receptor=True,
+        ).shared_receptor_key("receptor-hash")
+        for color_method in ["subpockets", "fitness"]
+        for align in [True, False]
+    }
+    assert len(keys) == 4
@@ -5,8 +5,9 @@ Defines docking base schema.
 import abc
 import json
 import logging
+from itertools import islice
 from pathlib import Path
-from typing import Any, Literal, Optional, Union
+from typing import Any, ClassVar, Literal, Optional, Union
 
 import numpy as np
 from asapdiscovery.data.backend.openeye import (
@@ -16,7 +17,7 @@ from asapdiscovery.data.backend.openeye import (
 )
 from asapdiscovery.data.schema.complex import Complex, PreppedComplex
 from asapdiscovery.data.schema.ligand import Ligand
-from asapdiscovery.data.schema.pairs import CompoundStructurePair
+from asapdiscovery.data.schema.pairs import CompoundStructurePair, LazyPairList
 from asapdiscovery.data.schema.sets import MultiStructureBase
 from asapdiscovery.data.schema.target import Target
 from asapdiscovery.data.util.dask_utils import BackendType, FailureMode
@@ -80,6 +81,9 @@ class DockingBase(BaseModel):
 
     type: Literal["DockingBase"] = "DockingBase"
 
+    # Number of pairs docked at once when docking a LazyPairList
+    DEFAULT_CHUNK_SIZE: ClassVar[int] = 1000
+
     @abc.abstractmethod
     def _dock(
         self, inputs: list[DockingInputPair], output_dir: Union[str, Path]
@@ -93,6 +97,7 @@ class DockingBase(BaseModel):
         dask_client=None,
         failure_mode=FailureMode.SKIP,
         return_for_disk_backend: bool = False,
+        chunk_size: Optional[int] = None,
     ) -> list["DockingResult"]:
         """
         Run docking on a list of DockingInputPairs
@@ -112,6 +117,11 @@ class DockingBase(BaseModel):
             Dask failure mode, by default FailureMode.SKIP
         return_for_disk_backend : bool, optional
             Whether to return the results for disk backend, by default False
+        chunk_size : Optional[int], optional
+            Number of inputs to dock at once. Pairs are only built one chunk at a
+            time, so this bounds how many are held in memory (and submitted to dask)
+            at once. By default None, which docks all inputs at once, except for a
+            LazyPairList, which is docked in chunks of DEFAULT_CHUNK_SIZE
 
         Returns
         -------
@@ -122,14 +132,29 @@ class DockingBase(BaseModel):
         if output_dir is not None:
             Path(output_dir).mkdir(parents=True, exist_ok=True)
 
-        outputs = self._dock(
-            inputs=inputs,
-            output_dir=output_dir,
-            use_dask=use_dask,
-            dask_client=dask_client,
-            failure_mode=failure_mode,
-            return_for_disk_backend=return_for_disk_backend,
-        )
+        if chunk_size is None and isinstance(inputs, LazyPairList):
+            chunk_size = self.DEFAULT_CHUNK_SIZE
+
+        if chunk_size is None:
+            chunks = [inputs]
+        elif isinstance(inputs, LazyPairList):
+            chunks = inputs.chunks(chunk_size)
+        else:
+            it = iter(inputs)
+            chunks = iter(lambda: list(islice(it, chunk_size)), [])
+
+        outputs = []
+        for chunk in chunks:
+            outputs.extend(
+                self._dock(
+                    inputs=chunk,
+                    output_dir=output_dir,
+                    use_dask=use_dask,
+                    dask_client=dask_client,
+                    failure_mode=failure_mode,
+                    return_for_disk_backend=return_for_disk_backend,
+                )
+            )
 
         return outputs
 
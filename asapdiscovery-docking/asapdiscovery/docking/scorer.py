@@ -23,6 +23,7 @@ from asapdiscovery.data.util.dask_utils import (
 )
 from asapdiscovery.docking.docking import DockingResult
 from asapdiscovery.docking.docking_data_validation import DockingResultCols
+from asapdiscovery.ml.dataset import PocketCropper
 from asapdiscovery.ml.inference import InferenceBase, get_inference_cls_from_model_type
 from asapdiscovery.ml.models import MLModelSpecBase
 from asapdiscovery.spectrum.fitness import target_has_fitness_data
@@ -462,6 +463,14 @@ class FINTScorer(ScorerBase):
     score_type: ScoreType = Field(ScoreType.FINT, description="Type of score")
     units: ClassVar[ScoreUnits.arbitrary] = ScoreUnits.arbitrary
     target: TargetTags = Field(..., description="Which target to use for scoring")
+    use_plip: bool = Field(
+        True,
+        description=(
+            "Detect interactions with the PLIP CLI. If False, detect them in-process, "
+            "which is much faster but doesn't detect water bridges, pi-cation "
+            "interactions, halogen bonds, or metal complexes."
+        ),
+    )
 
     @validator("target")
     @classmethod
@@ -500,7 +509,10 @@ class FINTScorer(ScorerBase):
         results = []
         for inp in inputs:
             _, fint_score = compute_fint_score(
-                inp.to_protein(), inp.posed_ligand.to_oemol(), self.target
+                inp.to_protein(),
+                inp.posed_ligand.to_oemol(),
+                self.target,
+                use_plip=self.use_plip,
             )
 
             sc = Score.from_score_and_docking_result(
@@ -522,7 +534,10 @@ class FINTScorer(ScorerBase):
         results = []
         for inp in inputs:
             _, fint_score = compute_fint_score(
-                inp.target.to_oemol(), inp.ligand.to_oemol(), self.target
+                inp.target.to_oemol(),
+                inp.ligand.to_oemol(),
+                self.target,
+                use_plip=self.use_plip,
             )
             results.append(
                 Score.from_score_and_complex(
@@ -763,6 +778,39 @@ class E3MLModelScorer(MLModelScorer):
 
     model_type: ClassVar[ModelType.INVALID] = ModelType.INVALID
     units: ClassVar[ScoreUnits.INVALID] = ScoreUnits.INVALID
+    pocket_radius: Optional[float] = Field(
+        None,
+        description=(
+            "If given, crop receptors to atoms within this distance (in A) of the "
+            "binding site before scoring. Should match how the model was trained."
+        ),
+    )
+
+    def _predict_from_complexes(self, complexes: list[Complex]) -> np.ndarray:
+        """
+        Predict on a list of Complexes, cropping to the binding pocket if requested.
+        """
+        if self.pocket_radius is None:
+            pocket_cropper = None
+        else:
+            pocket_cropper = PocketCropper(radius=self.pocket_radius)
+
+        scores = np.atleast_1d(
+            self.inference_cls.predict_from_complexes(
+                complexes, pocket_cropper=pocket_cropper
+            )
+        )
+
+        if pocket_cropper is not None:
+            stats = pocket_cropper.stats()
+            logger.info(
+                f"Cropped receptors to {self.pocket_radius} A pockets: "
+                f"{stats['atoms_per_sample_before']:.0f} -> "
+                f"{stats['atoms_per_sample_after']:.0f} atoms per sample "
+                f"({100 * stats['reduction']:.1f}% reduction)"
+            )
+
+        return scores
 
     @dask_vmap(["inputs"])
     @backend_wrapper("inputs")
@@ -783,12 +831,28 @@ class E3MLModelScorer(MLModelScorer):
         return_for_disk_backend: bool = False,
         **kwargs,
     ) -> list[Score]:
-        results = []
+        # Build the receptor for each unique target once, and swap in each posed
+        #  ligand, so the receptor is only featurized once per target
+        target_complexes = {}
+        complexes = []
         for inp in inputs:
-            score = self.inference_cls.predict_from_oemol(inp.to_posed_oemol())
+            target_key = inp.input_pair.complex.target.hash
+            try:
+                target_comp = target_complexes[target_key]
+            except KeyError:
+                target_comp = Complex.from_oemol(
+                    inp.to_posed_oemol(),
+                    target_kwargs={"target_name": "pose"},
+                    ligand_kwargs={"compound_name": "pose"},
+                )
+                target_complexes[target_key] = target_comp
+            complexes.append(target_comp.copy(update={"ligand": inp.posed_ligand}))
+        scores = self._predict_from_complexes(complexes)
 
+        results = []
+        for inp, score in zip(inputs, scores):
             sc = Score.from_score_and_docking_result(
-                score, self.score_type, self.units, inp
+                float(score), self.score_type, self.units, inp
             )
             # overwrite the input with the path to the file
             if return_for_disk_backend:
@@ -799,11 +863,13 @@ class E3MLModelScorer(MLModelScorer):
 
     @_dispatch.register
     def _dispatch(self, inputs: list[Complex], **kwargs) -> list[Score]:
+        scores = self._predict_from_complexes(inputs)
         results = []
-        for inp in inputs:
-            score = self.inference_cls.predict_from_oemol(inp.to_combined_oemol())
+        for inp, score in zip(inputs, scores):
             results.append(
-                Score.from_score_and_complex(score, self.score_type, self.units, inp)
+                Score.from_score_and_complex(
+                    float(score), self.score_type, self.units, inp
+                )
             )
         return results
 
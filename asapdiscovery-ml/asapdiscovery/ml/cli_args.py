@@ -1361,7 +1361,7 @@ def data_aug(func):
 ################################################################################
 # Sweep args
 def sweep_args(func):
-    for fn in [sweep_config, force_new_sweep, sweep_start_only]:
+    for fn in [sweep_config, force_new_sweep, sweep_start_only, trials_per_process]:
         func = fn(func)
     return func
 
@@ -1382,6 +1382,17 @@ def force_new_sweep(func):
     )(func)
 
 
+def trials_per_process(func):
+    return click.option(
+        "--trials-per-process",
+        type=int,
+        help=(
+            "Number of sweep trials to run in this process. The dataset is reused "
+            "between trials when possible."
+        ),
+    )(func)
+
+
 def sweep_start_only(func):
     return click.option(
         "--start-only",
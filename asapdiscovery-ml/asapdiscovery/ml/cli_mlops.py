@@ -2,6 +2,7 @@ import datetime
 import hashlib
 import logging
 import os
+import random
 import shutil
 from pathlib import Path
 from shutil import copy, rmtree
@@ -321,6 +322,9 @@ def _train_single_model(
     output_dir: Path,
     n_epochs: int = 5000,
     wandb_project: Optional[str] = None,
+    ds_cache_file: Optional[Path] = None,
+    seed: Optional[int] = None,
+    n_threads: Optional[int] = None,
 ):
     """
     Train a single GAT model for a specific endpoint
@@ -341,12 +345,26 @@ def _train_single_model(
         Number of epochs to train for
     wandb_project : str
         WandB project to log to
+    ds_cache_file : Path, optional
+        Pickle cache of the already featurized dataset to load instead of
+        re-featurizing the experimental data
+    seed : int, optional
+        Random seed to use for model initialization and training
+    n_threads : int, optional
+        Number of threads for PyTorch to use, to avoid oversubscribing cores when
+        training several models at once
 
     Returns
     -------
     Path
         Path to the output directory of the trained model, as set by wandb
     """
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+        torch.manual_seed(seed)
+    if n_threads is not None:
+        torch.set_num_threads(n_threads)
 
     logging.info(
         f'Training GAT model for {exp_data_json} with target property "{target_prop}"'
@@ -371,6 +389,7 @@ def _train_single_model(
 
     gat_ds_config = DatasetConfig.from_exp_file(
         Path(exp_data_json),
+        cache_file=ds_cache_file,
     )
 
     # pIC0s have uncertainty and range, scalar endpoints have neither
@@ -411,6 +430,113 @@ def _train_single_model(
     return t_gat.output_dir, t_gat.wandb_run_id
 
 
+def _train_ensemble(
+    target_prop: str,
+    model_tag: str,
+    exp_data_json: Path,
+    output_dir: Path,
+    ensemble_size: int = 5,
+    n_epochs: int = 5000,
+    wandb_project: Optional[str] = None,
+    seed: int = 0,
+    max_workers: Optional[int] = None,
+):
+    """
+    Train an ensemble of GAT models for a specific endpoint. The dataset is
+    featurized once and cached, and each ensemble member loads the cached dataset
+    and trains with its own random seed and W&B run, in a separate process.
+
+    Parameters
+    ----------
+    target_prop : str
+        Target property to train the models for
+    model_tag : str
+        Tag of the ensemble
+    exp_data_json : Path
+        Path to the JSON file containing the experimental data pulled from CDD
+    output_dir : Path
+        Output directory, each model will be trained in a subdirectory
+    ensemble_size : int
+        Number of models in the ensemble
+    n_epochs : int
+        Number of epochs to train for
+    wandb_project : str
+        WandB project to log to
+    seed : int
+        Base random seed, ensemble member i will use seed + i
+    max_workers : int, optional
+        Number of models to train concurrently. Defaults to the smaller of the
+        ensemble size and the number of available cores
+
+    Returns
+    -------
+    list[Path]
+        Output directories of the trained models, in ensemble order
+    list[str]
+        W&B run ids of the trained models, in ensemble order
+    """
+    import multiprocessing as mp
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from multiprocessing import cpu_count
+
+    # Featurize once, every ensemble member will load this cache
+    ds_cache_file = output_dir / "gat_ds_cache.pkl"
+    logger.info(f"Featurizing dataset and caching to {ds_cache_file}")
+    DatasetConfig.from_exp_file(Path(exp_data_json), cache_file=ds_cache_file).build()
+
+    n_cores = cpu_count()
+    if max_workers is None:
+        max_workers = min(ensemble_size, n_cores)
+    max_workers = max(1, min(max_workers, ensemble_size))
+    n_threads = max(1, n_cores // max_workers)
+
+    member_kwargs = []
+    for i in range(ensemble_size):
+        ensemble_out_dir = output_dir / f"ensemble_{i}"
+        ensemble_out_dir.mkdir()
+        member_kwargs.append(
+            {
+                "target_prop": target_prop,
+                "ensemble_tag": f"{model_tag}_ensemble_{i}",
+                "model_tag": model_tag,
+                "exp_data_json": exp_data_json,
+                "output_dir": ensemble_out_dir,
+                "n_epochs": n_epochs,
+                "wandb_project": wandb_project,
+                "ds_cache_file": ds_cache_file,
+                "seed": seed + i,
+                "n_threads": n_threads,
+            }
+        )
+
+    results = [None] * ensemble_size
+    if max_workers == 1:
+        for i, kwargs in enumerate(member_kwargs):
+            logger.info(f"Training ensemble model {i}")
+            results[i] = _train_single_model(**kwargs)
+    else:
+        logger.info(
+            f"Training {ensemble_size} models with {max_workers} processes, "
+            f"{n_threads} threads each"
+        )
+        # Use spawn so each worker gets a clean CUDA and W&B state
+        with ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=mp.get_context("spawn")
+        ) as pool:
+            futures = {
+                pool.submit(_train_single_model, **kwargs): i
+                for i, kwargs in enumerate(member_kwargs)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                results[i] = future.result()
+                logger.info(f"Finished training ensemble model {i}")
+
+    ensemble_directories = [output_model_dir for output_model_dir, _ in results]
+    wandb_run_ids = [wandb_run_id for _, wandb_run_id in results]
+    return ensemble_directories, wandb_run_ids
+
+
 def _gather_and_clean_data(
     protocol_name: str, output_dir: Path = None, pic50_stderr_filt=10.0
 ) -> pd.DataFrame:
@@ -787,6 +913,21 @@ def mlops():
     default=10.0,
     help="Max allowable standard error in pIC50 units.",
 )
+@click.option(
+    "--seed",
+    type=int,
+    default=0,
+    help="Base random seed, ensemble member i is trained with seed + i.",
+)
+@click.option(
+    "--max-workers",
+    type=int,
+    default=None,
+    help=(
+        "Number of ensemble members to train concurrently. Defaults to the smaller "
+        "of the ensemble size and the number of available cores."
+    ),
+)
 def train_GAT_for_endpoint(
     protocol: str,
     output_dir: str = "output",
@@ -795,6 +936,8 @@ def train_GAT_for_endpoint(
     n_epochs: int = 5000,
     test: bool = False,
     pic50_stderr_filt: float = 10.0,
+    seed: int = 0,
+    max_workers: Optional[int] = None,
 ):
     """
     Train a GAT model for a specific endpoint
@@ -888,24 +1031,17 @@ def train_GAT_for_endpoint(
     logger.info(f"Training ensemble of {ensemble_size} models")
 
     # train each model in the ensemble
-    ensemble_directories = []
-    wandb_run_ids = []
-    for i in range(ensemble_size):
-        ensemble_tag = f"{model_tag}_ensemble_{i}"
-        logger.info(f"Training ensemble model {i}")
-        ensemble_out_dir = protocol_out_dir / f"ensemble_{i}"
-        ensemble_out_dir.mkdir()
-        output_model_dir, wandb_run_id = _train_single_model(
-            readout,
-            ensemble_tag,
-            model_tag,
-            out_json,
-            ensemble_out_dir,
-            wandb_project=wandb_project,
-            n_epochs=n_epochs,
-        )
-        ensemble_directories.append(output_model_dir)
-        wandb_run_ids.append(wandb_run_id)
+    ensemble_directories, wandb_run_ids = _train_ensemble(
+        readout,
+        model_tag,
+        out_json,
+        protocol_out_dir,
+        ensemble_size=ensemble_size,
+        n_epochs=n_epochs,
+        wandb_project=wandb_project,
+        seed=seed,
+        max_workers=max_workers,
+    )
 
     logger.info(f"Training complete for {protocol}")
 
@@ -146,6 +146,7 @@ def sweep_gat(
     sweep_config: Path | None = None,
     force_new_sweep: bool | None = None,
     start_only: bool = False,
+    trials_per_process: int | None = None,
     overwrite_sweep_config_cache: bool = False,
     overwrite_trainer_config_cache: bool = False,
     overwrite_optimizer_config_cache: bool = False,
@@ -268,6 +269,7 @@ def sweep_gat(
     sweep_kwargs = {
         "sweep_config": sweep_config,
         "force_new_sweep": force_new_sweep,
+        "trials_per_process": trials_per_process,
     }
 
     sweeper = _build_sweeper(
@@ -382,6 +384,7 @@ def sweep_schnet(
     sweep_config: Path | None = None,
     force_new_sweep: bool | None = None,
     start_only: bool = False,
+    trials_per_process: int | None = None,
     overwrite_sweep_config_cache: bool = False,
     overwrite_trainer_config_cache: bool = False,
     overwrite_optimizer_config_cache: bool = False,
@@ -508,6 +511,7 @@ def sweep_schnet(
     sweep_kwargs = {
         "sweep_config": sweep_config,
         "force_new_sweep": force_new_sweep,
+        "trials_per_process": trials_per_process,
     }
 
     sweeper = _build_sweeper(
@@ -623,6 +627,7 @@ def sweep_e3nn(
     sweep_config: Path | None = None,
     force_new_sweep: bool | None = None,
     start_only: bool = False,
+    trials_per_process: int | None = None,
     overwrite_sweep_config_cache: bool = False,
     overwrite_trainer_config_cache: bool = False,
     overwrite_optimizer_config_cache: bool = False,
@@ -750,6 +755,7 @@ def sweep_e3nn(
     sweep_kwargs = {
         "sweep_config": sweep_config,
         "force_new_sweep": force_new_sweep,
+        "trials_per_process": trials_per_process,
     }
 
     sweeper = _build_sweeper(
@@ -870,6 +876,7 @@ def sweep_visnet(
     sweep_config: Path | None = None,
     force_new_sweep: bool | None = None,
     start_only: bool = False,
+    trials_per_process: int | None = None,
     overwrite_sweep_config_cache: bool = False,
     overwrite_trainer_config_cache: bool = False,
     overwrite_optimizer_config_cache: bool = False,
@@ -1002,6 +1009,7 @@ def sweep_visnet(
     sweep_kwargs = {
         "sweep_config": sweep_config,
         "force_new_sweep": force_new_sweep,
+        "trials_per_process": trials_per_process,
     }
 
     sweeper = _build_sweeper(
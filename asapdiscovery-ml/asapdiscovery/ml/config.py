@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import logging
 import pickle as pkl
 from collections.abc import Iterator
 from copy import deepcopy
@@ -15,7 +16,15 @@ from asapdiscovery.data.schema.experimental import ExperimentalCompoundData
 from asapdiscovery.data.schema.ligand import Ligand
 from asapdiscovery.data.util.stringenum import StringEnum
 from asapdiscovery.data.util.utils import extract_compounds_from_filenames
-from asapdiscovery.ml.dataset import DockedDataset, GraphDataset, GroupedDockedDataset
+from asapdiscovery.ml.dataset import (
+    CompoundShardStore,
+    DockedDataset,
+    GraphDataset,
+    GroupedDockedDataset,
+    PocketCropper,
+    fix_e3nn_pose,
+    limit_compound_poses,
+)
 from asapdiscovery.ml.es import (
     BestEarlyStopping,
     ConvergedEarlyStopping,
@@ -23,6 +32,8 @@ from asapdiscovery.ml.es import (
 )
 from pydantic import BaseModel, Field, root_validator
 
+logger = logging.getLogger(__name__)
+
 
 class ConfigBase(BaseModel):
     """
@@ -300,9 +311,43 @@ class DatasetConfig(ConfigBase):
         1, description="Number of threads to use for dataset processing."
     )
 
+    # Persistent cache of featurized graphs for graph datasets
+    graph_cache_dir: Path | None = Field(
+        None,
+        description=(
+            "Directory for a persistent cache of featurized graphs, shared across "
+            "datasets that use the same featurizers (graph-based models only)."
+        ),
+    )
+
+    # Crop receptors to the binding pocket for structure-based datasets
+    pocket_radius: float | None = Field(
+        None,
+        description=(
+            "If given, only keep receptor atoms within this distance (in A) of the "
+            "binding site (structure-based models only)."
+        ),
+    )
+
     # Multi-pose or not
     grouped: bool = Field(False, description="Build a GroupedDockedDataset.")
 
+    # Options for lazily loading a sharded GroupedDockedDataset
+    shard_dir: Path | None = Field(
+        None,
+        description=(
+            "Directory to store one shard per compound in for a GroupedDockedDataset. "
+            "If given, compounds are loaded lazily from the shards."
+        ),
+    )
+    shard_cache_size: int = Field(
+        128, description="Number of compounds to keep in memory if sharding."
+    )
+    max_poses: int | None = Field(
+        None,
+        description="Maximum number of poses to use per compound.",
+    )
+
     # Dataset will be used in an e3nn model, so make sure the fields have the correct
     #  names
     for_e3nn: bool = Field(False, description="Dataset will be used in an e3nn model.")
@@ -489,6 +534,16 @@ class DatasetConfig(ConfigBase):
         if self.cache_file and self.cache_file.exists() and (not self.overwrite):
             print("loading from cache", flush=True)
             ds = pkl.loads(self.cache_file.read_bytes())
+            if (
+                self.grouped
+                and (self.max_poses is not None)
+                and isinstance(ds.structures, dict)
+            ):
+                # Apply the pose limit to in-memory datasets the same way as sharded ones
+                ds.structures = {
+                    compound_id: limit_compound_poses(data, self.max_poses)
+                    for compound_id, data in ds.structures.items()
+                }
             if self.for_e3nn:
                 ds = DatasetConfig.fix_e3nn_labels(ds, grouped=self.grouped)
             return ds
@@ -502,15 +557,41 @@ class DatasetConfig(ConfigBase):
                     self.input_data,
                     exp_dict=self.exp_data,
                     node_featurizer=CanonicalAtomFeaturizer(),
+                    graph_cache=self.graph_cache_dir,
                 )
             case DatasetType.structural:
+                if self.pocket_radius is None:
+                    pocket_cropper = None
+                else:
+                    pocket_cropper = PocketCropper(radius=self.pocket_radius)
+
                 if self.grouped:
                     ds = GroupedDockedDataset.from_complexes(
-                        self.input_data, exp_dict=self.exp_data
+                        self.input_data,
+                        exp_dict=self.exp_data,
+                        num_workers=self.num_workers,
+                        shard_dir=self.shard_dir,
+                        cache_size=self.shard_cache_size,
+                        max_poses=self.max_poses,
+                        pocket_cropper=pocket_cropper,
                     )
                 else:
                     ds = DockedDataset.from_complexes(
-                        self.input_data, exp_dict=self.exp_data
+                        self.input_data,
+                        exp_dict=self.exp_data,
+                        num_workers=self.num_workers,
+                        pocket_cropper=pocket_cropper,
+                    )
+
+                if pocket_cropper is not None:
+                    stats = pocket_cropper.stats()
+                    print(
+                        f"Cropped receptors to {self.pocket_radius} A pockets: "
+                        f"{stats['atoms_per_sample_before']:.0f} -> "
+                        f"{stats['atoms_per_sample_after']:.0f} atoms per sample "
+                        f"({100 * stats['reduction']:.1f}% reduction, "
+                        f"{stats['n_sites']} unique sites)",
+                        flush=True,
                     )
                 if self.for_e3nn:
                     ds = DatasetConfig.fix_e3nn_labels(ds, grouped=self.grouped)
@@ -524,25 +605,23 @@ class DatasetConfig(ConfigBase):
 
     @staticmethod
     def fix_e3nn_labels(ds, grouped=False):
+        if grouped and isinstance(getattr(ds, "structures", None), CompoundShardStore):
+            # Lazily loaded, so the labels are adjusted as each compound is loaded
+            store = ds.structures
+            return GroupedDockedDataset.from_shards(
+                store.shard_dir,
+                cache_size=store.cache_size,
+                max_poses=store.max_poses,
+                for_e3nn=True,
+            )
+
         new_ds = deepcopy(ds)
         for _, data in new_ds:
             if grouped:
                 for pose in data["poses"]:
-                    # Check if this pose has already been adjusted
-                    if pose["z"].is_floating_point():
-                        # Assume it'll only be floats if we've already run this function
-                        continue
-
-                    pose["x"] = torch.nn.functional.one_hot(pose["z"] - 1, 100).float()
-                    pose["z"] = pose["lig"].reshape((-1, 1)).float()
+                    fix_e3nn_pose(pose)
             else:
-                # Check if this data has already been adjusted
-                if data["z"].is_floating_point():
-                    # Assume it'll only be floats if we've already run this function
-                    continue
-
-                data["x"] = torch.nn.functional.one_hot(data["z"] - 1, 100).float()
-                data["z"] = data["lig"].reshape((-1, 1)).float()
+                fix_e3nn_pose(data)
 
         return new_ds
 
@@ -703,37 +782,101 @@ class DatasetSplitterConfig(ConfigBase):
         List[torch.utils.data.Subset]
             List of Subsets of original dataset
         """
-        # For each Subset, grab all molecules with the included compound_ids
-        all_subsets = []
-        # Keep track of which structure indices we've seen so we don't double count in the
-        #  end splits
+        # Flatten the groups, keeping only the first occurrence of each index so we
+        #  don't double count in the end splits
         seen_idx = set()
-        prev_idx = 0
-        # Go up to the last split so we can add anything that got left out from rounding
+        group_idxs = []
+        group_sizes = []
+        for idx_list in idx_lists:
+            new_idx = [i for i in dict.fromkeys(idx_list) if i not in seen_idx]
+            seen_idx.update(new_idx)
+            group_idxs.extend(new_idx)
+            group_sizes.append(len(new_idx))
+
+        return DatasetSplitterConfig._make_group_subsets(
+            ds, np.asarray(group_idxs, dtype=int), group_sizes, split_lens
+        )
+
+    @staticmethod
+    def _make_group_subsets(ds, group_idxs, group_sizes, split_lens):
+        """
+        Make subsets of a dataset from ordered groups of indices. Each split takes
+        consecutive whole groups until it has at least the requested number of items,
+        always leaving at least one group for each remaining split.
+
+        Parameters
+        ----------
+        ds : Union[cml.data.DockedDataset, cml.data.GraphDataset]
+            Molecular dataset to split
+        group_idxs : np.ndarray[int]
+            Indices into `ds`, ordered so that each group is contiguous
+        group_sizes : List[int]
+            Number of indices in each group, in order
+        split_lens : List[int]
+            List of split lengths
+
+        Returns
+        -------
+        List[torch.utils.data.Subset]
+            List of Subsets of original dataset
+        """
+        # Cumulative number of items before each group boundary
+        group_bounds = np.concatenate([[0], np.cumsum(group_sizes)]).astype(int)
+        n_groups = len(group_sizes)
+
+        all_subsets = []
+        prev_group = 0
         for i, n_mols in enumerate(split_lens):
-            n_mols_cur = 0
-            subset_idx = []
-            cur_idx = prev_idx
-            # Keep adding groups until the split is as big as it needs to be, or we reach
-            #  the end of the array (making sure to save at least some molecules for the
-            #  rest of the splits)
-            while (n_mols_cur < n_mols) and (
-                cur_idx < (len(idx_lists) - (len(split_lens) - i - 1))
-            ):
-                subset_idx.extend(idx_lists[cur_idx])
-                n_mols_cur += len(idx_lists[cur_idx])
-                cur_idx += 1
+            # First group boundary that gives us at least n_mols items in this split
+            cur_group = np.searchsorted(
+                group_bounds, group_bounds[prev_group] + n_mols, side="left"
+            )
+            # Make sure to save at least some molecules for the rest of the splits
+            max_group = n_groups - (len(split_lens) - i - 1)
+            cur_group = max(prev_group, min(cur_group, max_group))
 
-            # Make sure we're not including something that's in another split
-            subset_idx = [i for i in subset_idx if i not in seen_idx]
-            seen_idx.update(subset_idx)
+            subset_idx = group_idxs[
+                group_bounds[prev_group] : group_bounds[cur_group]
+            ].tolist()
             all_subsets.append(torch.utils.data.Subset(ds, subset_idx))
 
             # Update counter
-            prev_idx = cur_idx
+            prev_group = cur_group
 
         return all_subsets
 
+    @staticmethod
+    def _group_by_label(labels, group_order=None):
+        """
+        Group dataset indices by an integer label for each item.
+
+        Parameters
+        ----------
+        labels : np.ndarray[int]
+            Group label (0 to n_groups - 1) for each item in the dataset
+        group_order : np.ndarray[int], optional
+            Order to put the groups in. Defaults to sorted by label
+
+        Returns
+        -------
+        np.ndarray[int]
+            Indices into the dataset, ordered so that each group is contiguous and
+            indices within a group are ascending
+        np.ndarray[int]
+            Size of each group, in order
+        """
+        group_sizes = np.bincount(labels)
+        if group_order is None:
+            group_order = np.arange(len(group_sizes))
+
+        # Position of each group in the final ordering
+        group_pos = np.empty_like(group_order)
+        group_pos[group_order] = np.arange(len(group_order))
+
+        # Stable sort keeps indices within each group in ascending order
+        group_idxs = np.argsort(group_pos[labels], kind="stable")
+        return group_idxs, group_sizes[group_order]
+
     def _split_random(self, ds: DockedDataset | GraphDataset | GroupedDockedDataset):
         """
         Random split.
@@ -772,29 +915,28 @@ class DatasetSplitterConfig(ConfigBase):
                 np.asarray([self.train_frac, self.val_frac, self.test_frac]) * len(ds)
             )
 
-            # First get all the unique compound_ids
-            compound_ids_dict = {}
-            for c, idx_list in ds.compounds.items():
-                try:
-                    compound_ids_dict[c[1]].extend(idx_list)
-                except KeyError:
-                    compound_ids_dict[c[1]] = idx_list
-            all_compound_ids = np.asarray(list(compound_ids_dict.keys()))
-            print("compound_ids_dict", next(iter(compound_ids_dict.items())))
-            print(
-                "all_compound_ids",
-                len(all_compound_ids),
-                len(set(all_compound_ids)),
-                flush=True,
+            # Label each structure by its compound_id, numbering compounds in order
+            #  of first appearance in the dataset
+            compound_ids = ds.split_index()["compound_ids"]
+            _, first_idx, labels = np.unique(
+                compound_ids, return_index=True, return_inverse=True
             )
+            appearance_rank = np.empty_like(first_idx)
+            appearance_rank[np.argsort(first_idx, kind="stable")] = np.arange(
+                len(first_idx)
+            )
+            labels = appearance_rank[labels.reshape(-1)]
+            logger.debug(f"Splitting {len(first_idx)} compound_ids")
 
-            # Shuffle the indices
-            indices = torch.randperm(len(all_compound_ids), generator=g)
-            idx_lists = [compound_ids_dict[all_compound_ids[i]] for i in indices]
+            # Shuffle the compounds
+            group_order = torch.randperm(len(first_idx), generator=g).numpy()
+            group_idxs, group_sizes = DatasetSplitterConfig._group_by_label(
+                labels, group_order
+            )
 
             # For each Subset, grab all molecules with the included compound_ids
-            ds_train, ds_val, ds_test = DatasetSplitterConfig._make_subsets(
-                ds, idx_lists, n_mols_split
+            ds_train, ds_val, ds_test = DatasetSplitterConfig._make_group_subsets(
+                ds, group_idxs, group_sizes, n_mols_split
             )
 
         return ds_train, ds_val, ds_test
@@ -831,37 +973,26 @@ class DatasetSplitterConfig(ConfigBase):
         # Calculate how many molecules we want covered through each split
         n_mols_split = np.floor(np.asarray(split_fracs) * len(ds))
 
-        # First get all the unique created dates
-        dates_dict = {}
-        # If we have a grouped dataset, we want to iterate through compound_ids, which will
-        #  allow us to access a group of structures. Otherwise, loop through the structures
-        #  directly
-        if self.grouped:
-            iter_list = ds.structures.values()
-        else:
-            iter_list = ds.structures
-        for i, iter_item in enumerate(iter_list):
-            try:
-                date_created = iter_item["date_created"]
-            except KeyError:
-                raise ValueError("Dataset doesn't contain dates.")
-            try:
-                dates_dict[date_created].append(i)
-            except KeyError:
-                dates_dict[date_created] = [i]
+        # Get the created date for each item (each compound for a grouped dataset)
+        #  from the dataset's index, without loading any structures
+        dates = ds.split_index()["dates"]
+        if dates is None:
+            raise ValueError("Dataset doesn't contain dates.")
 
-        # check if dates_dict is empty
-        if all(d == None for d in dates_dict.keys()) or not dates_dict:  # noqa: E711
+        # check if there are any dates
+        if len(dates) == 0 or np.isnat(dates).all():
             raise ValueError("No dates found in dataset.")
 
-        all_dates = np.asarray(list(dates_dict.keys()))
-
-        # Sort the dates
-        all_dates_sorted = sorted(all_dates)
+        # Group items by date, with groups sorted by date (missing dates go last)
+        _, labels = np.unique(dates, return_inverse=True)
+        group_idxs, group_sizes = DatasetSplitterConfig._group_by_label(
+            labels.reshape(-1)
+        )
 
         # Make subsets
-        idx_lists = [dates_dict[d] for d in all_dates_sorted]
-        all_subsets = DatasetSplitterConfig._make_subsets(ds, idx_lists, n_mols_split)
+        all_subsets = DatasetSplitterConfig._make_group_subsets(
+            ds, group_idxs, group_sizes, n_mols_split
+        )
 
         # Take out the sink split
         if sink_split:
@@ -888,7 +1019,7 @@ class DatasetSplitterConfig(ConfigBase):
             Test split
         """
         all_subset_idxs = {}
-        for i, (compound, _) in enumerate(ds):
+        for i, compound in enumerate(ds.split_index()["compounds"]):
             if compound in self.split_dict["train"]:
                 split = "train"
             elif compound in self.split_dict["val"]:
@@ -1,5 +1,4 @@
-from copy import deepcopy
-
+import numpy as np
 import torch
 
 
@@ -33,16 +32,44 @@ class JitterFixed:
         self.mean = mean
         self.std = std
         self.rand_seed = rand_seed
+        # Base seed that per-sample seeds are derived from, and that the default
+        #  generators are seeded with
         if rand_seed is not None:
-            self.g = torch.Generator().manual_seed(rand_seed)
+            self.base_seed = rand_seed
         else:
-            self.g = torch.Generator().manual_seed(torch.random.seed())
+            self.base_seed = torch.random.seed()
         self.dict_key = dict_key
 
-    def __call__(self, coords, inplace=False):
+        # One generator per device, created lazily so noise can be drawn directly on
+        #  the same device as the coordinates
+        self._generators = {}
+
+    def _get_generator(self, device, seed_idx=None):
         """
-        Apply noise to each atom. Unless inplace is True, this method will create a copy
-        of the input coordinate Tensor.
+        Get a generator for the given device. If seed_idx is passed, a fresh generator
+        is seeded from (base_seed, *seed_idx), so the noise for a given sample only
+        depends on eg its (epoch, index) rather than on how many samples came before.
+        """
+        if seed_idx is not None:
+            seed = int(
+                np.random.SeedSequence(
+                    [self.base_seed, *[int(i) for i in seed_idx]]
+                ).generate_state(1, dtype=np.uint64)[0]
+            )
+            return torch.Generator(device=device).manual_seed(seed)
+
+        try:
+            return self._generators[device]
+        except KeyError:
+            g = torch.Generator(device=device).manual_seed(self.base_seed)
+            self._generators[device] = g
+            return g
+
+    def __call__(self, coords, inplace=False, seed_idx=None):
+        """
+        Apply noise to each atom. Unless inplace is True, this method will not modify
+        the input coordinate Tensor. If a dict is passed, only the coordinates are
+        copied, and all other values in the returned dict are shared with the input.
 
         Parameters
         ----------
@@ -51,41 +78,45 @@ class JitterFixed:
             for each
         inplace : bool, default=False
             Modify the passed Tensor in place, rather than first copying
+        seed_idx : tuple[int], optional
+            Indices (eg (epoch, sample index)) to derive a reproducible seed from for
+            this call. If not given, noise is drawn from a generator shared between
+            calls
 
         Returns
         -------
-        torch.Tensor
+        torch.Tensor | dict
             Jittered coordinates
         """
 
         # Figure out if we're working with a dict or raw Tensor inputs
         if isinstance(coords, dict):
             dict_inp = True
+            coords_tensor = coords[self.dict_key]
         else:
             dict_inp = False
+            coords_tensor = coords
+
+        # Generate noise directly on the same device as the coords
+        g = self._get_generator(coords_tensor.device, seed_idx)
+        noise = torch.randn(
+            coords_tensor.shape,
+            generator=g,
+            dtype=coords_tensor.dtype,
+            device=coords_tensor.device,
+        )
+        noise = noise.mul_(self.std).add_(self.mean)
 
-        # Fist make a copy of the input coords (if inplace is False)
-        if not inplace:
-            if dict_inp:
-                dict_copy = deepcopy(coords)
-                coords_copy = dict_copy[self.dict_key]
-            else:
-                coords_copy = coords.clone().detach()
+        # Add the noise, without modifying the input unless requested
+        if inplace:
+            jittered = coords_tensor.add_(noise)
         else:
-            # Should just be a reference so inputs should get modified
-            if dict_inp:
-                dict_copy = coords
-                coords_copy = coords_copy[self.dict_key]
-            else:
-                coords_copy = coords
-        # Create the mean Tensor, which should just have the same shape as the coords
-        mean = torch.full_like(coords_copy, self.mean).to("cpu")
-        # Generate noise (the std will be broadcast to the same shape as mean)
-        noise = torch.normal(mean=mean, std=self.std, generator=self.g)
-        # Add the noise
-        coords_copy += noise.to(coords_copy.device)
+            jittered = coords_tensor.detach() + noise
 
         if dict_inp:
-            return dict_copy
+            if inplace:
+                return coords
+            # Shallow copy so the rest of the pose (eg Ligand objects) isn't copied
+            return coords | {self.dict_key: jittered}
         else:
-            return coords_copy
+            return jittered
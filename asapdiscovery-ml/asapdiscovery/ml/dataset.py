@@ -1,3 +1,12 @@
+import json
+import os
+import pickle as pkl
+import uuid
+from collections import OrderedDict
+from collections.abc import Mapping
+from contextlib import contextmanager
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
 import torch
@@ -7,6 +16,278 @@ from asapdiscovery.data.schema.ligand import Ligand
 from torch.utils.data import Dataset
 
 
+def _oemol_to_arrays(mol, ignore_h=True):
+    """
+    Extract atom positions, atomic numbers, and B factors from an OEMol as NumPy arrays.
+    Hydrogens are filtered at the OpenEye level if requested, so they are never visited.
+
+    Parameters
+    ----------
+    mol : oechem.OEMolBase
+        Molecule to extract arrays from
+    ignore_h : bool, default=True
+        Whether to skip hydrogen atoms
+
+    Returns
+    -------
+    np.ndarray
+        Positions, shape (n_atoms, 3), float32
+    np.ndarray
+        Atomic numbers, shape (n_atoms,), int64
+    np.ndarray
+        B factors, shape (n_atoms,), float32
+    """
+    # Pull all coordinates out in one call, indexed by atom idx
+    coords = oechem.OEFloatArray(3 * mol.GetMaxAtomIdx())
+    mol.GetCoords(coords)
+    coords = np.asarray(coords, dtype=np.float32).reshape((-1, 3))
+
+    if ignore_h:
+        atoms = mol.GetAtoms(oechem.OENotAtom(oechem.OEIsHydrogen()))
+    else:
+        atoms = mol.GetAtoms()
+
+    # OpenEye has no bulk accessor for atomic numbers or residue B factors, so these
+    #  are gathered in a single Python pass over the (filtered) atoms
+    idx, z, b = [], [], []
+    for atom in atoms:
+        idx.append(atom.GetIdx())
+        z.append(atom.GetAtomicNum())
+        b.append(oechem.OEAtomGetResidue(atom).GetBFactor())
+
+    return (
+        coords[np.asarray(idx, dtype=np.int64)],
+        np.asarray(z, dtype=np.int64),
+        np.asarray(b, dtype=np.float32),
+    )
+
+
+def _complex_to_arrays(comp, ignore_h=True):
+    """
+    Featurize a Complex into NumPy arrays. Kept at module level and free of torch so it
+    can be run in worker processes, with the tensors built in the main process.
+    """
+    target_pos, target_z, target_b = _oemol_to_arrays(
+        comp.target.to_oemol(), ignore_h=ignore_h
+    )
+    ligand_pos, ligand_z, ligand_b = _oemol_to_arrays(
+        comp.ligand.to_oemol(), ignore_h=ignore_h
+    )
+
+    return {
+        "pos": np.concatenate([target_pos, ligand_pos]),
+        "z": np.concatenate([target_z, ligand_z]),
+        "b": np.concatenate([target_b, ligand_b]),
+        "lig": np.concatenate(
+            [np.zeros(len(target_z), dtype=bool), np.ones(len(ligand_z), dtype=bool)]
+        ),
+    }
+
+
+def _load_complex(fn, compound):
+    """
+    Load a Complex from a PDB file. Kept at module level so it can be pickled for a
+    process pool.
+    """
+    return Complex.from_pdb(
+        pdb_file=fn,
+        target_kwargs={"target_name": compound[0]},
+        ligand_kwargs={"compound_name": compound[1]},
+    )
+
+
+def _featurize_complexes(complexes, ignore_h=True, num_workers=1):
+    """
+    Featurize a list of Complexes into arrays, optionally over a process pool.
+    """
+    if num_workers > 1 and len(complexes) > 1:
+        import multiprocessing as mp
+        from functools import partial
+
+        n_procs = min(num_workers, mp.cpu_count(), len(complexes))
+        with mp.Pool(n_procs) as pool:
+            return pool.map(
+                partial(_complex_to_arrays, ignore_h=ignore_h),
+                complexes,
+                chunksize=max(1, len(complexes) // (4 * n_procs)),
+            )
+    else:
+        return [_complex_to_arrays(c, ignore_h=ignore_h) for c in complexes]
+
+
+def _load_complexes(str_fns, compounds, num_workers=1):
+    """
+    Load Complexes from a list of PDB files, optionally over a process pool.
+    """
+    mp_args = [(fn, compound) for fn, compound in zip(str_fns, compounds)]
+
+    if num_workers > 1:
+        import multiprocessing as mp
+
+        n_procs = min(num_workers, mp.cpu_count(), len(mp_args))
+        with mp.Pool(n_procs) as pool:
+            return pool.starmap(_load_complex, mp_args)
+    else:
+        return [_load_complex(*args) for args in mp_args]
+
+
+def _make_split_index(compounds, compound_ids, dates):
+    """
+    Build the lightweight per-item index used for splitting a dataset, so splitting
+    never needs to touch the actual pose data.
+
+    Parameters
+    ----------
+    compounds : list
+        Compound key for each item, as returned when iterating through the dataset
+    compound_ids : list[str]
+        Compound ID for each item
+    dates : list | None
+        date_created for each item (None for items with no date), or None if the
+        dataset doesn't store dates
+
+    Returns
+    -------
+    dict
+        Dict with keys `compounds` (list), `compound_ids` (np.ndarray of str), and
+        `dates` (np.ndarray of datetime64, with NaT for missing dates, or None)
+    """
+    if dates is not None:
+        dates = pd.to_datetime(pd.Series(dates, dtype=object)).to_numpy()
+
+    return {
+        "compounds": list(compounds),
+        "compound_ids": np.asarray(compound_ids, dtype=str),
+        "dates": dates,
+    }
+
+
+class PocketCropper:
+    """
+    Crop receptor atoms to the binding pocket, so only receptor atoms within a given
+    radius of the binding site are passed to the model. The binding site for a pose is
+    the centroid of its ligand, snapped to a grid with spacing site_resolution, so
+    poses in the same pocket share a site. The receptor atoms kept for each
+    (receptor hash, site) pair are cached, and the number of atoms per sample before
+    and after cropping is tracked so the reduction can be reported.
+    """
+
+    def __init__(self, radius: float = 15.0, site_resolution: float = 1.0):
+        """
+        Parameters
+        ----------
+        radius : float, default=15.0
+            Receptor atoms further than this distance (in A) from the binding site
+            are removed
+        site_resolution : float, default=1.0
+            Grid spacing (in A) used to define the binding site from the ligand
+            centroid. Poses whose ligand centroids snap to the same grid point share a
+            cropped receptor
+        """
+        self.radius = radius
+        self.site_resolution = site_resolution
+
+        # Maps (receptor hash, site) to the idxs of the receptor atoms to keep
+        self._cache = {}
+
+        self.n_samples = 0
+        self.n_atoms_before = 0
+        self.n_atoms_after = 0
+
+    def site_key(self, ligand_pos):
+        """
+        Get the binding site (as a tuple of grid coordinates) for a ligand.
+        """
+        centroid = np.asarray(ligand_pos, dtype=np.float64).mean(axis=0)
+        return tuple(np.round(centroid / self.site_resolution).astype(int).tolist())
+
+    def crop_idxs(self, receptor_key, receptor_pos, ligand_pos):
+        """
+        Get the idxs of the receptor atoms in the binding site of a ligand.
+
+        Parameters
+        ----------
+        receptor_key : str
+            Hash identifying the receptor
+        receptor_pos : np.ndarray
+            Receptor atom positions, shape (n_receptor_atoms, 3)
+        ligand_pos : np.ndarray
+            Ligand atom positions, shape (n_ligand_atoms, 3)
+
+        Returns
+        -------
+        np.ndarray
+            Sorted idxs of the receptor atoms to keep
+        """
+        site = self.site_key(ligand_pos)
+        try:
+            idxs = self._cache[(receptor_key, site)]
+        except KeyError:
+            center = np.asarray(site, dtype=np.float64) * self.site_resolution
+            sq_dists = ((np.asarray(receptor_pos) - center) ** 2).sum(axis=1)
+            idxs = np.flatnonzero(sq_dists <= self.radius**2)
+            self._cache[(receptor_key, site)] = idxs
+
+        self.n_samples += 1
+        self.n_atoms_before += len(receptor_pos) + len(ligand_pos)
+        self.n_atoms_after += len(idxs) + len(ligand_pos)
+
+        return idxs
+
+    def crop_arrays(self, arrays, receptor_key):
+        """
+        Crop the receptor atoms in a set of arrays generated by _complex_to_arrays.
+
+        Parameters
+        ----------
+        arrays : dict[str, np.ndarray]
+            Arrays for one complex, with the receptor atoms first
+        receptor_key : str
+            Hash identifying the receptor
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            Cropped arrays
+        """
+        lig_idxs = np.flatnonzero(arrays["lig"])
+        rec_idxs = np.flatnonzero(~arrays["lig"])
+        keep = rec_idxs[
+            self.crop_idxs(
+                receptor_key, arrays["pos"][rec_idxs], arrays["pos"][lig_idxs]
+            )
+        ]
+        keep = np.concatenate([keep, lig_idxs])
+
+        return {k: v[keep] for k, v in arrays.items()}
+
+    @property
+    def atoms_per_sample_before(self):
+        return self.n_atoms_before / self.n_samples if self.n_samples > 0 else 0.0
+
+    @property
+    def atoms_per_sample_after(self):
+        return self.n_atoms_after / self.n_samples if self.n_samples > 0 else 0.0
+
+    @property
+    def reduction(self):
+        """
+        Fraction of atoms removed by cropping.
+        """
+        if self.n_atoms_before == 0:
+            return 0.0
+        return 1 - self.n_atoms_after / self.n_atoms_before
+
+    def stats(self):
+        return {
+            "n_samples": self.n_samples,
+            "n_sites": len(self._cache),
+            "atoms_per_sample_before": self.atoms_per_sample_before,
+            "atoms_per_sample_after": self.atoms_per_sample_after,
+            "reduction": self.reduction,
+        }
+
+
 class DockedDataset(Dataset):
     """
     Class for loading docking results into a dataset to be used for graph
@@ -33,7 +314,14 @@ class DockedDataset(Dataset):
         self.structures = structures
 
     @classmethod
-    def from_complexes(cls, complexes: list[Complex], exp_dict=None, ignore_h=True):
+    def from_complexes(
+        cls,
+        complexes: list[Complex],
+        exp_dict=None,
+        ignore_h=True,
+        num_workers=1,
+        pocket_cropper: PocketCropper | None = None,
+    ):
         """
         Build from a list of Complex objects.
 
@@ -47,6 +335,10 @@ class DockedDataset(Dataset):
             a ligand witht that compound_id
         ignore_h : bool, default=True
             Whether to remove hydrogens from the loaded structure
+        num_workers : int, default=1
+            Number of processes to use to featurize structures
+        pocket_cropper : PocketCropper, optional
+            If given, crop the receptor atoms in each pose to the binding pocket
 
         Returns
         -------
@@ -78,11 +370,20 @@ class DockedDataset(Dataset):
 
             return tuple(target_id), tuple(compound_id)
 
+        all_arrays = _featurize_complexes(
+            complexes, ignore_h=ignore_h, num_workers=num_workers
+        )
+        if pocket_cropper is not None:
+            all_arrays = [
+                pocket_cropper.crop_arrays(arrays, comp.target.hash)
+                for comp, arrays in zip(complexes, all_arrays)
+            ]
+
         compound_idxs = {}
         structures = []
         # Can't use enumerate in case we skip some
         comp_counter = 0
-        for comp in complexes:
+        for comp, arrays in zip(complexes, all_arrays):
             try:
                 comp_exp_dict = comp.ligand.experimental_data.experimental_data
             except AttributeError:
@@ -96,8 +397,8 @@ class DockedDataset(Dataset):
             except KeyError:
                 compound_idxs[compound] = [comp_counter]
 
-            pose = cls._complex_to_pose(
-                comp, compound=compound, exp_dict=comp_exp_dict, ignore_h=ignore_h
+            pose = cls._arrays_to_pose(
+                arrays, comp.ligand, compound=compound, exp_dict=comp_exp_dict
             )
             structures.append(pose)
 
@@ -109,60 +410,33 @@ class DockedDataset(Dataset):
     def _complex_to_pose(comp, compound=None, exp_dict=None, ignore_h=True):
         """
         Helper function to convert a Complex to a pose.
-        """
-
-        if exp_dict is None:
-            exp_dict = {}
 
-        # First get target atom positions, atomic numbers, and B factors
-        target_mol = comp.target.to_oemol()
-        target_coords = target_mol.GetCoords()
-        target_pos = []
-        target_z = []
-        target_b = []
-        for atom in target_mol.GetAtoms():
-            target_pos.append(target_coords[atom.GetIdx()])
-            target_z.append(atom.GetAtomicNum())
-            target_b.append(oechem.OEAtomGetResidue(atom).GetBFactor())
-
-        # Get ligand atom positions, atomic numbers, and B factors
-        ligand_mol = comp.ligand.to_oemol()
-        ligand_coords = ligand_mol.GetCoords()
-        ligand_pos = []
-        ligand_z = []
-        ligand_b = []
-        for atom in ligand_mol.GetAtoms():
-            ligand_pos.append(ligand_coords[atom.GetIdx()])
-            ligand_z.append(atom.GetAtomicNum())
-            ligand_b.append(oechem.OEAtomGetResidue(atom).GetBFactor())
-
-        # Combine the two
-        all_pos = torch.tensor(target_pos + ligand_pos).float()
-        all_z = torch.tensor(target_z + ligand_z)
-        all_b = torch.tensor(target_b + ligand_b)
-        all_lig = torch.tensor(
-            [False] * target_mol.NumAtoms() + [True] * ligand_mol.NumAtoms()
+        The pose does not contain the one-hot atom type encoding, which is only needed
+        for e3nn models and is added by DatasetConfig.fix_e3nn_labels.
+        """
+        return DockedDataset._arrays_to_pose(
+            _complex_to_arrays(comp, ignore_h=ignore_h),
+            comp.ligand,
+            compound=compound,
+            exp_dict=exp_dict,
         )
 
-        # Add some extra stuff for use in e3nn models
-        all_one_hot = torch.nn.functional.one_hot(all_z - 1, 100).float()
+    @staticmethod
+    def _arrays_to_pose(arrays, ligand, compound=None, exp_dict=None):
+        """
+        Helper function to build a pose dict from the arrays generated by
+        _complex_to_arrays. Tensors share memory with the arrays.
+        """
 
-        # Subset to remove Hs if desired
-        if ignore_h:
-            h_idx = all_z == 1
-            all_pos = all_pos[~h_idx]
-            all_z = all_z[~h_idx]
-            all_b = all_b[~h_idx]
-            all_lig = all_lig[~h_idx]
-            all_one_hot = all_one_hot[~h_idx]
+        if exp_dict is None:
+            exp_dict = {}
 
         pose = {
-            "pos": all_pos,
-            "z": all_z,
-            "lig": all_lig,
-            "x": all_one_hot,
-            "b": all_b,
-            "ligand": comp.ligand,
+            "pos": torch.from_numpy(arrays["pos"]),
+            "z": torch.from_numpy(arrays["z"]),
+            "lig": torch.from_numpy(arrays["lig"]),
+            "b": torch.from_numpy(arrays["b"]),
+            "ligand": ligand,
         }
         if compound:
             pose["compound"] = compound
@@ -176,6 +450,7 @@ class DockedDataset(Dataset):
         ignore_h=True,
         extra_dict=None,
         num_workers=1,
+        pocket_cropper: PocketCropper | None = None,
     ):
         """
         Parameters
@@ -193,29 +468,21 @@ class DockedDataset(Dataset):
             keys ["z", "pos", "lig", "compound"]
         num_workers : int, default=1
             Number of cores to use to load structures
+        pocket_cropper : PocketCropper, optional
+            If given, crop the receptor atoms in each pose to the binding pocket
         """
         if extra_dict is None:
             extra_dict = {}
 
-        mp_args = [(fn, compound) for fn, compound in zip(str_fns, compounds)]
-
-        def mp_func(fn, compound):
-            return Complex.from_pdb(
-                pdb_file=fn,
-                target_kwargs={"target_name": compound[0]},
-                ligand_kwargs={"compound_name": compound[1]},
-            )
+        all_complexes = _load_complexes(str_fns, compounds, num_workers=num_workers)
 
-        if num_workers > 1:
-            import multiprocessing as mp
-
-            n_procs = min(num_workers, mp.cpu_count(), len(mp_args))
-            with mp.Pool(n_procs) as pool:
-                all_complexes = pool.starmap(mp_func, mp_args)
-        else:
-            all_complexes = [mp_func(*args) for args in mp_args]
-
-        return cls.from_complexes(all_complexes, exp_dict=extra_dict, ignore_h=ignore_h)
+        return cls.from_complexes(
+            all_complexes,
+            exp_dict=extra_dict,
+            ignore_h=ignore_h,
+            num_workers=num_workers,
+            pocket_cropper=pocket_cropper,
+        )
 
     def __len__(self):
         return len(self.structures)
@@ -295,14 +562,189 @@ class DockedDataset(Dataset):
         for s in self.structures:
             yield (s["compound"], s)
 
+    def split_index(self):
+        """
+        Per-structure compound keys, compound IDs, and dates, used for splitting. This
+        is built once and cached.
+
+        Returns
+        -------
+        dict
+            See _make_split_index
+        """
+        if getattr(self, "_split_index", None) is None:
+            compounds = [s["compound"] for s in self.structures]
+            if all("date_created" in s for s in self.structures):
+                dates = [s["date_created"] for s in self.structures]
+            else:
+                dates = None
+            self._split_index = _make_split_index(
+                compounds, [c[1] for c in compounds], dates
+            )
+
+        return self._split_index
+
+
+class CompoundShardStore(Mapping):
+    """
+    Read-only mapping from compound_id to the grouped data for that compound, backed by
+    one pickle shard per compound on disk plus a JSON index. Compounds are loaded
+    lazily on access and the most recently used ones are kept in memory.
+    """
+
+    index_file_name = "index.json"
+
+    def __init__(
+        self,
+        shard_dir: Path,
+        cache_size: int = 128,
+        max_poses: int | None = None,
+        for_e3nn: bool = False,
+    ):
+        """
+        Parameters
+        ----------
+        shard_dir : Path
+            Directory containing the shards and index, as written by
+            GroupedDockedDataset.from_complexes or GroupedDockedDataset.to_shards
+        cache_size : int, default=128
+            Number of compounds to keep in memory
+        max_poses : int, optional
+            Maximum number of poses to return for each compound. If not given, all
+            poses are returned
+        for_e3nn : bool, default=False
+            Adjust the labels of each pose for e3nn models as they are loaded
+        """
+        self.shard_dir = Path(shard_dir)
+        self.cache_size = cache_size
+        self.max_poses = max_poses
+        self.for_e3nn = for_e3nn
+
+        index = json.loads((self.shard_dir / self.index_file_name).read_text())
+        self.compound_ids = index["compound_ids"]
+        self.shard_files = dict(zip(index["compound_ids"], index["shard_files"]))
+        self.metadata = dict(zip(index["compound_ids"], index["metadata"]))
+        self._cache = OrderedDict()
+
+    @staticmethod
+    def write_shard(shard_dir: Path, shard_file: str, data: dict):
+        (Path(shard_dir) / shard_file).write_bytes(pkl.dumps(data))
+
+    @classmethod
+    def write_index(
+        cls,
+        shard_dir: Path,
+        compound_ids: list[str],
+        shard_files: list[str],
+        metadata: list[dict],
+    ):
+        (Path(shard_dir) / cls.index_file_name).write_text(
+            json.dumps(
+                {
+                    "compound_ids": compound_ids,
+                    "shard_files": shard_files,
+                    "metadata": metadata,
+                }
+            )
+        )
+
+    @staticmethod
+    def compound_metadata(data: dict) -> dict:
+        """
+        Small JSON-serializable summary of a compound that is stored in the index, so
+        it can be accessed without loading the shard.
+        """
+        date_created = data.get("date_created", None)
+        return {
+            "n_poses": len(data["poses"]),
+            "date_created": None if date_created is None else str(date_created),
+        }
+
+    def _load(self, compound_id):
+        data = pkl.loads((self.shard_dir / self.shard_files[compound_id]).read_bytes())
+        if self.max_poses is not None:
+            data = limit_compound_poses(data, self.max_poses)
+        if self.for_e3nn:
+            for pose in data["poses"]:
+                fix_e3nn_pose(pose)
+        return data
+
+    def __getitem__(self, compound_id):
+        try:
+            self._cache.move_to_end(compound_id)
+            return self._cache[compound_id]
+        except KeyError:
+            pass
+
+        if compound_id not in self.shard_files:
+            raise KeyError(compound_id)
+        data = self._load(compound_id)
+        self._cache[compound_id] = data
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return data
+
+    def __iter__(self):
+        return iter(self.compound_ids)
+
+    def __len__(self):
+        return len(self.compound_ids)
+
+    def __getstate__(self):
+        # Don't send the cached compounds along when pickling (eg to sweep workers),
+        #  each process loads its own from the shards
+        state = self.__dict__.copy()
+        state["_cache"] = OrderedDict()
+        return state
+
+
+def limit_compound_poses(data: dict, max_poses: int) -> dict:
+    """
+    Keep only the first max_poses poses of a grouped compound dict. The pose labels are
+    recalculated from the remaining poses, so best_pose_label still marks one pose and
+    rmsd_probs still sums to one.
+    """
+    if len(data["poses"]) <= max_poses:
+        return data
+
+    poses = data["poses"][:max_poses]
+    data = data | {"poses": poses}
+    if "rmsd_probs" in data:
+        pose_rmsds = np.asarray([pose["ref_rmsd"] for pose in poses])
+        best_lab = np.zeros(len(poses))
+        best_lab[np.argmin(pose_rmsds)] = 1
+        data["best_pose_label"] = best_lab
+        data["rmsd_probs"] = (1 / pose_rmsds) / (1 / pose_rmsds).sum()
+    return data
+
+
+def fix_e3nn_pose(pose):
+    """
+    Adjust the labels of a pose dict in place for use in an e3nn model. The one-hot
+    atom types go in "x", and "z" becomes a per-atom ligand label.
+    """
+    # Check if this pose has already been adjusted
+    if pose["z"].is_floating_point():
+        # Assume it'll only be floats if we've already run this function
+        return pose
+
+    pose["x"] = torch.nn.functional.one_hot(pose["z"] - 1, 100).float()
+    pose["z"] = pose["lig"].reshape((-1, 1)).float()
+    return pose
+
 
 class GroupedDockedDataset(Dataset):
     """
     Version of DockedDataset where data is grouped by compound_id, so all poses
     for a given compound can be accessed at a time.
+
+    The grouped data can either be held in memory, or sharded on disk with one record
+    per compound (see CompoundShardStore), in which case it is loaded lazily.
     """
 
-    def __init__(self, compound_ids: list[str] = [], structures: dict[str, dict] = {}):
+    def __init__(
+        self, compound_ids: list[str] = [], structures: Mapping[str, dict] = {}
+    ):
         """
         Constructor for GroupedDockedDataset object.
 
@@ -311,8 +753,8 @@ class GroupedDockedDataset(Dataset):
         compound_ids : list[str]
             List of compound ids. Each entry in this list must have a corresponding
             entry in structures
-        structures : dict[str, dict]
-            Dict mapping compound_id to a pose dict
+        structures : Mapping[str, dict]
+            Dict (or CompoundShardStore) mapping compound_id to a pose dict
         """
         import numpy as np
 
@@ -322,7 +764,99 @@ class GroupedDockedDataset(Dataset):
         self.structures = structures
 
     @classmethod
-    def from_complexes(cls, complexes: list[Complex], exp_dict={}, ignore_h=True):
+    def from_shards(
+        cls,
+        shard_dir: Path,
+        cache_size: int = 128,
+        max_poses: int | None = None,
+        for_e3nn: bool = False,
+    ):
+        """
+        Load a lazy GroupedDockedDataset from a directory of compound shards.
+
+        Parameters
+        ----------
+        shard_dir : Path
+            Directory containing the shards and index
+        cache_size : int, default=128
+            Number of compounds to keep in memory
+        max_poses : int, optional
+            Maximum number of poses to return for each compound
+        for_e3nn : bool, default=False
+            Adjust the labels of each pose for e3nn models as they are loaded
+
+        Returns
+        -------
+        GroupedDockedDataset
+        """
+        store = CompoundShardStore(
+            shard_dir, cache_size=cache_size, max_poses=max_poses, for_e3nn=for_e3nn
+        )
+        return cls(compound_ids=store.compound_ids, structures=store)
+
+    def to_shards(self, shard_dir: Path):
+        """
+        Write this dataset to a directory of compound shards, which can be loaded
+        lazily with GroupedDockedDataset.from_shards.
+
+        Parameters
+        ----------
+        shard_dir : Path
+            Directory to write the shards and index to
+        """
+        shard_dir = Path(shard_dir)
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        shard_files = []
+        metadata = []
+        for i, (compound_id, data) in enumerate(self):
+            shard_file = f"{i:08d}.pkl"
+            CompoundShardStore.write_shard(shard_dir, shard_file, data)
+            shard_files.append(shard_file)
+            metadata.append(CompoundShardStore.compound_metadata(data))
+        CompoundShardStore.write_index(
+            shard_dir, self.compound_ids.tolist(), shard_files, metadata
+        )
+
+    @staticmethod
+    def _build_compound_data(poses: list[dict]) -> dict:
+        """
+        Group all the poses for one compound, taking the compound-level data from the
+        first pose and labelling the pose closest to experiment if available.
+        """
+        # Take compound-level data from first pose
+        data = {"poses": poses} | {
+            k: v
+            for k, v in poses[0].items()
+            if (not isinstance(v, torch.Tensor)) and (k != "ref_rmsd")
+        }
+
+        # Calculate which pose is closest to experiment
+        if "xtal_ligand" in data:
+            # Get all RMSDs
+            pose_rmsds = np.asarray([pose["ref_rmsd"] for pose in poses])
+
+            # Label of all zeros, except the one with the best pose (lowest ref RMSD)
+            best_lab = np.zeros(len(poses))
+            best_lab[np.argmin(pose_rmsds)] = 1
+
+            data["best_pose_label"] = best_lab
+            # Normalize to probability, take inverse first so lower RMSDs are better
+            data["rmsd_probs"] = (1 / pose_rmsds) / (1 / pose_rmsds).sum()
+
+        return data
+
+    @classmethod
+    def from_complexes(
+        cls,
+        complexes: list[Complex],
+        exp_dict={},
+        ignore_h=True,
+        num_workers=1,
+        shard_dir: Path | None = None,
+        cache_size: int = 128,
+        max_poses: int | None = None,
+        pocket_cropper: PocketCropper | None = None,
+    ):
         """
         Build from a list of Complex objects.
 
@@ -336,6 +870,18 @@ class GroupedDockedDataset(Dataset):
             a ligand witht that compound_id
         ignore_h : bool, default=True
             Whether to remove hydrogens from the loaded structure
+        num_workers : int, default=1
+            Number of processes to use to featurize structures
+        shard_dir : Path, optional
+            If given, write each compound to its own shard in this directory as it is
+            built, and return a dataset that loads compounds lazily from the shards.
+            Only one chunk of compounds is held in memory while building
+        cache_size : int, default=128
+            Number of compounds to keep in memory if sharding
+        max_poses : int, optional
+            Maximum number of poses to keep for each compound
+        pocket_cropper : PocketCropper, optional
+            If given, crop the receptor atoms in each pose to the binding pocket
 
         Returns
         -------
@@ -343,57 +889,94 @@ class GroupedDockedDataset(Dataset):
         """
         from asapdiscovery.docking.analysis import calculate_rmsd_openeye
 
-        compound_ids = []
-        structures = {}
+        # Group the complexes by compound up front, so each compound can be built (and
+        #  written out) in one go
+        compound_complex_idxs = {}
         for i, comp in enumerate(complexes):
-            # compound = get_complex_id(comp)
-            compound = (comp.target.target_name, comp.ligand.compound_name)
-
-            # Build pose dict
-            try:
-                comp_exp_dict = comp.ligand.experimental_data.experimental_data
-            except AttributeError:
-                comp_exp_dict = {}
-            comp_exp_dict |= exp_dict.get(comp.ligand.compound_name, {})
-            pose = DockedDataset._complex_to_pose(
-                comp, compound=compound, exp_dict=comp_exp_dict, ignore_h=ignore_h
-            )
-
-            # Calculate RMSD to ref if available
-            if "xtal_ligand" in pose:
-                pose["ref_rmsd"] = calculate_rmsd_openeye(
-                    Ligand(**pose["xtal_ligand"]).to_oemol(), pose["ligand"].to_oemol()
-                )
-
             try:
-                structures[comp.ligand.compound_name]["poses"].append(pose)
+                compound_complex_idxs[comp.ligand.compound_name].append(i)
             except KeyError:
-                # Take compound-level data from first pose
-                exp_data = {
-                    k: v
-                    for k, v in pose.items()
-                    if (not isinstance(v, torch.Tensor)) and (k != "ref_rmsd")
-                }
-                structures[comp.ligand.compound_name] = {"poses": [pose]} | exp_data
-                compound_ids.append(comp.ligand.compound_name)
+                compound_complex_idxs[comp.ligand.compound_name] = [i]
+        compound_ids = list(compound_complex_idxs.keys())
 
-        # Calculate which pose is closest to experiment
-        for compound_id, data in structures.items():
-            if "xtal_ligand" not in data:
-                continue
+        if shard_dir is None:
+            # Build everything in one chunk
+            chunks = [compound_ids]
+        else:
+            shard_dir = Path(shard_dir)
+            shard_dir.mkdir(parents=True, exist_ok=True)
+            # Featurize in chunks of compounds covering roughly 1000 complexes each
+            chunks = [[]]
+            n_chunk = 0
+            for compound_id in compound_ids:
+                if n_chunk >= 1000:
+                    chunks.append([])
+                    n_chunk = 0
+                chunks[-1].append(compound_id)
+                n_chunk += len(compound_complex_idxs[compound_id])
 
-            # Get all RMSDs
-            pose_rmsds = np.asarray([pose["ref_rmsd"] for pose in data["poses"]])
+        structures = {}
+        shard_files = []
+        metadata = []
+        for chunk in chunks:
+            chunk_complexes = [
+                complexes[i]
+                for compound_id in chunk
+                for i in compound_complex_idxs[compound_id]
+            ]
+            all_arrays = iter(
+                _featurize_complexes(
+                    chunk_complexes, ignore_h=ignore_h, num_workers=num_workers
+                )
+            )
 
-            # Label of all zeros, except the one with the best pose (lowest ref RMSD)
-            best_lab = np.zeros(len(data["poses"]))
-            best_lab[np.argmin(pose_rmsds)] = 1
+            for compound_id in chunk:
+                poses = []
+                for i in compound_complex_idxs[compound_id]:
+                    comp = complexes[i]
+                    # compound = get_complex_id(comp)
+                    compound = (comp.target.target_name, comp.ligand.compound_name)
+
+                    # Build pose dict
+                    try:
+                        comp_exp_dict = comp.ligand.experimental_data.experimental_data
+                    except AttributeError:
+                        comp_exp_dict = {}
+                    comp_exp_dict |= exp_dict.get(comp.ligand.compound_name, {})
+                    arrays = next(all_arrays)
+                    if pocket_cropper is not None:
+                        arrays = pocket_cropper.crop_arrays(arrays, comp.target.hash)
+                    pose = DockedDataset._arrays_to_pose(
+                        arrays,
+                        comp.ligand,
+                        compound=compound,
+                        exp_dict=comp_exp_dict,
+                    )
+
+                    # Calculate RMSD to ref if available
+                    if "xtal_ligand" in pose:
+                        pose["ref_rmsd"] = calculate_rmsd_openeye(
+                            Ligand(**pose["xtal_ligand"]).to_oemol(),
+                            pose["ligand"].to_oemol(),
+                        )
+                    poses.append(pose)
+
+                data = cls._build_compound_data(poses)
+                if shard_dir is None:
+                    if max_poses is not None:
+                        data = limit_compound_poses(data, max_poses)
+                    structures[compound_id] = data
+                else:
+                    shard_file = f"{len(shard_files):08d}.pkl"
+                    CompoundShardStore.write_shard(shard_dir, shard_file, data)
+                    shard_files.append(shard_file)
+                    metadata.append(CompoundShardStore.compound_metadata(data))
 
-            data["best_pose_label"] = best_lab
-            # Normalize to probability, take inverse first so lower RMSDs are better
-            data["rmsd_probs"] = (1 / pose_rmsds) / (1 / pose_rmsds).sum()
+        if shard_dir is None:
+            return cls(compound_ids=compound_ids, structures=structures)
 
-        return cls(compound_ids=compound_ids, structures=structures)
+        CompoundShardStore.write_index(shard_dir, compound_ids, shard_files, metadata)
+        return cls.from_shards(shard_dir, cache_size=cache_size, max_poses=max_poses)
 
     @classmethod
     def from_files(
@@ -403,6 +986,7 @@ class GroupedDockedDataset(Dataset):
         ignore_h=True,
         extra_dict=None,
         num_workers=1,
+        pocket_cropper: PocketCropper | None = None,
     ):
         """
         Parameters
@@ -420,30 +1004,21 @@ class GroupedDockedDataset(Dataset):
             keys ["z", "pos", "lig", "compound"]
         num_workers : int, default=1
             Number of cores to use to load structures
+        pocket_cropper : PocketCropper, optional
+            If given, crop the receptor atoms in each pose to the binding pocket
         """
-
         if extra_dict is None:
             extra_dict = {}
 
-        mp_args = [(fn, compound) for fn, compound in zip(str_fns, compounds)]
-
-        def mp_func(fn, compound):
-            return Complex.from_pdb(
-                pdb_file=fn,
-                target_kwargs={"target_name": compound[0]},
-                ligand_kwargs={"compound_name": compound[1]},
-            )
-
-        if num_workers > 1:
-            import multiprocessing as mp
-
-            n_procs = min(num_workers, mp.cpu_count(), len(mp_args))
-            with mp.Pool(n_procs) as pool:
-                all_complexes = pool.starmap(mp_func, mp_args)
-        else:
-            all_complexes = [mp_func(*args) for args in mp_args]
+        all_complexes = _load_complexes(str_fns, compounds, num_workers=num_workers)
 
-        return cls.from_complexes(all_complexes, exp_dict=extra_dict, ignore_h=ignore_h)
+        return cls.from_complexes(
+            all_complexes,
+            exp_dict=extra_dict,
+            ignore_h=ignore_h,
+            num_workers=num_workers,
+            pocket_cropper=pocket_cropper,
+        )
 
     def __len__(self):
         return len(self.compound_ids)
@@ -511,6 +1086,313 @@ class GroupedDockedDataset(Dataset):
         for compound_id in self.compound_ids:
             yield compound_id, self.structures[compound_id]
 
+    def split_index(self):
+        """
+        Per-compound IDs and dates, used for splitting. This is built once and cached.
+        If the data is sharded, the dates are taken from the shard index, so no shards
+        are loaded.
+
+        Returns
+        -------
+        dict
+            See _make_split_index
+        """
+        if getattr(self, "_split_index", None) is None:
+            if isinstance(self.structures, CompoundShardStore):
+                dates = [
+                    self.structures.metadata[compound_id]["date_created"]
+                    for compound_id in self.compound_ids
+                ]
+            elif all(
+                "date_created" in self.structures[compound_id]
+                for compound_id in self.compound_ids
+            ):
+                dates = [
+                    self.structures[compound_id]["date_created"]
+                    for compound_id in self.compound_ids
+                ]
+            else:
+                dates = None
+            self._split_index = _make_split_index(
+                self.compound_ids.tolist(), self.compound_ids, dates
+            )
+
+        return self._split_index
+
+
+def _stable_repr(obj):
+    """
+    Build a repr of a (possibly nested) featurizer object that doesn't depend on memory
+    addresses, so it can be used to identify the featurizer across processes and runs.
+    """
+    import functools
+
+    if isinstance(obj, functools.partial):
+        return (
+            f"partial({_stable_repr(obj.func)}, {_stable_repr(obj.args)}, "
+            f"{_stable_repr(obj.keywords)})"
+        )
+    if callable(obj) and hasattr(obj, "__qualname__"):
+        return f"{obj.__module__}.{obj.__qualname__}"
+    if isinstance(obj, dict):
+        return (
+            "{"
+            + ", ".join(
+                f"{_stable_repr(k)}: {_stable_repr(v)}"
+                for k, v in sorted(obj.items(), key=lambda kv: str(kv[0]))
+            )
+            + "}"
+        )
+    if isinstance(obj, (list, tuple, set)):
+        vals = sorted(obj, key=str) if isinstance(obj, set) else obj
+        return f"{type(obj).__name__}({', '.join(_stable_repr(v) for v in vals)})"
+    if hasattr(obj, "__dict__"):
+        cls = type(obj)
+        return f"{cls.__module__}.{cls.__qualname__}({_stable_repr(vars(obj))})"
+    return repr(obj)
+
+
+def _featurizer_id(node_featurizer=None, edge_featurizer=None):
+    """
+    Short hash identifying a combination of node and edge featurizers, used to make
+    sure cached graphs are only reused with the featurizers they were built with.
+    """
+    import hashlib
+
+    return hashlib.sha256(
+        (f"{_stable_repr(node_featurizer)}|{_stable_repr(edge_featurizer)}").encode()
+    ).hexdigest()[:16]
+
+
+class GraphCache:
+    """
+    Persistent on-disk cache of featurized DGL graphs, keyed by canonical SMILES. Each
+    combination of node and edge featurizers gets its own subdirectory, containing
+    append-only chunks of graphs written with dgl.save_graphs and a JSON index mapping
+    each canonical SMILES to its (chunk, position). Lookups that miss are featurized
+    and added to the cache. Hit and miss counts are tracked so the cache effectiveness
+    can be reported. Several processes can share the same cache directory, each chunk
+    gets a unique name and the index is merged with the one on disk under a file lock.
+    """
+
+    index_file_name = "index.json"
+    lock_file_name = "index.lock"
+
+    def __init__(self, cache_dir: Path, node_featurizer=None, edge_featurizer=None):
+        """
+        Parameters
+        ----------
+        cache_dir : Path
+            Top-level cache directory. Can be shared between different featurizers
+        node_featurizer : BaseAtomFeaturizer, optional
+            Featurizer for node data
+        edge_featurizer : BaseBondFeaturizer, optional
+            Featurizer for edges
+        """
+        from dgllife.utils import SMILESToBigraph
+
+        self.node_featurizer = node_featurizer
+        self.edge_featurizer = edge_featurizer
+        self.featurizer_id = _featurizer_id(node_featurizer, edge_featurizer)
+        self.cache_dir = Path(cache_dir) / self.featurizer_id
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.smiles_to_g = SMILESToBigraph(
+            add_self_loop=True,
+            node_featurizer=node_featurizer,
+            edge_featurizer=edge_featurizer,
+        )
+
+        index_file = self.cache_dir / self.index_file_name
+        if index_file.exists():
+            self.index = json.loads(index_file.read_text())
+        else:
+            self.index = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def canonical_smiles(smiles: str) -> str:
+        """
+        Canonicalize a SMILES string with RDKit (which is what dgllife uses to build
+        the graphs). SMILES that can't be parsed are returned as-is.
+        """
+        from rdkit import Chem
+
+        mol = Chem.MolFromSmiles(smiles)
+        if mol is None:
+            return smiles
+        return Chem.MolToSmiles(mol)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "n_cached": len(self.index),
+        }
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, smiles):
+        return self.canonical_smiles(smiles) in self.index
+
+    @contextmanager
+    def _index_lock(self):
+        """
+        Hold an exclusive lock on the index, so processes sharing the cache directory
+        update it one at a time.
+        """
+        import fcntl
+
+        with open(self.cache_dir / self.lock_file_name, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_chunk(self, smiles_list, graphs):
+        import dgl
+
+        # Chunks are never modified once written. Each gets a unique name so writers
+        #  sharing the cache directory can't collide, and is renamed into place once
+        #  complete so it's never read partially written
+        chunk_file = f"graphs_{uuid.uuid4().hex}.bin"
+        tmp_chunk_file = self.cache_dir / f"{chunk_file}.tmp"
+        dgl.save_graphs(str(tmp_chunk_file), graphs)
+        os.replace(tmp_chunk_file, self.cache_dir / chunk_file)
+
+        new_entries = {smi: [chunk_file, i] for i, smi in enumerate(smiles_list)}
+        index_file = self.cache_dir / self.index_file_name
+        with self._index_lock():
+            # Merge with the index on disk to keep entries added by other processes
+            if index_file.exists():
+                self.index = json.loads(index_file.read_text()) | new_entries
+            else:
+                self.index |= new_entries
+
+            # Write the index atomically so readers never see a partial file
+            tmp_index_file = (
+                self.cache_dir / f"{self.index_file_name}.{uuid.uuid4().hex}.tmp"
+            )
+            tmp_index_file.write_text(json.dumps(self.index))
+            os.replace(tmp_index_file, index_file)
+
+    def get_graphs(self, smiles_list: list[str]):
+        """
+        Get the featurized graph for each SMILES, featurizing and caching any that
+        aren't already in the cache.
+
+        Parameters
+        ----------
+        smiles_list : list[str]
+            SMILES strings to get graphs for
+
+        Returns
+        -------
+        list[dgl.DGLGraph]
+            Graph for each SMILES, in the same order as the input. Graphs are built
+            from the canonical SMILES, so equivalent SMILES give identical graphs
+        """
+        import dgl
+
+        canonical = [self.canonical_smiles(smi) for smi in smiles_list]
+
+        # Group cached graphs by chunk so each chunk file is only read once
+        graphs = {}
+        chunk_requests = {}
+        new_smiles = []
+        for smi in dict.fromkeys(canonical):
+            try:
+                chunk_file, i = self.index[smi]
+            except KeyError:
+                new_smiles.append(smi)
+                continue
+            chunk_requests.setdefault(chunk_file, []).append((smi, i))
+
+        for chunk_file, requests in chunk_requests.items():
+            chunk_graphs, _ = dgl.load_graphs(
+                str(self.cache_dir / chunk_file), [i for _, i in requests]
+            )
+            graphs |= {smi: g for (smi, _), g in zip(requests, chunk_graphs)}
+
+        # Featurize and store anything that was missing
+        new_graphs = {smi: self.smiles_to_g(smi) for smi in new_smiles}
+        # Don't cache SMILES that failed to featurize
+        new_graphs = {smi: g for smi, g in new_graphs.items() if g is not None}
+        if len(new_graphs) > 0:
+            self._write_chunk(list(new_graphs.keys()), list(new_graphs.values()))
+        graphs |= new_graphs
+
+        new_smiles = set(new_smiles)
+        n_misses = sum(smi in new_smiles for smi in canonical)
+        self.misses += n_misses
+        self.hits += len(canonical) - n_misses
+
+        return [graphs.get(smi, None) for smi in canonical]
+
+
+def _featurize_smiles(
+    smiles_list, node_featurizer=None, edge_featurizer=None, graph_cache=None
+):
+    """
+    Build DGL graphs for a list of SMILES, going through a GraphCache if one is given.
+
+    Parameters
+    ----------
+    smiles_list : list[str]
+        SMILES to featurize
+    node_featurizer : BaseAtomFeaturizer, optional
+        Featurizer for node data
+    edge_featurizer : BaseBondFeaturizer, optional
+        Featurizer for edges
+    graph_cache : Path | GraphCache, optional
+        Cache (or cache directory) to look up and store graphs in
+
+    Returns
+    -------
+    list[dgl.DGLGraph]
+        Graph for each SMILES
+    """
+    if graph_cache is None:
+        from dgllife.utils import SMILESToBigraph
+
+        # Function for encoding SMILES to a graph
+        smiles_to_g = SMILESToBigraph(
+            add_self_loop=True,
+            node_featurizer=node_featurizer,
+            edge_featurizer=edge_featurizer,
+        )
+        # Featurize the canonical SMILES, same as GraphCache, so the node ordering
+        #  doesn't depend on whether a cache is used
+        return [smiles_to_g(GraphCache.canonical_smiles(smi)) for smi in smiles_list]
+
+    if not isinstance(graph_cache, GraphCache):
+        graph_cache = GraphCache(
+            graph_cache,
+            node_featurizer=node_featurizer,
+            edge_featurizer=edge_featurizer,
+        )
+    elif graph_cache.featurizer_id != _featurizer_id(node_featurizer, edge_featurizer):
+        raise ValueError("GraphCache was built with different featurizers.")
+
+    graphs = graph_cache.get_graphs(smiles_list)
+    stats = graph_cache.stats()
+    print(
+        f"Graph cache: {stats['hits']} hits, {stats['misses']} misses "
+        f"({stats['hit_rate']:.1%} hit rate)",
+        flush=True,
+    )
+    return graphs
+
 
 class GraphDataset(Dataset):
     """
@@ -530,6 +1412,7 @@ class GraphDataset(Dataset):
         exp_dict: dict = {},
         node_featurizer=None,
         edge_featurizer=None,
+        graph_cache=None,
     ):
         """
         Parameters
@@ -544,20 +1427,21 @@ class GraphDataset(Dataset):
             Featurizer for node data
         edge_featurizer : BaseBondFeaturizer, optional
             Featurizer for edges
+        graph_cache : Path | GraphCache, optional
+            Persistent cache of featurized graphs to use (see GraphCache)
         """
 
-        from dgllife.utils import SMILESToBigraph
-
-        # Function for encoding SMILES to a graph
-        smiles_to_g = SMILESToBigraph(
-            add_self_loop=True,
+        # Generate DGL graphs
+        all_graphs = _featurize_smiles(
+            [lig.smiles for lig in ligands],
             node_featurizer=node_featurizer,
             edge_featurizer=edge_featurizer,
+            graph_cache=graph_cache,
         )
 
         compounds = {}
         structures = []
-        for i, lig in enumerate(ligands):
+        for i, (lig, g) in enumerate(zip(ligands, all_graphs)):
             compound_id = lig.compound_name
             smiles = lig.smiles
 
@@ -565,9 +1449,6 @@ class GraphDataset(Dataset):
             #  attached to a protein structure at all
             compound = ("NA", compound_id)
 
-            # Generate DGL graph
-            g = smiles_to_g(smiles)
-
             # Gather experimental data
             try:
                 lig_exp_dict = lig.experimental_data.experimental_data
@@ -600,6 +1481,7 @@ class GraphDataset(Dataset):
         exp_dict: dict = {},
         node_featurizer=None,
         edge_featurizer=None,
+        graph_cache=None,
     ):
         """
         Parameters
@@ -614,21 +1496,21 @@ class GraphDataset(Dataset):
             Featurizer for node data
         edge_featurizer : BaseBondFeaturizer, optional
             Featurizer for edges
-            Cache file for graph dataset
+        graph_cache : Path | GraphCache, optional
+            Persistent cache of featurized graphs to use (see GraphCache)
 
         """
-        from dgllife.utils import SMILESToBigraph
-
-        # Function for encoding SMILES to a graph
-        smiles_to_g = SMILESToBigraph(
-            add_self_loop=True,
+        # Generate DGL graphs
+        all_graphs = _featurize_smiles(
+            [exp_compound.smiles for exp_compound in exp_compounds],
             node_featurizer=node_featurizer,
             edge_featurizer=edge_featurizer,
+            graph_cache=graph_cache,
         )
 
         compounds = {}
         structures = []
-        for i, exp_compound in enumerate(exp_compounds):
+        for i, (exp_compound, g) in enumerate(zip(exp_compounds, all_graphs)):
             compound_id = exp_compound.compound_id
             smiles = exp_compound.smiles
 
@@ -636,9 +1518,6 @@ class GraphDataset(Dataset):
             #  attached to a protein structure at all
             compound = ("NA", compound_id)
 
-            # Generate DGL graph
-            g = smiles_to_g(smiles)
-
             # Gather experimental data
             lig_exp_dict = exp_compound.experimental_data.copy()
             lig_exp_dict |= exp_dict.get(compound_id, {})
@@ -745,6 +1624,28 @@ class GraphDataset(Dataset):
         for s in self.structures:
             yield (s["compound"], s)
 
+    def split_index(self):
+        """
+        Per-structure compound keys, compound IDs, and dates, used for splitting. This
+        is built once and cached.
+
+        Returns
+        -------
+        dict
+            See _make_split_index
+        """
+        if getattr(self, "_split_index", None) is None:
+            compounds = [s["compound"] for s in self.structures]
+            if all("date_created" in s for s in self.structures):
+                dates = [s["date_created"] for s in self.structures]
+            else:
+                dates = None
+            self._split_index = _make_split_index(
+                compounds, [c[1] for c in compounds], dates
+            )
+
+        return self._split_index
+
 
 def dataset_to_dataframe(dataset):
     all_data = []
@@ -1,4 +1,5 @@
 import json
+from itertools import islice
 from pathlib import Path
 from typing import Any, ClassVar, Dict, List, Optional, Union  # noqa: F401
 
@@ -10,8 +11,7 @@ from asapdiscovery.data.backend.openeye import oechem
 from asapdiscovery.data.schema.complex import Complex
 from asapdiscovery.data.schema.ligand import Ligand
 from asapdiscovery.data.services.postera.manifold_data_validation import TargetTags
-from asapdiscovery.ml.config import DatasetConfig
-from asapdiscovery.ml.dataset import DockedDataset, GraphDataset
+from asapdiscovery.ml.dataset import GraphDataset, PocketCropper, _oemol_to_arrays
 from asapdiscovery.ml.models import (
     ASAPMLModelRegistry,
     LocalMLModelSpecBase,
@@ -33,6 +33,51 @@ each model and store in S3 to use during testing.
 """
 
 
+def _load_weights(weights_file: Path, device: str = "cpu", mmap: bool = False):
+    """
+    Load a model state dict. If mmap is True, the weights are memory-mapped from the
+    file (on CPU) rather than read into memory, so every process on a node that loads
+    the same file shares one physical copy through the page cache. Files ending in
+    .safetensors are loaded with safetensors, which is always memory-mapped.
+    """
+    weights_file = Path(weights_file)
+    if weights_file.suffix == ".safetensors":
+        from safetensors.torch import load_file
+
+        return load_file(weights_file, device="cpu" if mmap else device)
+
+    if mmap:
+        return torch.load(weights_file, map_location="cpu", mmap=True)
+    else:
+        return torch.load(weights_file, map_location=device)
+
+
+def _build_model(
+    config_cls,
+    config_file: Path,
+    weights_file: Path,
+    device: str = "cpu",
+    mmap_weights: bool = False,
+):
+    """
+    Build a model in eval mode from its config and weights files. With mmap_weights,
+    the model parameters are the memory-mapped tensors themselves (not copies of
+    them), so the mapped pages stay shared between processes.
+    """
+    config_kwargs = json.loads(Path(config_file).read_text())
+    weights = _load_weights(weights_file, device=device, mmap=mmap_weights)
+    if mmap_weights:
+        config_kwargs.pop("model_weights", None)
+        model = config_cls(**config_kwargs).build()
+        model.load_state_dict(weights, assign=True)
+    else:
+        config_kwargs["model_weights"] = weights
+        model = config_cls(**config_kwargs).build()
+    model.eval()
+
+    return model
+
+
 class InferenceBase(BaseModel):
     class Config:
         validate_assignment = True
@@ -137,6 +182,7 @@ class InferenceBase(BaseModel):
         device: str = "cpu",
         local_dir: Optional[Union[str, Path]] = None,
         build_model_kwargs: Optional[dict] = {},
+        mmap_weights: bool = False,
     ) -> "InferenceBase":
         """
         Create an InferenceBase object from an MLModelSpec.
@@ -145,6 +191,8 @@ class InferenceBase(BaseModel):
         ----------
         model_spec : MLModelSpec
             MLModelSpec to use to create InferenceBase object.
+        mmap_weights : bool, default=False
+            Memory-map the model weights, see from_local_model_spec
 
         Returns
         -------
@@ -157,6 +205,7 @@ class InferenceBase(BaseModel):
             device=device,
             model_spec=model_spec,
             build_model_kwargs=build_model_kwargs,
+            mmap_weights=mmap_weights,
         )
 
     @classmethod
@@ -166,6 +215,7 @@ class InferenceBase(BaseModel):
         device: str = "cpu",
         model_spec: Optional[MLModelSpec] = None,
         build_model_kwargs: Optional[dict] = {},
+        mmap_weights: bool = False,
     ) -> "InferenceBase":
         """
         Create an InferenceBase object from a LocalMLModelSpec.
@@ -174,6 +224,11 @@ class InferenceBase(BaseModel):
         ----------
         local_model_spec : LocalMLModelSpec
             LocalMLModelSpec to use to create InferenceBase object.
+        mmap_weights : bool, default=False
+            Memory-map the model weights on CPU instead of reading them into each
+            process. All processes on a node that load the same model (eg dask
+            workers) then share one physical copy of the weights, and start-up only
+            reads the pages that are actually used. Ignores device
 
         Returns
         -------
@@ -216,25 +271,25 @@ class InferenceBase(BaseModel):
 
         if model_spec.ensemble:
             for model in local_model_spec.models:
-
-                config_kwargs = json.loads(model.config_file.read_text())
-
-                # warnings.warn(f"failed to parse model config file, {model.config_file}")
-                # config_kwargs = {}
-                config_kwargs["model_weights"] = torch.load(
-                    model.weights_file, map_location=device
+                models.append(
+                    _build_model(
+                        config_cls,
+                        model.config_file,
+                        model.weights_file,
+                        device=device,
+                        mmap_weights=mmap_weights,
+                    )
                 )
-                model = config_cls(**config_kwargs).build()
-                model.eval()
-                models.append(model)
         else:
-            config_kwargs = json.loads(local_model_spec.config_file.read_text())
-            config_kwargs["model_weights"] = torch.load(
-                local_model_spec.weights_file, map_location=device
+            models.append(
+                _build_model(
+                    config_cls,
+                    local_model_spec.config_file,
+                    local_model_spec.weights_file,
+                    device=device,
+                    mmap_weights=mmap_weights,
+                )
             )
-            model = config_cls(**config_kwargs).build()
-            model.eval()
-            models.append(model)
 
         return cls(
             targets=local_model_spec.targets,
@@ -349,6 +404,7 @@ class GATInference(InferenceBase):
         node_featurizer=None,
         edge_featurizer=None,
         return_err=False,
+        graph_cache=None,
     ) -> Union[np.ndarray, float]:
         """Predict on a list of SMILES strings, or a single SMILES string.
 
@@ -361,6 +417,9 @@ class GATInference(InferenceBase):
         edge_featurizer : BaseBondFeaturizer, optional
             Featurizer for edges
         return_err: bool, default=False
+        graph_cache : Path | GraphCache, optional
+            Persistent cache of featurized graphs to use, so repeated predictions on
+            the same compounds skip featurization
 
         Returns
         -------
@@ -380,7 +439,10 @@ class GATInference(InferenceBase):
         if not node_featurizer:
             node_featurizer = CanonicalAtomFeaturizer()
         ds = GraphDataset.from_ligands(
-            ligands, node_featurizer=node_featurizer, edge_featurizer=edge_featurizer
+            ligands,
+            node_featurizer=node_featurizer,
+            edge_featurizer=edge_featurizer,
+            graph_cache=graph_cache,
         )
         # always return a 2D array, then we can mask out the err dimension
         data = [self.predict(pose["g"], return_err=True) for _, pose in ds]
@@ -460,8 +522,205 @@ class StructuralInference(InferenceBase):
             else:
                 return pred
 
+    def predict_batch(
+        self, poses: list[dict], aggfunc=np.mean, errfunc=np.std, return_err=False
+    ):
+        """Predict on a batch of poses. Each model in the ensemble is run over the
+        whole batch in turn, and predictions are only moved off of the model's device
+        once per model, rather than once per model per pose.
+
+        Parameters
+        ----------
+        poses : list[dict]
+            List of pose dicts, as passed to predict
+        aggfunc: function, default=np.mean
+            Function to aggregate predictions from multiple models.
+        errfunc: function, default=np.std
+            Function to calculate error from multiple models.
+        return_err: bool, default=False
+            Return error in addition to prediction.
+
+        Returns
+        -------
+        np.ndarray
+            Predictions for each pose, shape (n_poses,)
+        np.ndarray
+            Errors for each pose, shape (n_poses,)
+        """
+        if len(poses) == 0:
+            preds = np.zeros(0, dtype=np.float32)
+            return (preds, preds.copy()) if return_err else preds
+
+        with torch.no_grad():
+            # (n_models, n_poses, n_outputs)
+            aggregate_preds = np.stack(
+                [
+                    torch.stack([model(p)[0].reshape(-1) for p in poses]).cpu().numpy()
+                    for model in self.models
+                ]
+            )
+
+        if self.is_ensemble:
+            # Aggregate over all outputs of all models for each pose, same as predict
+            aggregate_preds = aggregate_preds.transpose((1, 0, 2)).reshape(
+                (len(poses), -1)
+            )
+            preds = np.asarray([aggfunc(p) for p in aggregate_preds])
+            errs = np.asarray([errfunc(p) for p in aggregate_preds])
+        else:
+            preds = aggregate_preds[0, :, 0]
+            errs = np.full(len(poses), np.nan)
+
+        if return_err:
+            return preds, errs
+        else:
+            return preds
+
+    @staticmethod
+    def _mol_to_tensors(mol, is_lig, for_e3nn=False):
+        """
+        Featurize one half (target or ligand) of a complex into a dict of tensors that
+        can be concatenated with the other half to give a pose.
+        """
+        pos, z, b = _oemol_to_arrays(mol)
+        tensors = {
+            "pos": torch.from_numpy(pos),
+            "z": torch.from_numpy(z),
+            "lig": torch.full((len(z),), is_lig, dtype=torch.bool),
+            "b": torch.from_numpy(b),
+        }
+        if for_e3nn:
+            tensors["x"] = torch.nn.functional.one_hot(tensors["z"] - 1, 100).float()
+
+        return tensors
+
+    @staticmethod
+    def _iter_poses(
+        complexes: list[Complex],
+        for_e3nn: bool = False,
+        pocket_cropper: PocketCropper | None = None,
+    ):
+        """
+        Generate a pose dict for each Complex. Each unique target (by hash) is only
+        featurized once, and its tensors are shared by all the poses that use it, so
+        only the ligand atoms are featurized for each pose. If a PocketCropper is
+        given, the target is cropped once per binding site.
+        """
+        target_cache = {}
+        pocket_cache = {}
+        for comp in complexes:
+            target_key = comp.target.hash
+            try:
+                target_tensors = target_cache[target_key]
+            except KeyError:
+                target_tensors = StructuralInference._mol_to_tensors(
+                    comp.target.to_oemol(), False, for_e3nn
+                )
+                target_cache[target_key] = target_tensors
+            ligand_tensors = StructuralInference._mol_to_tensors(
+                comp.ligand.to_oemol(), True, for_e3nn
+            )
+
+            if pocket_cropper is not None:
+                ligand_pos = ligand_tensors["pos"].numpy()
+                pocket_key = (target_key, pocket_cropper.site_key(ligand_pos))
+                idxs = pocket_cropper.crop_idxs(
+                    target_key, target_tensors["pos"].numpy(), ligand_pos
+                )
+                try:
+                    target_tensors = pocket_cache[pocket_key]
+                except KeyError:
+                    idxs = torch.from_numpy(idxs)
+                    target_tensors = {k: v[idxs] for k, v in target_tensors.items()}
+                    pocket_cache[pocket_key] = target_tensors
+
+            pose = {
+                k: torch.cat([target_tensors[k], ligand_tensors[k]])
+                for k in target_tensors
+            }
+            if for_e3nn:
+                # Same labels as fix_e3nn_pose
+                pose["z"] = pose["lig"].reshape((-1, 1)).float()
+            pose["ligand"] = comp.ligand
+
+            yield pose
+
+    @staticmethod
+    def _format_preds(preds, errs, return_err=False):
+        """
+        Return a scalar if only one prediction was made, otherwise a flat array.
+        """
+        if preds.size == 1:
+            preds = preds.item()
+            errs = errs.item()
+        else:
+            preds = preds.flatten()
+            errs = errs.flatten()
+
+        if return_err:
+            return preds, errs
+        else:
+            return preds
+
+    def predict_from_complexes(
+        self,
+        complexes: list[Complex],
+        for_e3nn: bool = False,
+        return_err=False,
+        batch_size: int = 256,
+        pocket_cropper: PocketCropper | None = None,
+    ) -> Union[np.ndarray, float]:
+        """
+        Predict on a list of Complexes. Targets shared between Complexes (eg many
+        docked poses against the same receptor) are only featurized once, and every
+        model is evaluated once per batch of poses.
+
+        Parameters
+        ----------
+        complexes : list[Complex]
+            Complexes to predict on
+        for_e3nn : bool, default=False
+            If this prediction is being made for an e3nn model. Need to adjust the
+            dict labels in this case
+        return_err: bool, default=False
+            Return error in addition to prediction.
+        batch_size : int, default=256
+            Number of poses to featurize and hold in memory at once
+        pocket_cropper : PocketCropper, optional
+            If given, crop the target atoms in each pose to the binding pocket. This
+            should match how the model was trained
+
+        Returns
+        -------
+        np.ndarray or float
+            Model prediction(s)
+        np.ndarray or float
+            Model error(s)
+        """
+        pose_iter = self._iter_poses(
+            complexes, for_e3nn=for_e3nn, pocket_cropper=pocket_cropper
+        )
+        all_preds = []
+        all_errs = []
+        while batch := list(islice(pose_iter, batch_size)):
+            preds, errs = self.predict_batch(batch, return_err=True)
+            all_preds.append(preds)
+            all_errs.append(errs)
+
+        if len(all_preds) == 0:
+            preds = errs = np.zeros(0, dtype=np.float32)
+        else:
+            preds = np.concatenate(all_preds)
+            errs = np.concatenate(all_errs)
+
+        return self._format_preds(preds, errs, return_err=return_err)
+
     def predict_from_structure_file(
-        self, pose: Union[Path, list[Path]], for_e3nn: bool = False, return_err=False
+        self,
+        pose: Union[Path, list[Path]],
+        for_e3nn: bool = False,
+        return_err=False,
+        batch_size: int = 256,
     ) -> Union[np.ndarray, float]:
         """Predict on a list of poses or a single pose.
 
@@ -473,6 +732,8 @@ class StructuralInference(InferenceBase):
             If this prediction is being made for an e3nn model. Need to adjust the
             dict labels in this case
         return_err: bool, default=False
+        batch_size : int, default=256
+            Number of poses to featurize and hold in memory at once
 
         Returns
         -------
@@ -493,31 +754,12 @@ class StructuralInference(InferenceBase):
             )
             for i, p in enumerate(pose)
         ]
-        pose = [DockedDataset._complex_to_pose(c) for c in complexes]
-        if for_e3nn:
-            pose = [
-                p[1] for p in DatasetConfig.fix_e3nn_labels([(None, p) for p in pose])
-            ]
-        # always return a 2D array, then we can mask out the err dimension
-        data = [self.predict(p, return_err=True) for p in pose]
-        data = np.asarray(data, dtype=np.float32)
-        # if it is 1D array, we need to convert to 2D
-        if len(data.shape) == 1:
-            data = data.reshape(1, -1)
-        preds = data[:, 0]
-        if return_err:
-            errs = data[:, 1]
-        # return a scalar float value if we only have one input
-        if np.all(np.array(preds.shape) == 1):
-            preds = preds.item()
-            if return_err:
-                errs = errs.item()
-
-        else:
-            # flatten the array if we have multiple inputs
-            preds = preds.flatten()
-            if return_err:
-                errs = errs.flatten()
+        preds, errs = self.predict_from_complexes(
+            complexes, for_e3nn=for_e3nn, return_err=True, batch_size=batch_size
+        )
+        if not isinstance(preds, float):
+            preds = preds.astype(np.float32)
+            errs = errs.astype(np.float32)
 
         if return_err:
             return preds, errs
@@ -529,6 +771,7 @@ class StructuralInference(InferenceBase):
         pose: Union[oechem.OEMol, list[oechem.OEMol]],
         for_e3nn: bool = False,
         return_err=False,
+        batch_size: int = 256,
     ) -> Union[np.ndarray, float]:
         """
         Predict on a (list of) OEMol objects.
@@ -541,6 +784,8 @@ class StructuralInference(InferenceBase):
             If this prediction is being made for an e3nn model. Need to adjust the
             dict labels in this case
         return_err: bool, default=False
+        batch_size : int, default=256
+            Number of poses to featurize and hold in memory at once
 
         Returns
         -------
@@ -562,37 +807,9 @@ class StructuralInference(InferenceBase):
             for i, p in enumerate(pose)
         ]
 
-        # Build each pose from complex
-        pose = [DockedDataset._complex_to_pose(c) for c in complexes]
-        if for_e3nn:
-            pose = [
-                p[1] for p in DatasetConfig.fix_e3nn_labels([(None, p) for p in pose])
-            ]
-
-        # Make predictions
-        # always return a 2D array, then we can mask out the err dimension
-        data = [self.predict(p, return_err=True) for p in pose]
-        data = np.asarray(data)
-        # if it is 1D array, we need to convert to 2D
-        if len(data.shape) == 1:
-            data = data.reshape(1, -1)
-        preds = data[:, 0]
-        if return_err:
-            errs = data[:, 1]
-        # return a scalar float value if we only have one input
-        if np.all(np.array(preds.shape) == 1):
-            preds = preds.item()
-            if return_err:
-                errs = errs.item()
-        else:
-            # flatten the array if we have multiple inputs
-            preds = preds.flatten()
-            if return_err:
-                errs = errs.flatten()
-        if return_err:
-            return preds, errs
-        else:
-            return preds
+        return self.predict_from_complexes(
+            complexes, for_e3nn=for_e3nn, return_err=return_err, batch_size=batch_size
+        )
 
 
 class SchnetInference(StructuralInference):
@@ -610,19 +827,40 @@ class E3nnInference(StructuralInference):
 
     model_type: ClassVar[ModelType.e3nn] = ModelType.e3nn
 
-    def predict_from_structure_file(self, pose, return_err=False):
+    def predict_from_complexes(
+        self,
+        complexes,
+        for_e3nn=True,
+        return_err=False,
+        batch_size=256,
+        pocket_cropper=None,
+    ):
+        """
+        Overload the base class method to always pass for_e3nn=True.
+        """
+        return super().predict_from_complexes(
+            complexes,
+            for_e3nn=True,
+            return_err=return_err,
+            batch_size=batch_size,
+            pocket_cropper=pocket_cropper,
+        )
+
+    def predict_from_structure_file(self, pose, return_err=False, batch_size=256):
         """
         Overload the base class method to pass for_e3nn=True.
         """
         return super().predict_from_structure_file(
-            pose, for_e3nn=True, return_err=return_err
+            pose, for_e3nn=True, return_err=return_err, batch_size=batch_size
         )
 
-    def predict_from_oemol(self, pose, return_err=False):
+    def predict_from_oemol(self, pose, return_err=False, batch_size=256):
         """
         Overload the base class method to pass for_e3nn=True.
         """
-        return super().predict_from_oemol(pose, for_e3nn=True, return_err=return_err)
+        return super().predict_from_oemol(
+            pose, for_e3nn=True, return_err=return_err, batch_size=batch_size
+        )
 
 
 _inferences_classes_meta = [
@@ -1,8 +1,12 @@
+import json
+import os
+from pathlib import Path
+
 import numpy as np
 import pandas
 import torch
 from asapdiscovery.ml.config import LossFunctionConfig
-from pydantic import BaseModel, Extra, Field, validator
+from pydantic import BaseModel, Extra, Field, PrivateAttr, validator
 from scipy.stats import bootstrap, kendalltau, spearmanr
 
 
@@ -99,6 +103,13 @@ class TrainingPredictionTracker(BaseModel):
         None, description="Internal dict storing all TrainingPredictions."
     )
 
+    # Lookup from (split, compound_id, xtal_id, target_prop, loss_config json) to
+    #  indices in the corresponding split list, along with the split lists and their
+    #  lengths that the index was built against
+    _index: dict = PrivateAttr(default_factory=dict)
+    _index_lens: dict = PrivateAttr(default_factory=dict)
+    _index_lists: dict = PrivateAttr(default_factory=dict)
+
     class Config:
         # Allow things to be added to the object after initialization/validation
         extra = Extra.allow
@@ -202,6 +213,72 @@ class TrainingPredictionTracker(BaseModel):
             for sp, split_list in self.split_dict.items()
         }
 
+    @staticmethod
+    def _index_key(split, compound_id, xtal_id, target_prop, loss_config):
+        """
+        Build the key used to look up a TrainingPrediction in the index.
+        """
+        if not isinstance(loss_config, str):
+            loss_config = loss_config.json()
+        return (split, compound_id, xtal_id, target_prop, loss_config)
+
+    def _build_index(self):
+        """
+        (Re)build the lookup index from the current contents of self.split_dict.
+        """
+        self._index = {}
+        for sp, split_list in self.split_dict.items():
+            for i, tp in enumerate(split_list):
+                key = self._index_key(
+                    sp, tp.compound_id, tp.xtal_id, tp.target_prop, tp.loss_config
+                )
+                self._index.setdefault(key, []).append(i)
+        self._index_lens = {
+            sp: len(split_list) for sp, split_list in self.split_dict.items()
+        }
+        self._index_lists = dict(self.split_dict)
+
+    def _check_index(self):
+        """
+        Make sure the lookup index is in sync with self.split_dict, rebuilding it if
+        any split list has been replaced or resized outside of update_values. Changes to
+        the contents of a list are caught when the index is used (see
+        _index_lookup).
+        """
+        if (self._index_lists.keys() != self.split_dict.keys()) or any(
+            (self._index_lists[sp] is not split_list)
+            or (self._index_lens[sp] != len(split_list))
+            for sp, split_list in self.split_dict.items()
+        ):
+            self._build_index()
+
+    def _index_lookup(self, split, compound_id, xtal_id, target_prop, loss_config):
+        """
+        Look up the indices of a fully specified TrainingPrediction in one split,
+        checking that the stored entries still match and rebuilding the index if the
+        split list has been reordered or had entries replaced.
+        """
+        key = self._index_key(split, compound_id, xtal_id, target_prop, loss_config)
+        split_list = self.split_dict.get(split, [])
+        idxs = self._index.get(key, [])
+        if not all(
+            (i < len(split_list))
+            and (
+                self._index_key(
+                    split,
+                    split_list[i].compound_id,
+                    split_list[i].xtal_id,
+                    split_list[i].target_prop,
+                    split_list[i].loss_config,
+                )
+                == key
+            )
+            for i in idxs
+        ):
+            self._build_index()
+            idxs = self._index.get(key, [])
+        return list(idxs)
+
     def _find_value_idxs(
         self,
         split=None,
@@ -232,6 +309,18 @@ class TrainingPredictionTracker(BaseModel):
             Dict mapping split to indices in each split list
         """
 
+        # If all identifiers are given we can go straight to the index rather than
+        #  scanning every stored value
+        if None not in {compound_id, xtal_id, target_prop, loss_config}:
+            self._check_index()
+            search_splits = [split] if split else list(self.split_dict.keys())
+            return {sp: [] for sp in self.split_dict.keys()} | {
+                sp: self._index_lookup(
+                    sp, compound_id, xtal_id, target_prop, loss_config
+                )
+                for sp in search_splits
+            }
+
         # Match functions
         def compound_id_match(query):
             return (compound_id is None) or (query.compound_id == compound_id)
@@ -386,6 +475,9 @@ class TrainingPredictionTracker(BaseModel):
             )
             self.split_dict[split].append(new_pred)
 
+            # Keep the index in sync, as long as it was in sync before this addition
+            self._check_index_append(split, new_pred)
+
             return
 
         # Check that we've only got one, if necessary
@@ -406,6 +498,27 @@ class TrainingPredictionTracker(BaseModel):
                 split_list[i].pose_predictions.append(pose_predictions)
                 split_list[i].loss_vals.append(loss_val)
 
+    def _check_index_append(self, split, new_pred):
+        """
+        Add a newly appended TrainingPrediction to the index without rebuilding it.
+        """
+        new_len = len(self.split_dict[split])
+        if (self._index_lists.get(split) is not self.split_dict[split]) or (
+            self._index_lens.get(split) != new_len - 1
+        ):
+            # Index was already out of date, so it will be rebuilt on the next lookup
+            return
+
+        key = self._index_key(
+            split,
+            new_pred.compound_id,
+            new_pred.xtal_id,
+            new_pred.target_prop,
+            new_pred.loss_config,
+        )
+        self._index.setdefault(key, []).append(new_len - 1)
+        self._index_lens[split] = new_len
+
     def get_losses(self, agg_compounds=False, agg_losses=False):
         """
         Convenience function for extracting the per-epoch loss values across all
@@ -772,6 +885,180 @@ class TrainingPredictionTracker(BaseModel):
 
         return pandas.DataFrame(dict(use_vals))
 
+    def to_npz(self, fn):
+        """
+        Save the tracker to a compressed NumPy archive. Values are stored as flat
+        per-split columns rather than one JSON object per TrainingPrediction, which
+        is much smaller and faster to read/write than the JSON representation for
+        large datasets. The archive is written to a temporary file and then moved into
+        place, so an interrupted save never leaves a truncated file behind.
+
+        Parameters
+        ----------
+        fn : str | Path
+            File to save to
+        """
+        arrays = {}
+        all_loss_configs = {}
+        for sp, split_list in self.split_dict.items():
+            loss_config_jsons = [tp.loss_config.json() for tp in split_list]
+            for lc in loss_config_jsons:
+                all_loss_configs.setdefault(lc, len(all_loss_configs))
+
+            arrays[f"{sp}_compound_id"] = np.asarray(
+                [tp.compound_id for tp in split_list], dtype=str
+            )
+            arrays[f"{sp}_xtal_id"] = np.asarray(
+                [tp.xtal_id for tp in split_list], dtype=str
+            )
+            arrays[f"{sp}_target_prop"] = np.asarray(
+                [tp.target_prop for tp in split_list], dtype=str
+            )
+            arrays[f"{sp}_loss_config"] = np.asarray(
+                [all_loss_configs[lc] for lc in loss_config_jsons], dtype=int
+            )
+            arrays[f"{sp}_target_val"] = np.asarray(
+                [float(tp.target_val) for tp in split_list], dtype=float
+            )
+            # Use NaN to represent None for the optional values
+            arrays[f"{sp}_in_range"] = np.asarray(
+                [np.nan if tp.in_range is None else tp.in_range for tp in split_list],
+                dtype=float,
+            )
+            arrays[f"{sp}_uncertainty"] = np.asarray(
+                [
+                    np.nan if tp.uncertainty is None else tp.uncertainty
+                    for tp in split_list
+                ],
+                dtype=float,
+            )
+            arrays[f"{sp}_loss_weight"] = np.asarray(
+                [tp.loss_weight for tp in split_list], dtype=float
+            )
+
+            # Per-epoch values are flattened, with the number of epochs for each
+            #  TrainingPrediction stored so they can be split back up
+            arrays[f"{sp}_n_epochs"] = np.asarray(
+                [len(tp.predictions) for tp in split_list], dtype=int
+            )
+            arrays[f"{sp}_predictions"] = np.asarray(
+                [p for tp in split_list for p in tp.predictions], dtype=float
+            )
+            arrays[f"{sp}_n_loss_vals"] = np.asarray(
+                [len(tp.loss_vals) for tp in split_list], dtype=int
+            )
+            arrays[f"{sp}_loss_vals"] = np.asarray(
+                [v for tp in split_list for v in tp.loss_vals], dtype=float
+            )
+            arrays[f"{sp}_n_pose_epochs"] = np.asarray(
+                [len(tp.pose_predictions) for tp in split_list], dtype=int
+            )
+            arrays[f"{sp}_n_poses"] = np.asarray(
+                [len(pp) for tp in split_list for pp in tp.pose_predictions],
+                dtype=int,
+            )
+            arrays[f"{sp}_pose_predictions"] = np.asarray(
+                [p for tp in split_list for pp in tp.pose_predictions for p in pp],
+                dtype=float,
+            )
+
+        arrays["splits"] = np.asarray(list(self.split_dict.keys()), dtype=str)
+        arrays["loss_configs"] = np.asarray(list(all_loss_configs.keys()), dtype=str)
+
+        fn = Path(fn)
+        tmp_fn = fn.with_name(f"{fn.name}.tmp")
+        with tmp_fn.open("wb") as fp:
+            np.savez_compressed(fp, **arrays)
+        os.replace(tmp_fn, fn)
+
+    @classmethod
+    def from_npz(cls, fn):
+        """
+        Load a tracker that was saved using to_npz.
+
+        Parameters
+        ----------
+        fn : str | Path
+            File to load from
+
+        Returns
+        -------
+        cls
+            Loaded TrainingPredictionTracker
+        """
+
+        def split_flat(flat, lens):
+            # Split a flattened sequence back up into chunks of the given lengths
+            bounds = np.concatenate([[0], np.cumsum(lens)]).astype(int).tolist()
+            return [flat[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+        with np.load(fn) as arrays:
+            loss_configs = [
+                LossFunctionConfig(**json.loads(lc)) for lc in arrays["loss_configs"]
+            ]
+
+            split_dict = {}
+            for sp in arrays["splits"]:
+                sp = str(sp)
+                predictions = split_flat(
+                    arrays[f"{sp}_predictions"], arrays[f"{sp}_n_epochs"]
+                )
+                loss_vals = split_flat(
+                    arrays[f"{sp}_loss_vals"], arrays[f"{sp}_n_loss_vals"]
+                )
+                pose_predictions = split_flat(
+                    arrays[f"{sp}_pose_predictions"], arrays[f"{sp}_n_poses"]
+                )
+                pose_predictions = split_flat(
+                    [pp.tolist() for pp in pose_predictions],
+                    arrays[f"{sp}_n_pose_epochs"],
+                )
+
+                split_dict[sp] = [
+                    TrainingPrediction(
+                        compound_id=str(compound_id),
+                        xtal_id=str(xtal_id),
+                        target_prop=str(target_prop),
+                        target_val=float(target_val),
+                        in_range=None if np.isnan(in_range) else int(in_range),
+                        uncertainty=(
+                            None if np.isnan(uncertainty) else float(uncertainty)
+                        ),
+                        predictions=preds.tolist(),
+                        pose_predictions=pose_preds,
+                        loss_config=loss_configs[loss_config_idx],
+                        loss_vals=losses.tolist(),
+                        loss_weight=float(loss_weight),
+                    )
+                    for (
+                        compound_id,
+                        xtal_id,
+                        target_prop,
+                        target_val,
+                        in_range,
+                        uncertainty,
+                        preds,
+                        pose_preds,
+                        loss_config_idx,
+                        losses,
+                        loss_weight,
+                    ) in zip(
+                        arrays[f"{sp}_compound_id"],
+                        arrays[f"{sp}_xtal_id"],
+                        arrays[f"{sp}_target_prop"],
+                        arrays[f"{sp}_target_val"],
+                        arrays[f"{sp}_in_range"],
+                        arrays[f"{sp}_uncertainty"],
+                        predictions,
+                        pose_predictions,
+                        arrays[f"{sp}_loss_config"],
+                        loss_vals,
+                        arrays[f"{sp}_loss_weight"],
+                    )
+                ]
+
+        return cls(split_dict=split_dict)
+
     def to_loss_dict(self, allow_multiple=False, loss_config=None):
         """
         Method to convert a TrainingPredictionTracker to the old loss_dict method of
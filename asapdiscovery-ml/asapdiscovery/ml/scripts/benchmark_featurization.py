@@ -0,0 +1,64 @@
+"""
+Benchmark DockedDataset featurization over a set of complex PDB files, comparing
+serial featurization against featurization over a process pool.
+"""
+
+import time
+from glob import glob
+from pathlib import Path
+
+import click
+from asapdiscovery.ml.dataset import DockedDataset, _load_complexes
+
+
+@click.command()
+@click.option(
+    "-i",
+    "--structures",
+    required=True,
+    help="Glob or directory containing complex PDB files.",
+)
+@click.option(
+    "-n",
+    "--n-complexes",
+    type=int,
+    default=10000,
+    help="Number of complexes to featurize. Files are reused if there are fewer.",
+)
+@click.option(
+    "-w",
+    "--num-workers",
+    type=int,
+    default=8,
+    help="Number of processes for the parallel run.",
+)
+def main(structures: str, n_complexes: int = 10000, num_workers: int = 8):
+    if Path(structures).is_dir():
+        str_fns = sorted(glob(f"{structures}/*.pdb"))
+    else:
+        str_fns = sorted(glob(structures))
+    if len(str_fns) == 0:
+        raise FileNotFoundError(f"No PDB files found for {structures}")
+
+    # Load each file once and then repeat the Complexes to the requested size
+    complexes = _load_complexes(
+        str_fns, [(Path(fn).stem, Path(fn).stem) for fn in str_fns], num_workers
+    )
+    complexes = [complexes[i % len(complexes)] for i in range(n_complexes)]
+    print(f"Featurizing {len(complexes)} complexes", flush=True)
+
+    for n in sorted({1, num_workers}):
+        start = time.perf_counter()
+        ds = DockedDataset.from_complexes(complexes, num_workers=n)
+        elapsed = time.perf_counter() - start
+        n_atoms = sum(len(pose["z"]) for _, pose in ds)
+        print(
+            f"num_workers={n}: {elapsed:.2f} s total, "
+            f"{1000 * elapsed / len(ds):.3f} ms/complex, "
+            f"{n_atoms / len(ds):.0f} atoms/complex",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark loading a model (ensemble) in several processes at once, comparing the
+default torch.load path against memory-mapped weights. Reports the start-up time in
+each process and the proportional set size (PSS, which splits shared pages between
+the processes sharing them) summed over all processes.
+"""
+
+import multiprocessing as mp
+import time
+from pathlib import Path
+
+import click
+import psutil
+from asapdiscovery.ml.inference import get_inference_cls_from_model_type
+from asapdiscovery.ml.models import ASAPMLModelRegistry
+
+
+def _load_model(model_name, local_dir, mmap_weights, barrier, results):
+    model_spec = ASAPMLModelRegistry.get_model(model_name)
+    inference_cls = get_inference_cls_from_model_type(model_spec.type)
+
+    start = time.perf_counter()
+    inference = inference_cls.from_ml_model_spec(
+        model_spec, local_dir=local_dir, mmap_weights=mmap_weights
+    )
+    elapsed = time.perf_counter() - start
+
+    # Touch every parameter so all weights are actually paged in
+    n_params = sum(p.numel() for m in inference.models for p in m.parameters())
+    _ = sum(float(p.sum()) for m in inference.models for p in m.parameters())
+
+    # Wait until every process has loaded, so the memory is measured while all the
+    #  copies are alive at once
+    barrier.wait()
+    pss = psutil.Process().memory_full_info().pss
+    results.put((elapsed, pss, n_params))
+    barrier.wait()
+
+
+@click.command()
+@click.option(
+    "-m",
+    "--model-name",
+    required=True,
+    help="Name of the model in the ASAP model registry.",
+)
+@click.option(
+    "-d",
+    "--local-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=Path("./_model_cache"),
+    help="Directory to download the model files to.",
+)
+@click.option(
+    "-n",
+    "--n-procs",
+    type=int,
+    default=8,
+    help="Number of processes to load the model in at once.",
+)
+def main(model_name: str, local_dir: Path = Path("./_model_cache"), n_procs: int = 8):
+    # Download once up front so the timings don't include the download
+    ASAPMLModelRegistry.get_model(model_name).pull(local_dir=local_dir)
+
+    ctx = mp.get_context("spawn")
+    for mmap_weights in [False, True]:
+        barrier = ctx.Barrier(n_procs)
+        results = ctx.Queue()
+        procs = [
+            ctx.Process(
+                target=_load_model,
+                args=(model_name, local_dir, mmap_weights, barrier, results),
+            )
+            for _ in range(n_procs)
+        ]
+        for p in procs:
+            p.start()
+        all_results = [results.get() for _ in range(n_procs)]
+        for p in procs:
+            p.join()
+
+        load_times, pss, n_params = zip(*all_results)
+        print(
+            f"mmap_weights={mmap_weights}: "
+            f"{sum(load_times) / n_procs:.3f} s mean start-up, "
+            f"{max(load_times):.3f} s max start-up, "
+            f"{sum(pss) / 2**20:.1f} MiB total PSS over {n_procs} processes "
+            f"({n_params[0]} parameters per process)",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
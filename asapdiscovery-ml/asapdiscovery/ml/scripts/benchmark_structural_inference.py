@@ -0,0 +1,109 @@
+"""
+Benchmark batched structural inference (StructuralInference.predict_from_complexes)
+against the per-pose path (featurize each complex, then run every model on it).
+"""
+
+import time
+from pathlib import Path
+
+import click
+import numpy as np
+from asapdiscovery.data.schema.complex import Complex
+from asapdiscovery.ml.dataset import DockedDataset, fix_e3nn_pose
+from asapdiscovery.ml.inference import E3nnInference, SchnetInference
+
+
+@click.command()
+@click.option(
+    "-i",
+    "--structure",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Complex PDB file. The ligand is re-used for each pose.",
+)
+@click.option(
+    "-t",
+    "--target",
+    default="SARS-CoV-2-Mpro",
+    help="Target to load the latest model for.",
+)
+@click.option(
+    "-m",
+    "--model-type",
+    type=click.Choice(["schnet", "e3nn"]),
+    default="schnet",
+    help="Type of model to benchmark.",
+)
+@click.option(
+    "-n",
+    "--n-poses",
+    type=int,
+    default=1000,
+    help="Number of poses to predict on.",
+)
+@click.option(
+    "-b",
+    "--batch-size",
+    type=int,
+    default=256,
+    help="Batch size for the batched run.",
+)
+def main(
+    structure: Path,
+    target: str = "SARS-CoV-2-Mpro",
+    model_type: str = "schnet",
+    n_poses: int = 1000,
+    batch_size: int = 256,
+):
+    if model_type == "e3nn":
+        inference_cls = E3nnInference.from_latest_by_target(target)
+    else:
+        inference_cls = SchnetInference.from_latest_by_target(target)
+    for_e3nn = model_type == "e3nn"
+
+    comp = Complex.from_pdb(
+        structure,
+        target_kwargs={"target_name": "pose"},
+        ligand_kwargs={"compound_name": "pose"},
+    )
+    complexes = [comp] * n_poses
+    print(
+        f"Predicting on {n_poses} poses with {len(inference_cls.models)} model(s)",
+        flush=True,
+    )
+
+    # Per-pose path
+    start = time.perf_counter()
+    per_pose_preds = []
+    for c in complexes:
+        pose = DockedDataset._complex_to_pose(c)
+        if for_e3nn:
+            pose = fix_e3nn_pose(pose)
+        per_pose_preds.append(np.asarray(inference_cls.predict(pose)).item())
+    per_pose_elapsed = time.perf_counter() - start
+
+    # Batched path
+    start = time.perf_counter()
+    batched_preds = inference_cls.predict_from_complexes(
+        complexes, batch_size=batch_size
+    )
+    batched_elapsed = time.perf_counter() - start
+
+    for label, elapsed in [
+        ("per-pose", per_pose_elapsed),
+        (f"batched (batch_size={batch_size})", batched_elapsed),
+    ]:
+        print(
+            f"{label}: {elapsed:.2f} s total, {1000 * elapsed / n_poses:.3f} ms/pose",
+            flush=True,
+        )
+    print(f"Speedup: {per_pose_elapsed / batched_elapsed:.2f}x", flush=True)
+    print(
+        "Max abs difference: "
+        f"{np.abs(np.asarray(per_pose_preds) - batched_preds).max():.3e}",
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
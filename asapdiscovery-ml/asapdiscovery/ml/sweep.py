@@ -1,11 +1,18 @@
+import hashlib
 from functools import partial
 from pathlib import Path
 
 import wandb
 import yaml
+from asapdiscovery.ml.config import DatasetSplitterType
 from asapdiscovery.ml.trainer import Trainer
 from pydantic import Field, validator
 
+# Process-resident cache of the most recently built dataset (and splits), so that
+#  consecutive trials in the same process that don't change the dataset configs don't
+#  need to rebuild it. Maps "ds" and "splits" to (config hash, value)
+_DS_CACHE = {}
+
 
 class Sweeper(Trainer):
     """
@@ -33,6 +40,14 @@ class Sweeper(Trainer):
         False, description="Start a new sweep even if an existing sweep_id is present."
     )
 
+    trials_per_process: int = Field(
+        1,
+        description=(
+            "Number of sweep trials to run in this process. Trials that use the same "
+            "dataset config reuse the already built dataset."
+        ),
+    )
+
     @validator("sweep_config", pre=True)
     def load_config(cls, v):
         """
@@ -78,9 +93,50 @@ class Sweeper(Trainer):
             sweep_id,
             function=sweep_func,
             project=self.wandb_project,
-            count=1,
+            count=self.trials_per_process,
         )
 
+    def _build_ds_and_splits(self):
+        """
+        Overload the Trainer method to reuse the dataset and splits from the previous
+        trial in this process if the relevant configs haven't changed. Splits are only
+        reused if they are deterministic (ie not a random split without a seed).
+        """
+        # input_data can hold every Complex in the dataset, so leave it out of the
+        #  hash. Every trial's input_data comes from the same base Sweeper, which a sweep
+        #  can't change, so the number of inputs is enough to tell them apart
+        ds_hash = hashlib.sha256(
+            (
+                self.ds_config.json(exclude={"input_data"})
+                + str(len(self.ds_config.input_data))
+            ).encode()
+        ).hexdigest()
+        splits_hash = hashlib.sha256(
+            (ds_hash + self.ds_splitter_config.json()).encode()
+        ).hexdigest()
+        splits_deterministic = not (
+            self.ds_splitter_config.split_type == DatasetSplitterType.random
+            and self.ds_splitter_config.rand_seed is None
+        )
+
+        cached_ds_hash, ds = _DS_CACHE.get("ds", (None, None))
+        if cached_ds_hash == ds_hash:
+            print("Reusing dataset from previous trial", flush=True)
+        else:
+            ds = self.ds_config.build()
+            _DS_CACHE.clear()
+            _DS_CACHE["ds"] = (ds_hash, ds)
+
+        cached_splits_hash, splits = _DS_CACHE.get("splits", (None, None))
+        if splits_deterministic and (cached_splits_hash == splits_hash):
+            print("Reusing dataset splits from previous trial", flush=True)
+        else:
+            splits = self.ds_splitter_config.split(ds)
+            if splits_deterministic:
+                _DS_CACHE["splits"] = (splits_hash, splits)
+
+        return ds, splits
+
     def _update_from_wandb_config(self):
         """
         Parse the W&B sweep config and update the internal config objects appropriately.
@@ -128,7 +184,8 @@ class Sweeper(Trainer):
 
         1. Parsing the config determined by the W&B sweep
         2. Updating the underlying Trainer configs with these parameters
-        3. Running training
+        3. Running training, resuming from the last saved epoch if this run was
+           previously preempted
 
         Parameters
         ----------
@@ -139,25 +196,45 @@ class Sweeper(Trainer):
         # Get config from sweep agent
         run_id = wandb.init().id
 
-        # Update output_dir to avoid overwriting stuff
-        sweeper.output_dir = sweeper.output_dir / run_id
+        # Let the sweep controller know this run can be requeued if the process is
+        #  killed, in which case it will come back with the same run id
+        wandb.mark_preempting()
 
-        # Update internal configs from sweep config
+        # Update internal configs from sweep config. This creates a new object, so
+        #  the original sweeper is left untouched for any later trials in this process
+        base_output_dir = sweeper.output_dir
         sweeper = sweeper._update_from_wandb_config()
 
+        # Update output_dir to avoid overwriting stuff
+        sweeper.output_dir = base_output_dir / run_id
+
+        # If this run already saved some epochs before being preempted, continue from
+        #  there
+        if (
+            (sweeper.output_dir / "optimizer.th").exists()
+            and (
+                (sweeper.output_dir / "pred_tracker.npz").exists()
+                or (sweeper.output_dir / "pred_tracker.json").exists()
+            )
+            and sweeper.save_weights in {"all", "recent"}
+        ):
+            print(f"Resuming preempted run {run_id}", flush=True)
+            sweeper.cont = True
+
         # Update W&B config to include everything from all the Trainer configs
         # Don't serialize input_data for confidentiality/size reasons
         ds_config = sweeper.ds_config.dict()
         del ds_config["input_data"]
         config = sweeper.dict()
         config["ds_config"] = ds_config
-        wandb.config.update(config)
+        wandb.config.update(config, allow_val_change=sweeper.cont)
 
         # Get Trainer config dict (before initialization so we don't have extra stuff)
         trainer_config_dict = sweeper.dict()
         # Get rid of Sweeper-specific args
         del trainer_config_dict["sweep_config"]
         del trainer_config_dict["force_new_sweep"]
+        del trainer_config_dict["trials_per_process"]
 
         # Temporarily un-set use_wandb flag to avoid confusing the initialize method
         sweeper.use_wandb = False
@@ -178,3 +255,6 @@ class Sweeper(Trainer):
 
         # Finally run training
         sweeper.train()
+
+        # Finish this run so the next trial in this process starts a new one
+        wandb.finish()
@@ -0,0 +1,51 @@
+import pytest
+import torch
+from asapdiscovery.ml.config import DataAugConfig
+
+
+@pytest.fixture()
+def pose():
+    return {
+        "pos": torch.zeros((10, 3)),
+        "z": torch.ones(10, dtype=torch.long),
+        "other": ["not", "a", "tensor"],
+    }
+
+
+def test_jitter_fixed_dict_not_modified(pose):
+    jitter = DataAugConfig(aug_type="jitter_fixed", jitter_rand_seed=42).build()
+
+    aug_pose = jitter(pose)
+
+    # Input is untouched, non-jittered values are shared rather than copied
+    assert (pose["pos"] == 0).all()
+    assert not (aug_pose["pos"] == 0).all()
+    assert aug_pose["z"] is pose["z"]
+    assert aug_pose["other"] is pose["other"]
+
+
+def test_jitter_fixed_inplace(pose):
+    jitter = DataAugConfig(aug_type="jitter_fixed", jitter_rand_seed=42).build()
+
+    aug_pose = jitter(pose, inplace=True)
+
+    assert aug_pose is pose
+    assert not (pose["pos"] == 0).all()
+
+
+def test_jitter_fixed_seed_idx(pose):
+    jitter = DataAugConfig(aug_type="jitter_fixed", jitter_rand_seed=42).build()
+
+    # Same (epoch, index) gives the same noise, regardless of call order
+    aug1 = jitter(pose, seed_idx=(0, 1))
+    _ = jitter(pose, seed_idx=(0, 2))
+    aug2 = jitter(pose, seed_idx=(0, 1))
+    assert torch.equal(aug1["pos"], aug2["pos"])
+
+    # Different epoch gives different noise
+    aug3 = jitter(pose, seed_idx=(1, 1))
+    assert not torch.equal(aug1["pos"], aug3["pos"])
+
+    # Same indices with a new object with the same seed gives the same noise
+    jitter2 = DataAugConfig(aug_type="jitter_fixed", jitter_rand_seed=42).build()
+    assert torch.equal(aug1["pos"], jitter2(pose, seed_idx=(0, 1))["pos"])
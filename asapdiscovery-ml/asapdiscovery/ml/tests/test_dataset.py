@@ -1,9 +1,19 @@
+import numpy as np
 import pytest
+import torch
 from asapdiscovery.data.schema.complex import Complex
 from asapdiscovery.data.schema.experimental import ExperimentalCompoundData
 from asapdiscovery.data.schema.ligand import Ligand
 from asapdiscovery.data.testing.test_resources import fetch_test_file
-from asapdiscovery.ml.dataset import DockedDataset, GraphDataset, GroupedDockedDataset
+from asapdiscovery.ml.dataset import (
+    DockedDataset,
+    GraphCache,
+    GraphDataset,
+    GroupedDockedDataset,
+    PocketCropper,
+    _featurize_smiles,
+    limit_compound_poses,
+)
 
 
 @pytest.fixture(scope="session")
@@ -66,6 +76,66 @@ def test_docked_dataset_from_files(complex_pdb):
     assert pose["pos"].shape[0] > 0
 
 
+def test_docked_dataset_from_complexes_parallel(complex_pdb):
+    complexes = [
+        Complex.from_pdb(
+            complex_pdb,
+            target_kwargs={"target_name": f"test{i}"},
+            ligand_kwargs={"compound_name": f"test{i}"},
+        )
+        for i in range(3)
+    ]
+
+    dd_serial = DockedDataset.from_complexes(complexes)
+    dd_parallel = DockedDataset.from_complexes(complexes, num_workers=2)
+
+    assert len(dd_serial) == len(dd_parallel) == 3
+    for (c1, p1), (c2, p2) in zip(dd_serial, dd_parallel):
+        assert c1 == c2
+        for k in ["pos", "z", "lig", "b"]:
+            assert (p1[k] == p2[k]).all()
+        # hydrogens are dropped before any tensors are built
+        assert (p1["z"] != 1).all()
+        assert "x" not in p1
+
+
+def test_docked_dataset_pocket_cropper(complex_pdb):
+    c1 = Complex.from_pdb(
+        complex_pdb,
+        target_kwargs={"target_name": "test1"},
+        ligand_kwargs={"compound_name": "test1"},
+    )
+    c2 = Complex.from_pdb(
+        complex_pdb,
+        target_kwargs={"target_name": "test2"},
+        ligand_kwargs={"compound_name": "test2"},
+    )
+
+    dd_full = DockedDataset.from_complexes([c1, c2])
+    cropper = PocketCropper(radius=10.0)
+    dd = DockedDataset.from_complexes([c1, c2], pocket_cropper=cropper)
+
+    for (_, pose_full), (_, pose) in zip(dd_full, dd):
+        # All ligand atoms are kept, and only receptor atoms are removed
+        assert pose["lig"].sum() == pose_full["lig"].sum()
+        assert len(pose["pos"]) < len(pose_full["pos"])
+        assert torch.equal(pose["pos"][pose["lig"]], pose_full["pos"][pose_full["lig"]])
+
+        # All kept receptor atoms are within the radius of the site
+        center = torch.tensor(
+            cropper.site_key(pose["pos"][pose["lig"]].numpy()), dtype=torch.float32
+        )
+        dists = (pose["pos"][~pose["lig"]] - center).norm(dim=1)
+        assert (dists <= 10.0 + 1e-4).all()
+
+    # Same receptor and ligand, so both complexes share one cropped pocket
+    stats = cropper.stats()
+    assert stats["n_samples"] == 2
+    assert stats["n_sites"] == 1
+    assert stats["atoms_per_sample_after"] == len(dd[0][1]["pos"])
+    assert 0 < stats["reduction"] < 1
+
+
 def test_grouped_docked_dataset_from_complexes(complex_pdb):
     c1 = Complex.from_pdb(
         complex_pdb,
@@ -97,6 +167,45 @@ def test_grouped_docked_dataset_from_complexes(complex_pdb):
     assert pose["pos"].shape[0] > 0
 
 
+def test_grouped_docked_dataset_sharded(complex_pdb, tmp_path):
+    complexes = [
+        Complex.from_pdb(
+            complex_pdb,
+            target_kwargs={"target_name": f"test{i}"},
+            ligand_kwargs={"compound_name": cpd},
+        )
+        for i, cpd in enumerate(["test_a", "test_a", "test_b"])
+    ]
+
+    ds = GroupedDockedDataset.from_complexes(
+        complexes, shard_dir=tmp_path / "shards", cache_size=1, max_poses=1
+    )
+
+    assert len(ds) == 2
+    assert (tmp_path / "shards" / "index.json").exists()
+    assert ds.structures.metadata["test_a"]["n_poses"] == 2
+
+    compound_id, pose_list = ds[0]
+    assert compound_id == "test_a"
+    # capped by max_poses
+    assert len(pose_list["poses"]) == 1
+    assert pose_list["poses"][0]["compound"] == ("test0", "test_a")
+
+    compound_id, pose_list = ds["test_b"]
+    assert len(pose_list["poses"]) == 1
+    # only one compound is kept in memory
+    assert list(ds.structures._cache.keys()) == ["test_b"]
+
+    # round trip through to_shards matches the in-memory version
+    ds_mem = GroupedDockedDataset.from_complexes(complexes)
+    ds_mem.to_shards(tmp_path / "shards_2")
+    ds_loaded = GroupedDockedDataset.from_shards(tmp_path / "shards_2")
+    for (c1, d1), (c2, d2) in zip(ds_mem, ds_loaded):
+        assert c1 == c2
+        assert len(d1["poses"]) == len(d2["poses"])
+        assert (d1["poses"][0]["pos"] == d2["poses"][0]["pos"]).all()
+
+
 def test_grouped_docked_dataset_from_files(complex_pdb):
     ds = GroupedDockedDataset.from_files(
         str_fns=[complex_pdb, complex_pdb],
@@ -169,3 +278,120 @@ def test_graph_dataset_from_exp_compounds(ligand_sdf, tmp_path):
     assert pose["pIC50"] == 5.1
     assert pose["pIC50_range"] == 0
     assert pose["pIC50_stderr"] == 0.3
+
+
+def test_graph_dataset_graph_cache(ligand_sdf, tmp_path):
+    from dgllife.utils import CanonicalAtomFeaturizer
+
+    lig1 = Ligand.from_sdf(ligand_sdf, compound_name="test1")
+    lig2 = Ligand.from_sdf(ligand_sdf, compound_name="test2")
+
+    ref_ds = GraphDataset.from_ligands(
+        [lig1, lig2], node_featurizer=CanonicalAtomFeaturizer()
+    )
+
+    cache = GraphCache(tmp_path / "graphs", node_featurizer=CanonicalAtomFeaturizer())
+    ds = GraphDataset.from_ligands(
+        [lig1, lig2], node_featurizer=CanonicalAtomFeaturizer(), graph_cache=cache
+    )
+    # Same SMILES, so only the first one should need featurizing
+    assert cache.stats() | {"hit_rate": None} == {
+        "hits": 1,
+        "misses": 1,
+        "hit_rate": None,
+        "n_cached": 1,
+    }
+
+    # New cache object loading from disk should only get hits
+    cache = GraphCache(tmp_path / "graphs", node_featurizer=CanonicalAtomFeaturizer())
+    cached_ds = GraphDataset.from_ligands(
+        [lig1, lig2], node_featurizer=CanonicalAtomFeaturizer(), graph_cache=cache
+    )
+    assert cache.hits == 2
+    assert cache.misses == 0
+    assert cache.hit_rate == 1.0
+
+    for (_, ref_pose), (_, pose), (_, cached_pose) in zip(ref_ds, ds, cached_ds):
+        assert torch.equal(ref_pose["g"].ndata["h"], pose["g"].ndata["h"])
+        assert torch.equal(ref_pose["g"].ndata["h"], cached_pose["g"].ndata["h"])
+
+    # Different featurizer should use a separate cache
+    cache = GraphCache(tmp_path / "graphs")
+    assert len(cache) == 0
+
+
+def test_graph_cache_non_canonical_smiles(tmp_path):
+    from dgllife.utils import CanonicalAtomFeaturizer
+
+    # Same molecule written with a different atom order
+    smiles_list = ["OCc1ccccc1", "c1ccc(CO)cc1"]
+    ref_graphs = _featurize_smiles(
+        smiles_list, node_featurizer=CanonicalAtomFeaturizer()
+    )
+    cached_graphs = _featurize_smiles(
+        smiles_list,
+        node_featurizer=CanonicalAtomFeaturizer(),
+        graph_cache=tmp_path / "graphs",
+    )
+
+    # Graphs should be the same with and without the cache, whichever SMILES is used
+    for ref_g, cached_g in zip(ref_graphs, cached_graphs):
+        assert torch.equal(ref_g.ndata["h"], ref_graphs[0].ndata["h"])
+        assert torch.equal(ref_g.ndata["h"], cached_g.ndata["h"])
+
+
+def test_limit_compound_poses():
+    poses = [{"ref_rmsd": rmsd} for rmsd in [3.0, 2.0, 1.0]]
+    data = GroupedDockedDataset._build_compound_data(
+        [pose | {"xtal_ligand": None} for pose in poses]
+    )
+    assert data["best_pose_label"].tolist() == [0, 0, 1]
+
+    limited = limit_compound_poses(data, 2)
+    assert len(limited["poses"]) == 2
+    # the best pose was dropped, so the best of the remaining poses is labelled
+    assert limited["best_pose_label"].tolist() == [0, 1]
+    assert limited["rmsd_probs"].sum() == pytest.approx(1)
+    np.testing.assert_allclose(limited["rmsd_probs"], [0.4, 0.6])
+    # the original data is not modified
+    assert len(data["poses"]) == 3
+
+
+def _fill_graph_cache(cache_dir, smiles_list):
+    from dgllife.utils import CanonicalAtomFeaturizer
+
+    cache = GraphCache(cache_dir, node_featurizer=CanonicalAtomFeaturizer())
+    # One chunk per SMILES, to give the two processes plenty of chances to collide
+    for smi in smiles_list:
+        cache.get_graphs([smi])
+
+
+def test_graph_cache_two_processes(tmp_path):
+    import multiprocessing as mp
+
+    from dgllife.utils import CanonicalAtomFeaturizer
+
+    smiles_lists = [
+        ["C" * n for n in range(1, 11)],
+        ["C" * n + "O" for n in range(1, 11)],
+    ]
+    ctx = mp.get_context("spawn")
+    procs = [
+        ctx.Process(target=_fill_graph_cache, args=(tmp_path / "graphs", smiles_list))
+        for smiles_list in smiles_lists
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert all(p.exitcode == 0 for p in procs)
+
+    # Both processes' graphs should be in the index, and each SMILES should point to
+    #  its own graph
+    cache = GraphCache(tmp_path / "graphs", node_featurizer=CanonicalAtomFeaturizer())
+    all_smiles = smiles_lists[0] + smiles_lists[1]
+    assert len(cache) == len(all_smiles)
+    graphs = cache.get_graphs(all_smiles)
+    assert cache.misses == 0
+    for smi, g in zip(all_smiles, graphs):
+        assert g.num_nodes() == len(smi)
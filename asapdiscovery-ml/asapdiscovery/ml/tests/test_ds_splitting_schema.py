@@ -3,6 +3,7 @@ from asapdiscovery.data.schema.complex import Complex
 from asapdiscovery.data.schema.ligand import Ligand
 from asapdiscovery.data.testing.test_resources import fetch_test_file
 from asapdiscovery.ml.config import DatasetConfig, DatasetSplitterConfig, DatasetType
+from asapdiscovery.ml.dataset import DockedDataset
 
 
 @pytest.fixture(scope="session")
@@ -89,3 +90,64 @@ def test_manual_split_graph_dataset(ligand_sdf):
     assert compound == ("NA", "test2")
     compound, _ = next(iter(ds_test))
     assert compound == ("NA", "test3")
+
+
+@pytest.fixture()
+def dated_docked_dataset():
+    # Lightweight dataset with 2 structures per compound and one date per compound,
+    #  with the compounds out of date order. No pose data is needed for splitting
+    compounds = {}
+    structures = []
+    for i, day in enumerate([5, 3, 9, 1, 7, 2, 8, 4, 10, 6]):
+        for xtal_id in ["xtal1", "xtal2"]:
+            compound = (xtal_id, f"compound_{day}")
+            compounds[compound] = [len(structures)]
+            structures.append(
+                {"compound": compound, "date_created": f"2024-01-{day:02d}"}
+            )
+
+    return DockedDataset(compounds, structures)
+
+
+def test_temporal_split_uses_index(dated_docked_dataset):
+    ds_splitter = DatasetSplitterConfig(
+        split_type="temporal", train_frac=0.8, val_frac=0.1, test_frac=0.1
+    )
+
+    ds_train, ds_val, ds_test = ds_splitter.split(dated_docked_dataset)
+
+    compound_ids = [
+        {compound[1] for compound, _ in subset}
+        for subset in [ds_train, ds_val, ds_test]
+    ]
+    assert compound_ids[0] == {f"compound_{day}" for day in range(1, 9)}
+    assert compound_ids[1] == {"compound_9"}
+    assert compound_ids[2] == {"compound_10"}
+
+
+def test_random_split_keeps_compounds_together(dated_docked_dataset):
+    ds_splitter = DatasetSplitterConfig(
+        split_type="random", train_frac=0.6, val_frac=0.2, test_frac=0.2, rand_seed=42
+    )
+
+    splits = ds_splitter.split(dated_docked_dataset)
+    compound_ids = [{compound[1] for compound, _ in subset} for subset in splits]
+
+    # All structures are used, and no compound is in more than one split
+    assert sum(len(subset) for subset in splits) == len(dated_docked_dataset)
+    assert sum(len(c) for c in compound_ids) == len(set.union(*compound_ids)) == 10
+    assert [len(subset) for subset in splits] == [12, 4, 4]
+
+    # Same seed gives the same split
+    splits2 = ds_splitter.split(dated_docked_dataset)
+    assert [subset.indices for subset in splits] == [
+        subset.indices for subset in splits2
+    ]
+
+
+def test_make_subsets():
+    idx_lists = [[0, 1], [2], [3, 4, 5], [6], [7]]
+    subsets = DatasetSplitterConfig._make_subsets(None, idx_lists, [3, 3, 1])
+
+    # Last split stops once it has enough items, leaving out the final group
+    assert [subset.indices for subset in subsets] == [[0, 1, 2], [3, 4, 5], [6]]
@@ -3,7 +3,9 @@ import mtenn
 import numpy as np
 import pytest
 import torch
-from asapdiscovery.data.backend.openeye import load_openeye_pdb
+from asapdiscovery.data.backend.openeye import load_openeye_pdb, oechem
+from asapdiscovery.data.schema.complex import Complex
+from asapdiscovery.data.schema.ligand import Ligand
 from asapdiscovery.data.testing.test_resources import fetch_test_file
 from asapdiscovery.ml.inference import E3nnInference, GATInference, SchnetInference
 from numpy.testing import assert_allclose
@@ -226,6 +228,29 @@ def test_schnet_inference_weights(tmp_path):
     assert len(param_mismatches) == 0, param_mismatches
 
 
+def test_schnet_inference_mmap_weights(tmp_path, docked_structure_file):
+    inference_cls = SchnetInference.from_model_name(
+        "asapdiscovery-SARS-CoV-2-Mpro-schnet-2024.02.05", local_dir=tmp_path
+    )
+    mmap_inference_cls = SchnetInference.from_model_name(
+        "asapdiscovery-SARS-CoV-2-Mpro-schnet-2024.02.05",
+        local_dir=tmp_path,
+        mmap_weights=True,
+    )
+
+    # Same parameters, but loaded without copying
+    for model, mmap_model in zip(inference_cls.models, mmap_inference_cls.models):
+        params = dict(model.named_parameters())
+        for k, mmap_param in mmap_model.named_parameters():
+            assert torch.equal(mmap_param, params[k]), k
+
+    assert_allclose(
+        mmap_inference_cls.predict_from_structure_file(docked_structure_file),
+        inference_cls.predict_from_structure_file(docked_structure_file),
+        rtol=1e-6,
+    )
+
+
 def test_schnet_inference_predict_from_structure_file(docked_structure_file):
     inference_cls = SchnetInference.from_latest_by_target("SARS-CoV-2-Mpro")
     assert inference_cls is not None
@@ -318,3 +343,39 @@ def test_e3nn_predict_from_structure_file_err_multi(docked_structure_file):
     assert len(err.shape) == 1
     np.all(np.isclose(pred, pred[0]))
     np.all(np.isclose(err, err[0]))
+
+
+@pytest.mark.parametrize("inference_cls", [SchnetInference, E3nnInference])
+def test_structural_inference_batched_matches_per_pose(
+    inference_cls, docked_structure_file
+):
+    inference_cls = inference_cls.from_latest_by_target("SARS-CoV-2-Mpro")
+    for_e3nn = inference_cls.model_type == "e3nn"
+
+    comp = Complex.from_pdb(
+        docked_structure_file,
+        target_kwargs={"target_name": "pose"},
+        ligand_kwargs={"compound_name": "pose"},
+    )
+    # Shift one of the ligands so the poses aren't all identical
+    lig_mol = comp.ligand.to_oemol()
+    oechem.OETranslate(lig_mol, oechem.OEDoubleArray([0.5, 0.0, 0.0]))
+    shifted = comp.copy(update={"ligand": Ligand.from_oemol(lig_mol)})
+    complexes = [comp, shifted, comp]
+
+    ref_preds = []
+    ref_errs = []
+    for c in complexes:
+        pose = asapdiscovery.ml.dataset.DockedDataset._complex_to_pose(c)
+        if for_e3nn:
+            pose = asapdiscovery.ml.dataset.fix_e3nn_pose(pose)
+        pred, err = inference_cls.predict(pose, return_err=True)
+        ref_preds.append(np.asarray(pred).item())
+        ref_errs.append(np.asarray(err).item())
+
+    # Small batch size to make sure batches are stitched back together correctly
+    pred, err = inference_cls.predict_from_complexes(
+        complexes, return_err=True, batch_size=2
+    )
+    assert_allclose(pred, ref_preds, rtol=1e-5)
+    assert_allclose(err, ref_errs, rtol=1e-5)
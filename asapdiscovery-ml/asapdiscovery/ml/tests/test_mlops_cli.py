@@ -3,6 +3,7 @@ import traceback
 from unittest.mock import Mock, patch
 
 import pandas as pd
+import pytest
 from asapdiscovery.data.testing.test_resources import fetch_test_file
 from asapdiscovery.ml.cli_mlops import mlops as cli
 from click.testing import CliRunner
@@ -23,7 +24,10 @@ def mock_gather_and_clean_data(*args, **kwargs) -> pd.DataFrame:
 @patch("asapdiscovery.ml.cli_mlops._gather_and_clean_data", mock_gather_and_clean_data)
 @patch("asapdiscovery.data.services.aws.s3.S3.push_file", Mock(return_value=None))
 @patch("asapdiscovery.data.services.aws.s3.S3.push_dir", Mock(return_value=None))
-def test_mlops_run(tmp_path):
+@pytest.mark.parametrize(
+    "ensemble_size,max_workers", [(1, None), (2, 2)], ids=["serial", "parallel"]
+)
+def test_mlops_run(tmp_path, ensemble_size, max_workers):
 
     runner = CliRunner()
     # mock AWS credentials
@@ -41,19 +45,22 @@ def test_mlops_run(tmp_path):
     os.environ["CDD_API_KEY"] = "dummy"
     os.environ["CDD_VAULT_NUMBER"] = "1"
 
-    result = runner.invoke(
-        cli,
-        [
-            "train-gat-for-endpoint",
-            "-p",
-            "in-vitro_LogD_bienta",  # dummy data is for LogD
-            "-n",
-            1,  # 1 epoch
-            "-e",
-            1,  # 1 ensemble member
-            "-o",
-            tmp_path,
-        ],
-    )
+    args = [
+        "train-gat-for-endpoint",
+        "-p",
+        "in-vitro_LogD_bienta",  # dummy data is for LogD
+        "-n",
+        1,  # 1 epoch
+        "-e",
+        ensemble_size,
+        "-o",
+        tmp_path,
+    ]
+    if max_workers:
+        args += ["--max-workers", max_workers]
+    result = runner.invoke(cli, args)
 
     assert click_success(result)
+
+    # Dataset should only have been featurized once
+    assert len(list(tmp_path.rglob("gat_ds_cache.pkl"))) == 1
@@ -117,6 +117,70 @@ def test_training_pred_tracker_json_roundtrip(identifiers, loss_configs):
         assert getattr(tp_roundtrip, k) == v
 
 
+def test_training_pred_tracker_npz_roundtrip(identifiers, loss_configs, tmp_path):
+    tp1 = TrainingPrediction(
+        **identifiers[0],
+        loss_config=loss_configs[0],
+        predictions=[1.0, 2.0],
+        pose_predictions=[[1.0, 1.5], [2.0]],
+        loss_vals=[0.5, 0.25],
+    )
+    tp2 = TrainingPrediction(
+        **(identifiers[1] | {"in_range": None, "uncertainty": None}),
+        loss_config=loss_configs[1],
+    )
+
+    tp_tracker = TrainingPredictionTracker(
+        split_dict={"train": [tp1], "val": [tp2], "test": []}
+    )
+
+    tp_tracker.to_npz(tmp_path / "pred_tracker.npz")
+    # The temporary file is moved into place
+    assert not (tmp_path / "pred_tracker.npz.tmp").exists()
+    tp_roundtrip = TrainingPredictionTracker.from_npz(tmp_path / "pred_tracker.npz")
+
+    for k, v in tp_tracker.dict().items():
+        assert getattr(tp_roundtrip, k) == v
+
+
+def test_find_value_idxs_index_in_sync(identifiers, loss_configs):
+    tp_tracker = TrainingPredictionTracker()
+
+    for i in range(3):
+        for sp, ids in zip(["train", "val"], identifiers[:2]):
+            tp_tracker.update_values(
+                prediction=float(i),
+                pose_predictions=[float(i)],
+                loss_val=0.0,
+                split=sp,
+                **ids,
+                loss_config=loss_configs[0],
+            )
+
+    # Adding directly to the split_dict should still be picked up
+    tp_tracker.split_dict["test"].append(
+        TrainingPrediction(**identifiers[2], loss_config=loss_configs[1])
+    )
+
+    idxs = tp_tracker._find_value_idxs(
+        compound_id=identifiers[0]["compound_id"],
+        xtal_id=identifiers[0]["xtal_id"],
+        target_prop=identifiers[0]["target_prop"],
+        loss_config=loss_configs[0],
+    )
+    assert idxs == {"train": [0], "val": [], "test": []}
+    assert tp_tracker.split_dict["train"][0].predictions == [0.0, 1.0, 2.0]
+
+    idxs = tp_tracker._find_value_idxs(
+        split="test",
+        compound_id=identifiers[2]["compound_id"],
+        xtal_id=identifiers[2]["xtal_id"],
+        target_prop=identifiers[2]["target_prop"],
+        loss_config=loss_configs[1],
+    )
+    assert idxs == {"train": [], "val": [], "test": [0]}
+
+
 def test_training_pred_tracker_len(identifiers, loss_configs):
     tp1 = TrainingPrediction(**identifiers[0], loss_config=loss_configs[0])
     tp2 = TrainingPrediction(**identifiers[1], loss_config=loss_configs[1])
@@ -605,3 +669,37 @@ def test_training_pred_tracker_get_losses_agg_both(identifiers, loss_configs):
         10 * identifiers[1]["loss_weight"] + 30 * identifiers[3]["loss_weight"]
     ) / 2
     assert (loss_dict["train"] == [loss_val]).all()
+
+
+def test_find_value_idxs_index_same_length_changes(identifiers, loss_configs):
+    tp_tracker = TrainingPredictionTracker()
+    for ids in identifiers[:2]:
+        tp_tracker.update_values(
+            prediction=0.0,
+            pose_predictions=[0.0],
+            loss_val=0.0,
+            split="train",
+            **ids,
+            loss_config=loss_configs[0],
+        )
+
+    def find(ids):
+        return tp_tracker._find_value_idxs(
+            split="train",
+            compound_id=ids["compound_id"],
+            xtal_id=ids["xtal_id"],
+            target_prop=ids["target_prop"],
+            loss_config=loss_configs[0],
+        )["train"]
+
+    assert find(identifiers[0]) == [0]
+
+    # Reordering in place keeps the length the same
+    tp_tracker.split_dict["train"].reverse()
+    assert find(identifiers[0]) == [1]
+    assert find(identifiers[1]) == [0]
+
+    # As does replacing the whole list
+    tp_tracker.split_dict["train"] = tp_tracker.split_dict["train"][::-1]
+    assert find(identifiers[0]) == [0]
+    assert find(identifiers[1]) == [1]
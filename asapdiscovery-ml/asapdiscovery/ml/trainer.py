@@ -1,6 +1,6 @@
 import json
+import os
 import pickle as pkl
-from copy import deepcopy
 from glob import glob
 from pathlib import Path
 from time import time
@@ -193,6 +193,7 @@ class Trainer(BaseModel):
             "ds_val": {"exclude": True},
             "ds_test": {"exclude": True},
             "loss_funcs": {"exclude": True},
+            "eval_targets": {"exclude": True},
         }
 
         # Allow things to be added to the object after initialization/validation
@@ -695,10 +696,8 @@ class Trainer(BaseModel):
                     raise ValueError(f"Error loading S3 settings: {e}")
 
         # Build dataset and split
-        self.ds = self.ds_config.build()
-        self.ds_train, self.ds_val, self.ds_test = self.ds_splitter_config.split(
-            self.ds
-        )
+        self.ds, splits = self._build_ds_and_splits()
+        self.ds_train, self.ds_val, self.ds_test = splits
 
         # Adjust output_dir and make sure it exists
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -710,14 +709,24 @@ class Trainer(BaseModel):
 
         # Load info for continuing from pred_tracker
         if self.cont:
-            print("Continuing run, checking for pred_tracker.json", flush=True)
-            # Try and load pred_tracker
+            print("Continuing run, checking for pred_tracker", flush=True)
+            # Finish writing the last checkpoint if the run was preempted part way
+            #  through
+            self._recover_checkpoint()
+            # Try and load pred_tracker, preferring the binary per-epoch checkpoint
+            pred_tracker_npz_fn = self.output_dir / "pred_tracker.npz"
             pred_tracker_fn = self.output_dir / "pred_tracker.json"
-            if pred_tracker_fn.exists():
-                print("Found pred_tracker.json", flush=True)
-                self.pred_tracker = TrainingPredictionTracker(
-                    **json.loads(pred_tracker_fn.read_text())
-                )
+            if pred_tracker_npz_fn.exists() or pred_tracker_fn.exists():
+                if pred_tracker_npz_fn.exists():
+                    print("Found pred_tracker.npz", flush=True)
+                    self.pred_tracker = TrainingPredictionTracker.from_npz(
+                        pred_tracker_npz_fn
+                    )
+                else:
+                    print("Found pred_tracker.json", flush=True)
+                    self.pred_tracker = TrainingPredictionTracker(
+                        **json.loads(pred_tracker_fn.read_text())
+                    )
                 try:
                     self.start_epoch = len(next(iter(self.pred_tracker))[1].predictions)
                 except StopIteration:
@@ -742,18 +751,18 @@ class Trainer(BaseModel):
             if len(self.pred_tracker) > 0:
                 subset_idxs = {"train": [], "val": [], "test": []}
 
-                # First build a dict mapping compound_id: idx in ds
-                compound_idx_dict = {}
-                for i, (compound, _) in enumerate(self.ds):
-                    if self.model_config.grouped:
-                        compound_id = compound
-                    else:
-                        compound_id = compound[1]
-                    if compound_id in compound_idx_dict:
-                        raise ValueError(
-                            f"Found multiple entries in ds for compound {compound_id}"
-                        )
-                    compound_idx_dict[compound_id] = i
+                # First build a dict mapping compound_id: idx in ds, using the
+                #  dataset's split index so no structures need to be loaded
+                compound_ids = self.ds.split_index()["compound_ids"]
+                unique_ids, id_counts = np.unique(compound_ids, return_counts=True)
+                if (id_counts > 1).any():
+                    raise ValueError(
+                        "Found multiple entries in ds for compound "
+                        f"{unique_ids[id_counts > 1][0]}"
+                    )
+                compound_idx_dict = dict(
+                    zip(compound_ids.tolist(), range(len(compound_ids)))
+                )
 
                 for _, tp in self.pred_tracker:
                     if tp.compound_id not in compound_idx_dict:
@@ -836,6 +845,12 @@ class Trainer(BaseModel):
         self.loss_weights = self.loss_weights.to(self.device)
         self.eval_loss_weights = self.eval_loss_weights.to(self.device)
 
+        # Gather the targets for the evaluation splits once, rather than every epoch
+        self.eval_targets = {
+            "val": self._build_eval_targets(self.ds_val),
+            "test": self._build_eval_targets(self.ds_test),
+        }
+
         # Set internal tracker to True so we know we can start training
         self._is_initialized = True
 
@@ -881,7 +896,7 @@ class Trainer(BaseModel):
             batch_counter = 0
             self.optimizer.zero_grad()
             start_time = time()
-            for compound, pose in self.ds_train:
+            for sample_idx, (compound, pose) in enumerate(self.ds_train):
                 if type(compound) is tuple:
                     xtal_id, compound_id = compound
                 else:
@@ -920,22 +935,12 @@ class Trainer(BaseModel):
 
                 # Get input poses for GroupedModel
                 if self.model_config.grouped:
-                    model_inp = []
-                    for single_pose in pose["poses"]:
-                        # Apply all data augmentations
-                        aug_pose = deepcopy(single_pose)
-                        for aug in self.data_augs:
-                            aug_pose = aug(aug_pose)
-
-                        model_inp.append(aug_pose)
-
+                    model_inp = [
+                        self._augment_pose(single_pose, epoch_idx, sample_idx, pose_idx)
+                        for pose_idx, single_pose in enumerate(pose["poses"])
+                    ]
                 else:
-                    # Apply all data augmentations
-                    aug_pose = deepcopy(pose)
-                    for aug in self.data_augs:
-                        aug_pose = aug(aug_pose)
-
-                    model_inp = aug_pose
+                    model_inp = self._augment_pose(pose, epoch_idx, sample_idx)
 
                 # Make prediction and calculate loss
                 pred, pose_preds = self.model(model_inp)
@@ -1035,187 +1040,8 @@ class Trainer(BaseModel):
             epoch_train_loss = np.mean(tmp_loss)
 
             self.model.eval()
-            tmp_loss = []
-            for compound, pose in self.ds_val:
-                if type(compound) is tuple:
-                    xtal_id, compound_id = compound
-                else:
-                    xtal_id = "NA"
-                    compound_id = compound
-
-                try:
-                    # convert to float to match other types
-                    target = torch.tensor(
-                        pose[self.target_prop], device=self.device
-                    ).float()
-                except KeyError:
-                    print(
-                        f"{self.target_prop} not found in compound {compound}, skipping.",
-                        flush=True,
-                    )
-                    if self.log_file:
-                        self.logger.info(
-                            f"{self.target_prop} not found in compound {compound}, skipping."
-                        )
-                    continue
-                in_range = (
-                    torch.tensor(
-                        pose[f"{self.target_prop}_range"], device=self.device
-                    ).float()
-                    if f"{self.target_prop}_range" in pose
-                    else None
-                )
-                uncertainty = (
-                    torch.tensor(
-                        pose[f"{self.target_prop}_stderr"], device=self.device
-                    ).float()
-                    if f"{self.target_prop}_range" in pose
-                    else None
-                )
-
-                # Get input poses for GroupedModel
-                if self.model_config.grouped:
-                    model_inp = pose["poses"]
-                else:
-                    model_inp = pose
-
-                # Make prediction and calculate loss
-                pred, pose_preds = self.model(model_inp)
-                losses = [
-                    (
-                        loss_func(
-                            pred, pose_preds, target, in_range, uncertainty
-                        ).reshape((1,))
-                    )
-                    for loss_func in self.loss_funcs
-                ]
-                losses = torch.cat(
-                    [loss.to(self.device, dtype=torch.float32) for loss in losses]
-                )
-
-                # Calculate final loss based on loss weights
-                loss = losses.flatten().dot(self.eval_loss_weights)
-
-                # Update pred_tracker
-                for (
-                    loss_val,
-                    loss_config,
-                    loss_wt,
-                ) in zip(
-                    losses,
-                    self.loss_configs,
-                    self.eval_loss_weights,
-                ):
-                    if target is None:
-                        continue
-                    self.pred_tracker.update_values(
-                        prediction=pred.item(),
-                        pose_predictions=[p.item() for p in pose_preds],
-                        loss_val=loss_val.item(),
-                        split="val",
-                        compound_id=compound_id,
-                        xtal_id=xtal_id,
-                        target_prop=self.target_prop,
-                        target_val=target,
-                        in_range=in_range,
-                        uncertainty=uncertainty,
-                        loss_config=loss_config,
-                        loss_weight=loss_wt,
-                    )
-
-                tmp_loss.append(loss.item())
-            epoch_val_loss = np.mean(tmp_loss)
-
-            tmp_loss = []
-            for compound, pose in self.ds_test:
-                if type(compound) is tuple:
-                    xtal_id, compound_id = compound
-                else:
-                    xtal_id = "NA"
-                    compound_id = compound
-
-                try:
-                    # convert to float to match other types
-                    target = torch.tensor(
-                        pose[self.target_prop], device=self.device
-                    ).float()
-                except KeyError:
-                    print(
-                        f"{self.target_prop} not found in compound {compound}, skipping.",
-                        flush=True,
-                    )
-                    if self.log_file:
-                        self.logger.info(
-                            f"{self.target_prop} not found in compound {compound}, skipping."
-                        )
-                    continue
-                in_range = (
-                    torch.tensor(
-                        pose[f"{self.target_prop}_range"], device=self.device
-                    ).float()
-                    if f"{self.target_prop}_range" in pose
-                    else None
-                )
-                uncertainty = (
-                    torch.tensor(
-                        pose[f"{self.target_prop}_stderr"], device=self.device
-                    ).float()
-                    if f"{self.target_prop}_range" in pose
-                    else None
-                )
-
-                # Get input poses for GroupedModel
-                if self.model_config.grouped:
-                    model_inp = pose["poses"]
-                else:
-                    model_inp = pose
-
-                # Make prediction and calculate loss
-                pred, pose_preds = self.model(model_inp)
-                losses = [
-                    (
-                        loss_func(
-                            pred, pose_preds, target, in_range, uncertainty
-                        ).reshape((1,))
-                    )
-                    for loss_func in self.loss_funcs
-                ]
-                losses = torch.cat(
-                    [loss.to(self.device, dtype=torch.float32) for loss in losses]
-                )
-
-                # Calculate final loss based on loss weights
-                loss = losses.flatten().dot(self.eval_loss_weights)
-
-                # Update pred_tracker
-                for (
-                    loss_val,
-                    loss_config,
-                    loss_wt,
-                ) in zip(
-                    losses,
-                    self.loss_configs,
-                    self.eval_loss_weights,
-                ):
-                    if target is None:
-                        continue
-                    self.pred_tracker.update_values(
-                        prediction=pred.item(),
-                        pose_predictions=[p.item() for p in pose_preds],
-                        loss_val=loss_val.item(),
-                        split="test",
-                        compound_id=compound_id,
-                        xtal_id=xtal_id,
-                        target_prop=self.target_prop,
-                        target_val=target,
-                        in_range=in_range,
-                        uncertainty=uncertainty,
-                        loss_config=loss_config,
-                        loss_weight=loss_wt,
-                    )
-
-                tmp_loss.append(loss.item())
-            epoch_test_loss = np.mean(tmp_loss)
+            epoch_val_loss = self._evaluate("val", self.ds_val)
+            epoch_test_loss = self._evaluate("test", self.ds_test)
             self.model.train()
 
             if self.use_wandb:
@@ -1228,18 +1054,25 @@ class Trainer(BaseModel):
                         "epoch_time": end_time - start_time,
                     }
                 )
-            # Save states
-            if self.save_weights == "all":
-                torch.save(self.model.state_dict(), self.output_dir / f"{epoch_idx}.th")
-                torch.save(
-                    self.optimizer.state_dict(), self.output_dir / "optimizer.th"
+            # Save states. The files for an epoch are all updated together, so a
+            #  preempted run always resumes with weights from the same epoch as the
+            #  pred_tracker
+            checkpoint = {
+                self.output_dir / "pred_tracker.npz": self.pred_tracker.to_npz
+            }
+            if self.save_weights in {"all", "recent"}:
+                weights_fn = (
+                    f"{epoch_idx}.th" if self.save_weights == "all" else "weights.th"
+                )
+                model_state = self.model.state_dict()
+                optimizer_state = self.optimizer.state_dict()
+                checkpoint[self.output_dir / weights_fn] = lambda fn: torch.save(
+                    model_state, fn
                 )
-            elif self.save_weights == "recent":
-                torch.save(self.model.state_dict(), self.output_dir / "weights.th")
-                torch.save(
-                    self.optimizer.state_dict(), self.output_dir / "optimizer.th"
+                checkpoint[self.output_dir / "optimizer.th"] = lambda fn: torch.save(
+                    optimizer_state, fn
                 )
-            (self.output_dir / "pred_tracker.json").write_text(self.pred_tracker.json())
+            self._save_checkpoint(checkpoint)
 
             # Stop if loss has gone to infinity or is NaN
             if (
@@ -1324,6 +1157,9 @@ class Trainer(BaseModel):
                 tp.predictions = tp.predictions[: use_epoch + 1]
                 tp.pose_predictions = tp.pose_predictions[: use_epoch + 1]
                 tp.loss_vals = tp.loss_vals[: use_epoch + 1]
+            # Keep the binary checkpoint consistent with the trimmed JSON, so a
+            #  continued run doesn't pick up the discarded epochs
+            self.pred_tracker.to_npz(self.output_dir / "pred_tracker.npz")
 
         final_model_path = self.output_dir / "final.th"
         torch.save(self.model.state_dict(), final_model_path)
@@ -1386,6 +1222,268 @@ class Trainer(BaseModel):
         if self.use_wandb:
             wandb.finish()
 
+    def _save_checkpoint(self, writers):
+        """
+        Write a set of files in output_dir that need to stay consistent with each
+        other. Each file is first written to a temporary file, then a commit file
+        listing them is written before they are all moved into place. If the run is
+        stopped while moving them, _recover_checkpoint finishes the move when the run
+        is continued.
+
+        Parameters
+        ----------
+        writers : dict[Path, Callable[[Path], None]]
+            Maps each file to a function that writes its contents to a given path
+        """
+        moves = {}
+        for fn, write in writers.items():
+            tmp_fn = fn.with_name(f"{fn.stem}.tmp{fn.suffix}")
+            write(tmp_fn)
+            moves[tmp_fn.name] = fn.name
+
+        commit_fn = self.output_dir / "checkpoint_commit.json"
+        tmp_commit_fn = self.output_dir / "checkpoint_commit.tmp.json"
+        tmp_commit_fn.write_text(json.dumps(moves))
+        os.replace(tmp_commit_fn, commit_fn)
+
+        self._recover_checkpoint()
+
+    def _recover_checkpoint(self):
+        """
+        Move the files of a checkpoint written by _save_checkpoint into place, if its
+        commit file is present.
+        """
+        commit_fn = self.output_dir / "checkpoint_commit.json"
+        if not commit_fn.exists():
+            return
+
+        for tmp_name, name in json.loads(commit_fn.read_text()).items():
+            tmp_fn = self.output_dir / tmp_name
+            if tmp_fn.exists():
+                os.replace(tmp_fn, self.output_dir / name)
+        commit_fn.unlink()
+
+    def _build_ds_and_splits(self):
+        """
+        Build the dataset and split it according to the stored configs.
+
+        Returns
+        -------
+        torch.utils.data.Dataset
+            Full dataset
+        tuple[torch.utils.data.Dataset]
+            Train, val, and test splits
+        """
+        ds = self.ds_config.build()
+        return ds, self.ds_splitter_config.split(ds)
+
+    def _build_eval_targets(self, ds):
+        """
+        Collect the target values for every sample in an evaluation split into
+        tensors on self.device, so they don't need to be rebuilt each epoch.
+
+        Parameters
+        ----------
+        ds : torch.utils.data.Dataset
+            Dataset to collect targets for
+
+        Returns
+        -------
+        dict
+            Dict with keys:
+            - `keep`: whether each sample in ds has a target value
+            - `compounds`: (xtal_id, compound_id) for each kept sample
+            - `target`, `in_range`, `uncertainty`: device tensors of the values for
+              each kept sample (NaN where not given)
+            - `has_range`: whether each kept sample has range/uncertainty values
+            - `target_host`, `in_range_host`, `uncertainty_host`: the same values as
+              Python lists, for the pred_tracker
+        """
+        range_key = f"{self.target_prop}_range"
+        stderr_key = f"{self.target_prop}_stderr"
+
+        keep = []
+        compounds = []
+        target = []
+        in_range = []
+        uncertainty = []
+        has_range = []
+        for compound, pose in ds:
+            if type(compound) is not tuple:
+                compound = ("NA", compound)
+
+            if self.target_prop not in pose:
+                print(
+                    f"{self.target_prop} not found in compound {compound}, skipping.",
+                    flush=True,
+                )
+                if self.log_file:
+                    self.logger.info(
+                        f"{self.target_prop} not found in compound {compound}, "
+                        "skipping."
+                    )
+                keep.append(False)
+                continue
+
+            keep.append(True)
+            compounds.append(compound)
+            target.append(float(pose[self.target_prop]))
+            if range_key in pose:
+                has_range.append(True)
+                in_range.append(float(pose[range_key]))
+                uncertainty.append(float(pose[stderr_key]))
+            else:
+                has_range.append(False)
+                in_range.append(None)
+                uncertainty.append(None)
+
+        def to_device(vals):
+            return torch.tensor(
+                [np.nan if v is None else v for v in vals],
+                dtype=torch.float32,
+                device=self.device,
+            )
+
+        return {
+            "keep": keep,
+            "compounds": compounds,
+            "target": to_device(target),
+            "in_range": to_device(in_range),
+            "uncertainty": to_device(uncertainty),
+            "has_range": has_range,
+            "target_host": target,
+            "in_range_host": in_range,
+            "uncertainty_host": uncertainty,
+        }
+
+    def _evaluate(self, split, ds):
+        """
+        Run the model over an evaluation split and record the results in the
+        pred_tracker. Predictions and losses are accumulated in preallocated tensors on
+        self.device and only copied back to the host once at the end, rather than
+        syncing for every sample.
+
+        Parameters
+        ----------
+        split : str
+            Which split is being evaluated ("val" or "test")
+        ds : torch.utils.data.Dataset
+            Dataset for the split
+
+        Returns
+        -------
+        float
+            Mean loss over the split
+        """
+        targets = self.eval_targets[split]
+        n_samples = len(targets["compounds"])
+        preds = torch.empty(n_samples, device=self.device)
+        losses = torch.empty((n_samples, len(self.loss_funcs)), device=self.device)
+        pose_preds = []
+        n_pose_preds = []
+
+        with torch.no_grad():
+            sample_idx = 0
+            for keep, (_, pose) in zip(targets["keep"], ds):
+                if not keep:
+                    continue
+
+                # Views into the preallocated target tensors
+                target = targets["target"][sample_idx]
+                if targets["has_range"][sample_idx]:
+                    in_range = targets["in_range"][sample_idx]
+                    uncertainty = targets["uncertainty"][sample_idx]
+                else:
+                    in_range = None
+                    uncertainty = None
+
+                # Get input poses for GroupedModel
+                if self.model_config.grouped:
+                    model_inp = pose["poses"]
+                else:
+                    model_inp = pose
+
+                # Make prediction and calculate loss
+                pred, sample_pose_preds = self.model(model_inp)
+                preds[sample_idx] = pred.reshape(-1)[0]
+                losses[sample_idx] = torch.cat(
+                    [
+                        loss_func(
+                            pred, sample_pose_preds, target, in_range, uncertainty
+                        )
+                        .reshape((1,))
+                        .to(self.device, dtype=torch.float32)
+                        for loss_func in self.loss_funcs
+                    ]
+                )
+                pose_preds.append(torch.cat([p.reshape(-1) for p in sample_pose_preds]))
+                n_pose_preds.append(len(sample_pose_preds))
+
+                sample_idx += 1
+
+            # Calculate final loss for each sample based on loss weights
+            sample_losses = losses @ self.eval_loss_weights
+
+        # Single transfer back to the host
+        preds = preds.cpu().tolist()
+        losses = losses.cpu().tolist()
+        sample_losses = sample_losses.cpu().numpy()
+        if len(pose_preds) > 0:
+            pose_preds = torch.cat(pose_preds).cpu().tolist()
+        pose_pred_bounds = np.concatenate([[0], np.cumsum(n_pose_preds)]).astype(int)
+        eval_loss_weights = self.eval_loss_weights.cpu().tolist()
+
+        # Update pred_tracker
+        for i, (xtal_id, compound_id) in enumerate(targets["compounds"]):
+            start, stop = pose_pred_bounds[i], pose_pred_bounds[i + 1]
+            sample_pose_preds = pose_preds[start:stop]
+            for loss_val, loss_config, loss_wt in zip(
+                losses[i], self.loss_configs, eval_loss_weights
+            ):
+                self.pred_tracker.update_values(
+                    prediction=preds[i],
+                    pose_predictions=sample_pose_preds,
+                    loss_val=loss_val,
+                    split=split,
+                    compound_id=compound_id,
+                    xtal_id=xtal_id,
+                    target_prop=self.target_prop,
+                    target_val=targets["target_host"][i],
+                    in_range=targets["in_range_host"][i],
+                    uncertainty=targets["uncertainty_host"][i],
+                    loss_config=loss_config,
+                    loss_weight=loss_wt,
+                )
+
+        return np.mean(sample_losses)
+
+    def _augment_pose(self, pose, *seed_idx):
+        """
+        Apply all data augmentations to a single pose. Augmentations return a shallow
+        copy of the pose with only the augmented tensors replaced, so the input pose is
+        left untouched without having to deepcopy everything in it. The noise for each
+        pose is seeded from seed_idx (eg (epoch, sample index)), so it is reproducible
+        regardless of iteration order or resuming.
+
+        Parameters
+        ----------
+        pose : dict
+            Pose to augment
+        seed_idx : int
+            Indices used to derive the random seed for this pose
+
+        Returns
+        -------
+        dict
+            Augmented pose
+        """
+        # Shallow copy so the model can't modify the dataset's dict
+        aug_pose = dict(pose)
+        for aug in self.data_augs:
+            aug_pose = aug(aug_pose, seed_idx=seed_idx)
+
+        return aug_pose
+
     def _make_wandb_ds_tables(self):
         ds_tables = []
 
@@ -247,9 +247,12 @@ def make_du_from_new_lig(
     return success, du
 
 
-def superpose_molecule(ref_mol, mobile_mol, ref_chain="A", mobile_chain="A"):
+def find_superposition(ref_mol, mobile_mol, ref_chain="A", mobile_chain="A"):
     """
-    Superpose `mobile_mol` onto `ref_mol`.
+    Find the superposition of `mobile_mol` onto `ref_mol` without moving either.
+
+    The returned results object can be used to apply the same transformation to any
+    other molecule sharing the frame of `mobile_mol` with ``results.Transform(mol)``.
 
     Parameters
     ----------
@@ -258,14 +261,12 @@ def superpose_molecule(ref_mol, mobile_mol, ref_chain="A", mobile_chain="A"):
     mobile_mol : oechem.OEGraphMol
         Molecule to align.
     ref_chain : Reference chain to align to
-    mobile_chain : Mobile chain to use for alignment (the whole molecule will move as well though)
+    mobile_chain : Mobile chain to use for alignment
 
     Returns
     -------
-    oechem.OEGraphMol
-        New aligned molecule.
-    float
-        RMSD between `ref_mol` and `mobile_mol` after alignment.
+    oespruce.OESuperposeResults
+        Superposition results, holding the transformation and RMSD.
     """
     chains_in_ref = find_component_chains(ref_mol, "protein", sort_by="size")
     if ref_chain not in chains_in_ref or ref_chain is None:
@@ -298,6 +299,32 @@ def superpose_molecule(ref_mol, mobile_mol, ref_chain="A", mobile_chain="A"):
     # Perform superposing
     superpos.Superpose(aln_res, mobile_mol, mobile_pred)
     # print(f"RMSD: {aln_res.GetRMSD()}")
+    return aln_res
+
+
+def superpose_molecule(ref_mol, mobile_mol, ref_chain="A", mobile_chain="A"):
+    """
+    Superpose `mobile_mol` onto `ref_mol`.
+
+    Parameters
+    ----------
+    ref_mol : oechem.OEGraphMol
+        Reference molecule to align to.
+    mobile_mol : oechem.OEGraphMol
+        Molecule to align.
+    ref_chain : Reference chain to align to
+    mobile_chain : Mobile chain to use for alignment (the whole molecule will move as well though)
+
+    Returns
+    -------
+    oechem.OEGraphMol
+        New aligned molecule.
+    float
+        RMSD between `ref_mol` and `mobile_mol` after alignment.
+    """
+    aln_res = find_superposition(
+        ref_mol, mobile_mol, ref_chain=ref_chain, mobile_chain=mobile_chain
+    )
 
     # Create copy of molecule and transform it to the aligned position
     mobile_mol_aligned = mobile_mol.CreateCopy()
@@ -1,4 +1,7 @@
+import hashlib
+import json
 import logging
+from collections.abc import Iterator
 from enum import Enum
 from pathlib import Path
 from typing import Optional
@@ -128,7 +131,131 @@ class SzybkiFreeformConformerAnalyzer:
         )
         self.logger.debug(f"Writing to {self.output_paths}")
 
-    def run_all_szybki(self, return_as_dataframe: bool = False):
+    # name of the per-ligand result file used to skip completed ligands on restart
+    result_file_name = "szybki_result.json"
+
+    def _result_file(self, output_path: Path) -> Path:
+        return Path(output_path) / self.result_file_name
+
+    @staticmethod
+    def _input_hash(ligand_path: Path) -> str:
+        """
+        Hash of the ligand file, stored with each result so a result is only reused
+        for the same input.
+        """
+        return hashlib.sha256(Path(ligand_path).read_bytes()).hexdigest()
+
+    def _load_result(
+        self, ligand_path: Path, output_path: Path
+    ) -> Optional[SzybkiFreeformResult]:
+        """
+        Load a previously completed result for a ligand, if a valid one exists for the
+        same input ligand.
+        """
+        result_file = self._result_file(output_path)
+        if not result_file.exists():
+            return None
+        try:
+            with open(result_file) as f:
+                data = json.load(f)
+            if data.pop("input_hash", None) != self._input_hash(ligand_path):
+                self.logger.info(
+                    f"Previous result {result_file} is for a different input, rerunning"
+                )
+                return None
+            return SzybkiFreeformResult(**data)
+        except Exception as e:
+            self.logger.warning(
+                f"Could not read previous result {result_file}, rerunning: {e}"
+            )
+            return None
+
+    def _run_and_record(
+        self, ligand_path: Path, output_path: Path
+    ) -> SzybkiFreeformResult:
+        """
+        Run Szybki on a single ligand and write the result next to its outputs so it can
+        be skipped on restart. The OpenEye error stream is always restored afterwards so
+        that the log redirection of one ligand never leaks into the next.
+        """
+        try:
+            res = self.run_szybki_on_ligand(ligand_path, output_path)
+        finally:
+            oechem.OEThrow.SetOutputStream(oechem.oeerr)
+        output_path.mkdir(parents=True, exist_ok=True)
+        with open(self._result_file(output_path), "w") as f:
+            json.dump(
+                res.dict(exclude={"units"})
+                | {"input_hash": self._input_hash(ligand_path)},
+                f,
+            )
+        return res
+
+    def iter_szybki(
+        self, processors: int = 1, resume: bool = False
+    ) -> Iterator[tuple[int, SzybkiFreeformResult]]:
+        """
+        Run Szybki on the ligands loaded in the class, yielding results as they complete.
+
+        Parameters
+        ----------
+        processors : int
+            Number of processes to run ligands over, by default 1 which runs serially
+            in the current process.
+        resume : bool
+            Whether to skip ligands which already have a result file in their output
+            directory from a previous run on the same input ligand file.
+
+        Yields
+        ------
+        tuple[int, SzybkiFreeformResult]
+            The index of the ligand in ``ligand_paths`` and its result, in completion order.
+        """
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        todo = []
+        for i, (ligand_path, output_path) in enumerate(
+            zip(self.ligand_paths, self.output_paths)
+        ):
+            previous = self._load_result(ligand_path, output_path) if resume else None
+            if previous is not None:
+                self.logger.info(f"Found previous Szybki result for {ligand_path}")
+                yield i, previous
+            else:
+                todo.append(i)
+
+        self.logger.info(f"Running Szybki on {len(todo)} ligands")
+
+        if processors > 1:
+            with ProcessPoolExecutor(max_workers=processors) as pool:
+                work_list = {
+                    pool.submit(
+                        self._run_and_record,
+                        self.ligand_paths[i],
+                        self.output_paths[i],
+                    ): i
+                    for i in todo
+                }
+                for work in as_completed(work_list):
+                    i = work_list[work]
+                    self.logger.info(f"Finished Szybki on {self.ligand_paths[i]}")
+                    yield i, work.result()
+        else:
+            for i in todo:
+                ligand_path, output_path = self.ligand_paths[i], self.output_paths[i]
+                self.logger.info(f"Running Szybki on {ligand_path}")
+                self.logger.debug(f"Writing to {output_path}")
+                res = self._run_and_record(ligand_path, output_path)
+                self.logger.info(f"Finished Szybki on {ligand_path}")
+                yield i, res
+
+    def run_all_szybki(
+        self,
+        return_as_dataframe: bool = False,
+        processors: int = 1,
+        resume: bool = False,
+        results_csv: Optional[Path] = None,
+    ):
         """
         Run Szybki on the ligands loaded in the class.
 
@@ -141,18 +268,32 @@ class SzybkiFreeformConformerAnalyzer:
             - szybki_GlobalStrain
             - szybki_LocalStrain
             - szybki_ConformerStrain
+        processors : int
+            Number of processes to run ligands over, by default 1.
+        resume : bool
+            Whether to skip ligands with a result file from a previous run on the same
+            input ligand file.
+        results_csv : Path, optional
+            If given, each result is appended to this CSV as soon as it completes.
 
         Returns
         -------
         Union[list[SzybkiFreeformResult], pd.DataFrame]
-            The results of the Szybki FreeForm runs
+            The results of the Szybki FreeForm runs, in the order of the input ligands
         """
-        results = []
-        for ligand_path, output_path in zip(self.ligand_paths, self.output_paths):
-            self.logger.info(f"Running Szybki on {ligand_path}")
-            self.logger.debug(f"Writing to {output_path}")
-            results.append(self.run_szybki_on_ligand(ligand_path, output_path))
-            self.logger.info(f"Finished Szybki on {ligand_path}")
+        results = {}
+        if results_csv is not None:
+            results_csv = Path(results_csv)
+            pd.DataFrame(columns=SzybkiResultCols.get_columns()).to_csv(
+                results_csv, index=False
+            )
+        for i, res in self.iter_szybki(processors=processors, resume=resume):
+            results[i] = res
+            if results_csv is not None:
+                pd.DataFrame([res.as_result_cols()]).to_csv(
+                    results_csv, mode="a", header=False, index=False
+                )
+        results = [results[i] for i in sorted(results)]
         if return_as_dataframe:
             return pd.DataFrame([s.as_result_cols() for s in results])
         else:
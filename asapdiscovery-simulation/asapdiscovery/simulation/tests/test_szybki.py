@@ -22,3 +22,80 @@ def test_szybki(ligand_path, szybki_results, tmp_path):
     ):
         res = sk.run_all_szybki()
         assert res[0] == szybki_results
+
+
+def test_szybki_resume(ligand_path, szybki_results, tmp_path):
+    calls = []
+
+    def run_szybki_on_ligand_patch(
+        self, ligand_path: Path, output_path: Path
+    ) -> SzybkiFreeformResult:
+        calls.append(ligand_path)
+        return szybki_results
+
+    sk = SzybkiFreeformConformerAnalyzer([ligand_path], [tmp_path])
+    with mock.patch.object(
+        SzybkiFreeformConformerAnalyzer,
+        "run_szybki_on_ligand",
+        run_szybki_on_ligand_patch,
+    ):
+        sk.run_all_szybki()
+        assert (tmp_path / sk.result_file_name).exists()
+        # the second run should pick up the stored result and not rerun
+        df = sk.run_all_szybki(
+            return_as_dataframe=True,
+            resume=True,
+            results_csv=tmp_path / "results.csv",
+        )
+        assert len(calls) == 1
+        assert df["ligand_id"].tolist() == ["bleh"]
+        assert (tmp_path / "results.csv").exists()
+
+        # without resume the ligand is always rerun
+        sk.run_all_szybki()
+        assert len(calls) == 2
+
+
+def test_szybki_resume_different_input(ligand_path, szybki_results, tmp_path):
+    calls = []
+
+    def run_szybki_on_ligand_patch(
+        self, ligand_path: Path, output_path: Path
+    ) -> SzybkiFreeformResult:
+        calls.append(ligand_path)
+        return szybki_results
+
+    other_ligand_path = tmp_path / "other.sdf"
+    other_ligand_path.write_text(Path(ligand_path).read_text() + "\n")
+    output_path = tmp_path / "out"
+    with mock.patch.object(
+        SzybkiFreeformConformerAnalyzer,
+        "run_szybki_on_ligand",
+        run_szybki_on_ligand_patch,
+    ):
+        SzybkiFreeformConformerAnalyzer([ligand_path], [output_path]).run_all_szybki()
+        # a result for a different ligand file in the same output dir is not reused
+        SzybkiFreeformConformerAnalyzer(
+            [other_ligand_path], [output_path]
+        ).run_all_szybki(resume=True)
+        assert len(calls) == 2
+
+
+def test_szybki_processes(ligand_path, szybki_results, tmp_path):
+    def run_szybki_on_ligand_patch(
+        self, ligand_path: Path, output_path: Path
+    ) -> SzybkiFreeformResult:
+        return szybki_results.copy(update={"ligand_id": output_path.stem})
+
+    output_paths = [tmp_path / f"lig_{i}" for i in range(3)]
+    sk = SzybkiFreeformConformerAnalyzer([ligand_path] * 3, output_paths)
+    # the workers are forked, so they see the patched method
+    with mock.patch.object(
+        SzybkiFreeformConformerAnalyzer,
+        "run_szybki_on_ligand",
+        run_szybki_on_ligand_patch,
+    ):
+        df = sk.run_all_szybki(return_as_dataframe=True, processors=2)
+    # results are returned in input order, and recorded for each ligand
+    assert df["ligand_id"].tolist() == ["lig_0", "lig_1", "lig_2"]
+    assert all((path / sk.result_file_name).exists() for path in output_paths)